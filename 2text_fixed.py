@@ -1,57 +1,217 @@
-import fitz  # PyMuPDF
-import re
 import os
+from page_extraction import iter_pages
+from layout_segmentation import iter_layout_pages
+from text_cleaning import clean_page_text as clean_article_text
+from manifest import DEFAULT_MANIFEST_PATH, Manifest, content_hash, file_hash, item_key
+from page_store import PageStoreWriter, PageStore, articles_hash, is_store, ref_hash, store_ref
 
-def clean_article_text(text):
-    text = re.sub(r'(\w+)-\s*\n\s*(\w+)', r'\1\2', text) 
-    text = re.sub(r'(\w+)-\s+(\w+)', r'\1\2', text)
-
-    replacements = {
-        "fve": "five", "frst": "first", "cofict": "conflict", "fnanciers": "financiers",
-        "ofcial": "official", "Afairs": "Affairs", "fghting": "fighting", "afected": "affected",
-        "fagged of": "flagged off", "safron ag": "saffron flag", "ash oods": "flash floods",
-        "signi cant": "significant", "multipolar": "multipolar", "advantagevance": "advance",
-        "To-ophobicbago": "Trinidad and Tobago", "Na-ophobicmibia": "Namibia"
-    }
-    for wrong, correct in replacements.items():
-        text = text.replace(wrong, correct)
-
-    text = re.sub(r'[^\x00-\x7F]+', ' ', text)
-    text = re.sub(r'^\s*(A IN-X|YK|INSIDE|PAGE \d+|NEW DELHI|SRINAGAR|CHENNAI|KOLKATA)\s*$', '', text, flags=re.MULTILINE)
-    text = re.sub(r'[ \t]{2,}', ' ', text)
-    text = re.sub(r'\n\s*\n+', '\n\n-----\n\n', text)
-    return text.strip()
-
-def split_pdf_to_chunks(pdf_path, pages_per_chunk=2, output_dir="chunks"):
+def split_pdf_to_chunks(pdf_path, pages_per_chunk=2, output_dir="chunks", workers=1, manifest=None, version=None,
+                        layout=False):
+    # With a manifest, an unchanged PDF whose chunk files are still intact
+    # isn't extracted again, and unchanged chunk files aren't rewritten.
+    # layout=True segments articles from block geometry (layout_segmentation.py)
     os.makedirs(output_dir, exist_ok=True)
-    with fitz.open(pdf_path) as doc:
-        chunk_index = 1
-        for i in range(0, len(doc), pages_per_chunk):
-            chunk_text = ""
-            for j in range(i, min(i + pages_per_chunk, len(doc))):
-                raw_text = doc[j].get_text("text")
-                cleaned = clean_article_text(raw_text)
-                chunk_text += f"\n\n----- PAGE {j + 1} -----\n\n{cleaned}\n"
-
-            file_path = os.path.join(output_dir, f"chunk_{chunk_index}.txt")
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(chunk_text.strip())
-            print(f"✅ Saved: {file_path}")
+    if manifest:
+        pdf_key, pdf_hash = item_key("pdf", pdf_path), file_hash(pdf_path)
+        if manifest.done(pdf_key, pdf_hash, "extracted", version) and chunks_intact(manifest, pdf_key):
+            print(f"⏭️ {pdf_path} unchanged since the last run, keeping its chunk files")
+            return
+
+    chunk_parts = []
+    chunk_index = 1
+    pages = iter_layout_pages if layout else iter_pages
+    for page_num, cleaned in pages(pdf_path, workers=workers, clean=clean_article_text):
+        if manifest:
+            manifest.mark(item_key("page", pdf_path, page_num), "page", content_hash(cleaned), "extracted", version, pdf_key)
+        chunk_parts.append(f"\n\n----- PAGE {page_num} -----\n\n{cleaned}\n")
+        if len(chunk_parts) == pages_per_chunk:
+            write_chunk(output_dir, chunk_index, chunk_parts, manifest, version, pdf_key if manifest else None)
+            chunk_parts = []
             chunk_index += 1
+    if chunk_parts:
+        write_chunk(output_dir, chunk_index, chunk_parts, manifest, version, pdf_key if manifest else None)
+    if manifest:
+        manifest.mark(pdf_key, "pdf", pdf_hash, "extracted", version)
+
+def split_pdf_to_store(pdf_path, store_path, pages_per_chunk=2, workers=1, manifest=None, version=None, layout=False):
+    # Streams each cleaned page and its articles into a page store (see
+    # page_store.py); chunks become page ranges of it instead of files
+    from summrizer import split_into_articles
+    if manifest:
+        pdf_key, pdf_hash = item_key("pdf", pdf_path), file_hash(pdf_path)
+        if manifest.done(pdf_key, pdf_hash, "extracted", version) and chunks_intact(manifest, pdf_key):
+            print(f"⏭️ {pdf_path} unchanged since the last run, keeping {store_path}")
+            return
+
+    pages = iter_layout_pages if layout else iter_pages
+    chunk_pages, chunk_articles = [], []
+    with PageStoreWriter(store_path) as writer:
+        for page_num, cleaned in pages(pdf_path, workers=workers, clean=clean_article_text):
+            articles = split_into_articles(cleaned)
+            writer.add_page(page_num, cleaned, articles)
+            if manifest:
+                manifest.mark(item_key("page", pdf_path, page_num), "page", content_hash(cleaned), "extracted", version, pdf_key)
+            chunk_pages.append(page_num)
+            chunk_articles += articles
+            if len(chunk_pages) == pages_per_chunk:
+                mark_range(manifest, version, store_path, chunk_pages, chunk_articles, pdf_key if manifest else None)
+                chunk_pages, chunk_articles = [], []
+        if chunk_pages:
+            mark_range(manifest, version, store_path, chunk_pages, chunk_articles, pdf_key if manifest else None)
+    print(f"✅ Saved {writer.pages} page(s) to {store_path}")
+    if manifest:
+        manifest.mark(pdf_key, "pdf", pdf_hash, "extracted", version)
+
+def mark_range(manifest, version, store_path, pages, articles, source):
+    if manifest:
+        ref = store_ref(store_path, pages[0], pages[-1])
+        manifest.mark(item_key("chunk", ref), "chunk", articles_hash(articles), "extracted", version, source)
+
+def chunk_hash(chunk):
+    # A chunk is a text file or a page range of a store; None if it's gone
+    try:
+        return ref_hash(chunk) if is_store(chunk) else file_hash(chunk)
+    except (OSError, KeyError):
+        return None
+
+def chunks_intact(manifest, pdf_key):
+    chunks = manifest.children(pdf_key, "chunk")
+    return bool(chunks) and all(chunk_hash(key.split(":", 1)[1]) == hash_ for key, hash_ in chunks.items())
+
+def write_chunk(output_dir, chunk_index, chunk_parts, manifest=None, version=None, source=None):
+    file_path = os.path.join(output_dir, f"chunk_{chunk_index}.txt")
+    text = "".join(chunk_parts).strip()
+    if manifest:
+        # Same text as last time: leave the file (and its recorded stage) alone
+        key, hash_ = item_key("chunk", file_path), content_hash(text)
+        row = manifest.get(key)
+        if row and row["hash"] == hash_ and os.path.exists(file_path) and file_hash(file_path) == hash_:
+            print(f"⏭️ Unchanged: {file_path}")
+            return
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    if manifest:
+        manifest.mark(key, "chunk", hash_, "extracted", version, source)
+    print(f"✅ Saved: {file_path}")
 
 # === Usage ===
 if __name__ == "__main__":
-    pdf_file = "sample.pdf"  # Replace with your PDF filename
-    split_pdf_to_chunks(pdf_file, pages_per_chunk=2)
+    import argparse
+    import dedup_index
+    import extractive
+    import instrumentation
+    import summarizer_backends
+    parser = argparse.ArgumentParser(description="Split a newspaper PDF into cleaned chunks, then summarize them into MongoDB")
+    parser.add_argument("pdf_file", nargs="?", default="sample.pdf", help="newspaper PDF (default: sample.pdf)")
+    parser.add_argument("--pages-per-chunk", type=int, default=2)
+    parser.add_argument("--chunks-dir", default="chunks")
+    parser.add_argument("--store", default=None, help="page store to extract into (default: <chunks-dir>/pages.jsonl)")
+    parser.add_argument("--chunk-files", action="store_true", help="write chunk_N.txt files instead of a page store")
+    parser.add_argument("--workers", type=int, default=1, help="processes for page extraction and cleaning")
+    parser.add_argument("--split-only", action="store_true", help="write the chunk files and stop")
+    parser.add_argument("--batch-chunks", type=int, default=4,
+                        help="chunks summarized together; each group is stored and checkpointed before the next")
+    parser.add_argument("--stream", action="store_true", help="extract, summarize and store page by page with overlapping stages")
+    parser.add_argument("--keep-chunks", action="store_true", help="with --stream, still write chunk files")
+    parser.add_argument("--layout", action="store_true",
+                        help="find articles from block layout and font sizes instead of blank lines")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST_PATH, help="progress manifest used to resume and skip unchanged work")
+    parser.add_argument("--no-manifest", action="store_true", help="redo every page and chunk")
+    dedup_index.add_arguments(parser)
+    extractive.add_arguments(parser)
+    summarizer_backends.add_arguments(parser)
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.configure(args, run_name=f"2text_fixed {args.pdf_file}")
+    summarizer_backends.configure(args)
+    cascade = extractive.from_args(args)
+
+    manifest, version = None, None
+    if not args.no_manifest:
+        from summrizer import pipeline_version
+        manifest = Manifest(args.manifest)
+        version = f"{pipeline_version(cascade)}-{args.pages_per_chunk}" + ("-layout" if args.layout else "")
+
+    dedup, duplicates = (None, "reuse") if args.split_only else dedup_index.from_args(args)
+    if args.stream:
+        from stream_pipeline import stream_pdf
+        from summary_cache import SummaryCache
+
+        cache = SummaryCache()
+        stats = stream_pdf(args.pdf_file, pages_per_chunk=args.pages_per_chunk,
+                           chunks_dir=args.chunks_dir if args.keep_chunks else None, cache=cache,
+                           workers=args.workers, dedup=dedup, duplicates=duplicates, manifest=manifest, version=version, cascade=cascade,
+                           layout=args.layout)
+        print(f"✅ Streamed {stats['pages']} page(s), {stats['summaries']} summaries "
+              f"(first stored after {stats['first_stored_s']}s, total {stats['elapsed_s']}s)")
+        cache.close()
+        if cascade:
+            print(f"🪜 Summary policy: {cascade.stats()}")
+        if manifest:
+            print(f"📒 Manifest: {manifest.stats()}")
+            manifest.close()
+        instrumentation.finish(args.trace)
+        raise SystemExit(0)
+
+    store_path = None if args.chunk_files else args.store or os.path.join(args.chunks_dir, "pages.jsonl")
+    if store_path:
+        split_pdf_to_store(args.pdf_file, store_path, pages_per_chunk=args.pages_per_chunk, workers=args.workers,
+                           manifest=manifest, version=version, layout=args.layout)
+    else:
+        split_pdf_to_chunks(args.pdf_file, pages_per_chunk=args.pages_per_chunk, output_dir=args.chunks_dir, workers=args.workers,
+                            manifest=manifest, version=version, layout=args.layout)
+    if args.split_only:
+        instrumentation.finish(args.trace)
+        raise SystemExit(0)
 
     # === Summarizer Integration ===
-    from summrizer import process_file, save_to_mongodb
-
-    chunks_dir = "chunks"
-    for filename in sorted(os.listdir(chunks_dir)):
-        if filename.endswith(".txt"):
-            file_path = os.path.join(chunks_dir, filename)
-            print(f"🧠 Summarizing {file_path}...")
-            summaries = process_file(file_path)
-            save_to_mongodb(summaries, input_path=file_path)
-            print(f"✅ Summarized and saved: {filename}")
+    from summrizer import complete, process_files, save_to_mongodb
+    from mongo_writer import close_writers, flush_writers
+    from summary_cache import SummaryCache
+
+    if store_path:
+        with PageStore(store_path) as store:
+            chunk_paths = store.chunk_refs(args.pages_per_chunk)
+    else:
+        chunks_dir = args.chunks_dir
+        chunk_paths = [os.path.join(chunks_dir, filename) for filename in sorted(os.listdir(chunks_dir)) if filename.endswith(".txt")]
+    hashes = {file_path: chunk_hash(file_path) for file_path in chunk_paths}
+    if manifest:
+        # Chunks already stored with the same text and pipeline version are done
+        done = [p for p in chunk_paths if manifest.done(item_key("chunk", p), hashes[p], "stored", version)]
+        chunk_paths = [p for p in chunk_paths if p not in done]
+        if done:
+            print(f"⏭️ Skipping {len(done)} chunk(s) already stored")
+    print(f"🧠 Summarizing {len(chunk_paths)} chunk(s), {args.batch_chunks} at a time...")
+    cache = SummaryCache()
+    stored = True
+    group_size = max(1, args.batch_chunks)
+    for start in range(0, len(chunk_paths), group_size):
+        # Each group is cached, written to MongoDB and checkpointed before the
+        # next starts, so a crash only redoes the group it interrupted
+        group = chunk_paths[start:start + group_size]
+        group_stored, finished = True, []
+        for file_path, summaries in process_files(group, cache=cache, dedup=dedup, duplicates=duplicates,
+                                                  cascade=cascade).items():
+            group_stored = save_to_mongodb(summaries, input_path=file_path, flush=False) and group_stored
+            # Chunks with budget fallbacks are stored but left for the next run to redo
+            if complete(summaries):
+                finished.append(file_path)
+                if manifest:
+                    manifest.mark(item_key("chunk", file_path), "chunk", hashes[file_path], "summarized", version)
+            print(f"✅ Summarized and queued: {os.path.basename(file_path)}")
+        group_stored = flush_writers() and group_stored
+        if manifest and group_stored:
+            manifest.mark_many([(item_key("chunk", p), hashes[p]) for p in finished], "chunk", "stored", version)
+        stored = stored and group_stored and len(finished) == len(group)
+    close_writers()
+    if manifest:
+        if stored:
+            manifest.mark(item_key("pdf", args.pdf_file), "pdf", file_hash(args.pdf_file), "stored", version)
+        print(f"📒 Manifest: {manifest.stats()}")
+        manifest.close()
+    print(f"🗃️ Cache stats: {cache.stats()}")
+    cache.close()
+    if cascade:
+        print(f"🪜 Summary policy: {cascade.stats()}")
+    instrumentation.finish(args.trace)
@@ -0,0 +1,160 @@
+import json
+import os
+import platform
+import random
+import statistics
+import time
+from collections import Counter
+from datetime import datetime
+
+from bench_pipeline import git_revision
+from synthetic_pdf import make_article
+
+# Compares summarizer backends on the same articles: load time, per-batch
+# latency, throughput, and how closely each backend's summaries agree with
+# the fp32 pipeline's (ROUGE F1, fp32 output as the reference). With --tiny
+# it runs offline on a randomly initialised BART (see tiny_bart.py).
+
+GENERATION = {"max_length": 60, "min_length": 10, "num_beams": 2, "do_sample": False}
+
+# === ROUGE-style agreement ===
+def _ngrams(tokens, n):
+    return Counter(tuple(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+
+def _f1(overlap, candidate, reference):
+    if not overlap:
+        return 0.0
+    precision, recall = overlap / candidate, overlap / reference
+    return 2 * precision * recall / (precision + recall)
+
+def rouge_n(candidate, reference, n):
+    cand, ref = _ngrams(candidate.lower().split(), n), _ngrams(reference.lower().split(), n)
+    return _f1(sum((cand & ref).values()), sum(cand.values()), sum(ref.values()))
+
+def rouge_l(candidate, reference):
+    cand, ref = candidate.lower().split(), reference.lower().split()
+    if not cand or not ref:
+        return float(cand == ref)
+    # Longest common subsequence, one row at a time
+    previous = [0] * (len(ref) + 1)
+    for token in cand:
+        current = [0]
+        for j, ref_token in enumerate(ref):
+            current.append(previous[j] + 1 if token == ref_token else max(previous[j + 1], current[j]))
+        previous = current
+    return _f1(previous[-1], len(cand), len(ref))
+
+def agreement(candidates, references):
+    scores = {"rouge1": [], "rouge2": [], "rougeL": [], "exact": []}
+    for candidate, reference in zip(candidates, references):
+        scores["rouge1"].append(rouge_n(candidate, reference, 1))
+        scores["rouge2"].append(rouge_n(candidate, reference, 2))
+        scores["rougeL"].append(rouge_l(candidate, reference))
+        scores["exact"].append(float(candidate.strip() == reference.strip()))
+    return {name: round(statistics.mean(values), 4) if values else None for name, values in scores.items()}
+
+# === Timing ===
+def synthetic_articles(count, seed=0):
+    rng = random.Random(seed)
+    return [" ".join(make_article(rng, sentences=(8, 20))[1]) for _ in range(count)]
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+def time_backend(name, model_name, articles, batch_size=4, threads=None, warmup=1):
+    from summarizer_backends import load_backend
+
+    start = time.perf_counter()
+    summarizer = load_backend(name, model_name, threads=threads)
+    load_s = time.perf_counter() - start
+
+    batches = [articles[i:i + batch_size] for i in range(0, len(articles), batch_size)]
+    for batch in batches[:warmup]:
+        summarizer(batch, **GENERATION)
+
+    outputs, latencies = [], []
+    start = time.perf_counter()
+    for batch in batches:
+        batch_start = time.perf_counter()
+        outputs.extend(result["summary_text"] for result in summarizer(batch, **GENERATION))
+        latencies.append(time.perf_counter() - batch_start)
+    total = time.perf_counter() - start
+    print(f"  {name:<10} load {load_s:7.2f}s  {len(articles) / total:7.2f} article(s)/s")
+    return outputs, {
+        "load_s": round(load_s, 3),
+        "total_s": round(total, 3),
+        "batches": len(batches),
+        "batch_ms_mean": round(statistics.mean(latencies) * 1000, 2),
+        "batch_ms_p50": round(_percentile(latencies, 0.5) * 1000, 2),
+        "batch_ms_p95": round(_percentile(latencies, 0.95) * 1000, 2),
+        "articles_per_s": round(len(articles) / total, 3),
+    }
+
+def run_benchmark(model_name, backends=("pipeline", "int8", "onnx"), articles=16, batch_size=4, threads=None, seed=0):
+    from summarizer_backends import onnx_available
+
+    texts = synthetic_articles(articles, seed)
+    # fp32 runs first: it is the baseline and the reference for agreement
+    order = ["pipeline"] + [name for name in backends if name != "pipeline"]
+    results, reference = {}, None
+    for name in order:
+        if name == "onnx" and not onnx_available():
+            results[name] = {"skipped": "optimum[onnxruntime] not installed"}
+            print(f"  {name:<10} skipped")
+            continue
+        outputs, stats = time_backend(name, model_name, texts, batch_size=batch_size, threads=threads)
+        if reference is None:
+            reference = outputs
+        else:
+            stats["speedup"] = round(results["pipeline"]["total_s"] / stats["total_s"], 3)
+        stats["agreement_vs_fp32"] = agreement(outputs, reference)
+        results[name] = stats
+
+    return {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "git": git_revision(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "model": model_name,
+            "articles": articles,
+            "batch_size": batch_size,
+            "threads": threads,
+            "seed": seed,
+            "generation": GENERATION,
+        },
+        "backends": results,
+    }
+
+if __name__ == "__main__":
+    import argparse
+    from summarizer_backends import BACKENDS
+    parser = argparse.ArgumentParser(description="Latency, throughput and fp32 agreement of each summarizer backend")
+    parser.add_argument("--model", default=None, help="model name or path (default: SUMMARIZER_MODEL / bart-large-cnn)")
+    parser.add_argument("--tiny", action="store_true", help="build and use a tiny random BART instead (offline)")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--articles", type=int, default=16)
+    parser.add_argument("--batch-size", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON result here as well")
+    args = parser.parse_args()
+
+    if args.tiny:
+        from tiny_bart import make_tiny_bart
+        model_name = make_tiny_bart(".tiny_bart", seed=args.seed)
+    else:
+        import models
+        model_name = args.model or models.MODEL_NAME
+
+    print(f"⏱️ Benchmarking {', '.join(args.backends)} on {args.articles} article(s) with {model_name}")
+    result = run_benchmark(model_name, backends=args.backends, articles=args.articles, batch_size=args.batch_size,
+                           threads=args.threads, seed=args.seed)
+    report = json.dumps(result, indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+        print(f"✅ Results saved to {args.output}")
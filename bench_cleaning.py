@@ -0,0 +1,113 @@
+import random
+import re
+import time
+
+import text_cleaning
+from synthetic_pdf import make_sentence
+
+# Times the compiled cleaning plans against the old per-module
+# clean_article_text copies; test_text_cleaning.py (with its own frozen
+# copies) checks they agree.
+
+# === Previous Implementations ===
+def legacy_clean_page_text(text):
+    # 2text_fixed.py / all_pages.py
+    text = re.sub(r'(\w+)-\s*\n\s*(\w+)', r'\1\2', text)
+    text = re.sub(r'(\w+)-\s+(\w+)', r'\1\2', text)
+    replacements = {
+        "fve": "five", "frst": "first", "cofict": "conflict", "fnanciers": "financiers",
+        "ofcial": "official", "Afairs": "Affairs", "fghting": "fighting", "afected": "affected",
+        "fagged of": "flagged off", "safron ag": "saffron flag", "ash oods": "flash floods",
+        "signi cant": "significant", "multipolar": "multipolar", "advantagevance": "advance",
+        "To-ophobicbago": "Trinidad and Tobago", "Na-ophobicmibia": "Namibia"
+    }
+    for wrong, correct in replacements.items():
+        text = text.replace(wrong, correct)
+    text = re.sub(r'[^\x00-\x7F]+', ' ', text)
+    text = re.sub(r'^\s*(A IN-X|YK|INSIDE|PAGE \d+|NEW DELHI|SRINAGAR|CHENNAI|KOLKATA)\s*$', '', text, flags=re.MULTILINE)
+    text = re.sub(r'[ \t]{2,}', ' ', text)
+    text = re.sub(r'\n\s*\n+', '\n\n-----\n\n', text)
+    return text.strip()
+
+def legacy_clean_article_text(text):
+    # summrizer.py
+    junk_patterns = [
+        r"(?i)^follow us.*",
+        r"https?://\S+",
+        r"(?i)vol\.\s*\d+\s*no\.\s*\d+",
+        r"(?i)^page\s+\d+",
+    ]
+    for pattern in junk_patterns:
+        text = re.sub(pattern, '', text)
+    text = re.sub(r"\n{2,}", '\n', text)
+    text = re.sub(r"[ \t]{2,}", ' ', text)
+    typo_fixes = {
+        "no-fy": "no-fly", "kick of": "kick off", "fowers": "flowers", "s Ganderbal": "’s Ganderbal",
+        "oors": "floors", "oicials": "officials", "overthe": "over the", "arrangement,which": "arrangement, which"
+    }
+    for wrong, correct in typo_fixes.items():
+        text = text.replace(wrong, correct)
+    return text.strip()
+
+# === Corpus ===
+NOISE = ["  ", "\t", "\n", "\n\n", "\n \n\n", " \t ", "é", "’", "multi-\npolar", "state- wide",
+         "YK", "\nINSIDE\n", "\nPAGE 4\n", "\nNEW DELHI\n", "http://example.com/a", "Vol. 12 No. 3",
+         "Follow us on X", "page 7"]
+
+def make_page(rng, keys):
+    parts = []
+    for _ in range(rng.randint(20, 60)):
+        parts.append(make_sentence(rng))
+        if rng.random() < 0.3:
+            parts.append(rng.choice(NOISE))
+        if rng.random() < 0.2:
+            parts.append(rng.choice(keys))
+    return " ".join(parts)
+
+def fuzz_string(rng, alphabet, length=80):
+    return "".join(rng.choice(alphabet) for _ in range(rng.randint(0, length)))
+
+def make_corpus(rng, pages=400):
+    rules = text_cleaning.load_rules()
+    keys = list(rules["page_replacements"]) + list(rules["article_replacements"])
+    return [make_page(rng, keys) for _ in range(pages)]
+
+def timeit(fn, texts, repeats=5):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for text in texts:
+            fn(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def bench_large_table(rng, texts, sizes=(16, 1000, 5000)):
+    # Sequential str.replace grows linearly with the table; one trie scan barely
+    # moves. Tables up to CHAIN_MAX_KEYS are chained by literal_pass too.
+    for size in sizes:
+        table = {"".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(5, 12))): "x" for _ in range(size)}
+        compiled = text_cleaning.literal_pass(table)
+
+        def sequential(text):
+            for wrong, correct in table.items():
+                text = text.replace(wrong, correct)
+            return text
+
+        sample = texts[:50]
+        mode = "chained" if size <= text_cleaning.CHAIN_MAX_KEYS else "trie scan"
+        print(f"  {size:>5} entries: str.replace loop {timeit(sequential, sample, 3) * 1000:8.1f} ms, "
+              f"literal_pass ({mode}) {timeit(compiled, sample, 3) * 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    corpus = make_corpus(rng)
+    size_kb = sum(len(t) for t in corpus) / 1024
+    print(f"⏱️ {len(corpus)} pages, {size_kb:.0f} KiB")
+    for name, old, new in [("page", legacy_clean_page_text, text_cleaning.clean_page_text),
+                           ("article", legacy_clean_article_text, text_cleaning.clean_article_text)]:
+        old_s, new_s = timeit(old, corpus), timeit(new, corpus)
+        print(f"  {name:<8} legacy {old_s * 1000:7.1f} ms  compiled {new_s * 1000:7.1f} ms  x{old_s / new_s:.2f}")
+
+    print("⏱️ Typo table size")
+    bench_large_table(rng, corpus)
@@ -0,0 +1,151 @@
+import json
+import os
+import platform
+import random
+import time
+from datetime import datetime
+
+from bench_backends import agreement
+from bench_pipeline import git_revision
+from synthetic_pdf import make_article
+
+# Per-article cost of the two abstractive generation modes on the same
+# articles: the per-request path (heading, every bullet window and the
+# paragraph each run through the encoder) and the experimental shared encoder
+# pass (each bullet window encoded once, bullets and paragraph decoded from
+# those states). Reports wall /
+# CPU time and encoder tokens per article, and how close the shared mode's
+# outputs stay to the per-request ones. With --tiny it runs offline on a
+# randomly initialised BART (see tiny_bart.py); --stub-model needs no torch.
+
+MODES = ("per_request", "shared_encoder")
+
+def synthetic_articles(count, sentences=(12, 40), seed=0):
+    rng = random.Random(seed)
+    return [" ".join(make_article(rng, sentences=sentences)[1]) for _ in range(count)]
+
+def encoder_tokens(summary, mode):
+    # Per-request: every BART call encodes its input. Shared: only bart_encode does.
+    if mode == "shared_encoder":
+        return summary.get("bart_encode", {}).get("input_tokens", 0)
+    return sum(row["input_tokens"] for name, row in summary.items() if name.startswith("bart_"))
+
+def run_mode(mode, analyses, batch_size):
+    import instrumentation
+    import summrizer
+    summarize = summrizer.summarize_shared_encoder if mode == "shared_encoder" else summrizer.summarize_articles_batched
+
+    tracer = instrumentation.enable_tracing(f"bench_encoder:{mode}")
+    start, cpu_start = time.perf_counter(), time.process_time()
+    try:
+        results = summarize(analyses, batch_size=batch_size)
+    finally:
+        instrumentation.disable_tracing()
+    wall, cpu = time.perf_counter() - start, time.process_time() - cpu_start
+
+    summary = tracer.summary()
+    n = len(analyses)
+    stats = {
+        "total_s": round(wall, 3),
+        "ms_per_article": round(wall * 1000 / n, 2),
+        "cpu_ms_per_article": round(cpu * 1000 / n, 2),
+        "encoder_tokens_per_article": round(encoder_tokens(summary, mode) / n, 1),
+        "model_calls": sum(row["calls"] for name, row in summary.items() if name.startswith("bart_")),
+        "stages_ms": {name: row["wall_ms"] for name, row in sorted(summary.items()) if name.startswith("bart_")},
+    }
+    print(f"  {mode:<15} {stats['ms_per_article']:9.2f} ms/article  "
+          f"{stats['encoder_tokens_per_article']:8.1f} encoder token(s)/article")
+    return results, stats
+
+def run_benchmark(articles=16, sentences=(12, 40), batch_size=8, seed=0):
+    import summrizer
+
+    texts = synthetic_articles(articles, sentences, seed)
+    analyses = summrizer.tokenize_sentences(summrizer.analyze_articles(texts, cleaned=True))
+    # Warm both paths (lazy loads, first-call allocations) on one article
+    for mode in MODES:
+        run_mode(mode, analyses[:1], batch_size)
+
+    outputs, results = {}, {}
+    for mode in MODES:
+        outputs[mode], results[mode] = run_mode(mode, analyses, batch_size)
+
+    base, shared = results["per_request"], results["shared_encoder"]
+    saving = {
+        "wall": round(1 - shared["total_s"] / base["total_s"], 4) if base["total_s"] else None,
+        "encoder_tokens": round(1 - shared["encoder_tokens_per_article"] / base["encoder_tokens_per_article"], 4)
+        if base["encoder_tokens_per_article"] else None,
+        "ms_per_article": round(base["ms_per_article"] - shared["ms_per_article"], 2),
+    }
+    # Shared-mode paragraphs read only the first bullet window, so they are
+    # not expected to match the per-request outputs exactly
+    reference, candidate = outputs["per_request"], outputs["shared_encoder"]
+    similarity = {
+        "heading": agreement([s["heading"] for s in candidate], [s["heading"] for s in reference]),
+        "summary_points": agreement([" ".join(s["summary_points"]) for s in candidate],
+                                    [" ".join(s["summary_points"]) for s in reference]),
+        "summary_paragraph": agreement([s["summary_paragraph"] or "" for s in candidate],
+                                       [s["summary_paragraph"] or "" for s in reference]),
+    }
+
+    import models
+    return {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "git": git_revision(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "model": models.summarizer_id(),
+            "articles": articles,
+            "sentences": list(sentences),
+            "batch_size": batch_size,
+            "seed": seed,
+            "mean_article_tokens": round(sum(len(ids) for a in analyses for ids in a.sentence_ids) / len(analyses), 1),
+        },
+        "modes": results,
+        "saving": saving,
+        "agreement_vs_per_request": similarity,
+    }
+
+if __name__ == "__main__":
+    import argparse
+    import models
+    parser = argparse.ArgumentParser(description="Per-article saving of the shared encoder pass over per-request generation")
+    parser.add_argument("--model", default=None, help="model name or path (default: SUMMARIZER_MODEL / bart-large-cnn)")
+    parser.add_argument("--tiny", action="store_true", help="build and use a tiny random BART instead (offline)")
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--stub-model", action="store_true", help="replace BART with a deterministic fake")
+    parser.add_argument("--stub-spacy", action="store_true", help="blank spaCy pipeline instead of en_core_web_sm")
+    parser.add_argument("--call-latency", type=float, default=0.02, help="stub seconds per model call")
+    parser.add_argument("--token-latency", type=float, default=0.0002, help="stub seconds per encoded token")
+    parser.add_argument("--articles", type=int, default=16)
+    parser.add_argument("--min-sentences", type=int, default=12)
+    parser.add_argument("--max-sentences", type=int, default=40)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON result here as well")
+    args = parser.parse_args()
+
+    if args.tiny:
+        from tiny_bart import make_tiny_bart
+        models.configure_summarizer(model_name=make_tiny_bart(".tiny_bart", seed=args.seed), threads=args.threads)
+    else:
+        models.configure_summarizer(model_name=args.model, threads=args.threads)
+    if args.stub_model or args.stub_spacy:
+        import stub_model
+        if args.stub_model:
+            stub_model.install(call_latency=args.call_latency, token_latency=args.token_latency,
+                               stub_spacy=args.stub_spacy)
+        else:
+            models.set_handle("nlp", stub_model.make_stub_nlp())
+
+    print(f"⏱️ Benchmarking {', '.join(MODES)} on {args.articles} article(s)")
+    result = run_benchmark(articles=args.articles, sentences=(args.min_sentences, args.max_sentences),
+                           batch_size=args.batch_size, seed=args.seed)
+    report = json.dumps(result, indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+        print(f"✅ Results saved to {args.output}")
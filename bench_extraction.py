@@ -0,0 +1,36 @@
+import os
+import tempfile
+import time
+
+from page_extraction import extract_pages
+from synthetic_pdf import make_newspaper_pdf
+from text_cleaning import clean_page_text
+
+# Scaling of multi-process page extraction + cleaning on a synthetic edition
+
+def bench(pdf_path, workers, repeats=3):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        pages = extract_pages(pdf_path, workers=workers, clean=clean_page_text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, pages
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark page extraction from 1 to N worker processes")
+    parser.add_argument("--pages", type=int, default=120)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = make_newspaper_pdf(os.path.join(tmp, "synthetic.pdf"), pages=args.pages)
+        print(f"📄 {args.pages} synthetic page(s), {os.cpu_count()} CPU(s)")
+
+        baseline, reference = bench(pdf_path, 1)
+        print(f"  workers=1  {baseline:.3f}s  {args.pages / baseline:.1f} pages/s")
+        for workers in range(2, args.max_workers + 1):
+            elapsed, pages = bench(pdf_path, workers)
+            assert pages == reference, "page text differs from the single-process run"
+            print(f"  workers={workers:<2} {elapsed:.3f}s  {args.pages / elapsed:.1f} pages/s  x{baseline / elapsed:.2f}")
@@ -0,0 +1,148 @@
+import importlib
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+
+from synthetic_pdf import make_newspaper_pdf
+
+# End-to-end, per-stage benchmark on a synthetic edition. Emits one JSON
+# document per run so results can be diffed over time. With --stub-model
+# (and --stub-spacy where en_core_web_sm isn't installed) it runs fully offline.
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+class StageTimer:
+    def __init__(self):
+        self.stages = {}
+
+    def run(self, name, fn, items):
+        start = time.perf_counter()
+        cpu_start = time.process_time()
+        result = fn()
+        wall = time.perf_counter() - start
+        n_items = items(result) if callable(items) else items
+        self.stages[name] = {
+            "wall_s": round(wall, 4),
+            "cpu_s": round(time.process_time() - cpu_start, 4),
+            "items": n_items,
+            "items_per_s": round(n_items / wall, 2) if wall else None,
+            "ms_per_item": round(wall * 1000 / n_items, 3) if n_items else None,
+        }
+        print(f"  {name:<24} {wall:8.3f}s  {n_items:>6} item(s)")
+        return result
+
+def run_benchmark(pages=8, columns=3, seed=0, batch_size=8, workers=1, stub_model=False,
+                  call_latency=0.05, token_latency=0.0002, stub_spacy=False):
+    if stub_model:
+        import stub_model as stub
+        stub.install(call_latency=call_latency, token_latency=token_latency, stub_spacy=stub_spacy)
+
+    import summrizer
+    from idf_index import IDFIndex
+    from mongo_writer import MongoWriter
+    from page_extraction import extract_pages
+    from text_cleaning import clean_article_text, clean_page_text
+
+    timer = StageTimer()
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = timer.run("synthetic_pdf", lambda: make_newspaper_pdf(os.path.join(tmp, "edition.pdf"), pages=pages,
+                                                                       columns=columns, seed=seed), pages)
+
+        # === Extraction ===
+        raw_pages = timer.run("extract_raw", lambda: extract_pages(pdf_path, workers=workers), len)
+        timer.run("extract_all_pages", lambda: importlib.import_module("all_pages").extract_and_clean_all_pages(
+            pdf_path, os.path.join(tmp, "all_pages_cleaned.txt"), workers=workers), pages)
+        timer.run("extract_2text_chunks", lambda: importlib.import_module("2text_fixed").split_pdf_to_chunks(
+            pdf_path, output_dir=os.path.join(tmp, "chunks"), workers=workers), pages)
+        timer.run("segment_layout", lambda: importlib.import_module("layout_segmentation").segment_pdf(
+            pdf_path, workers=workers), len)
+
+        # === Text ===
+        cleaned_pages = timer.run("clean_page_text", lambda: [clean_page_text(text) for text in raw_pages], len)
+        articles = timer.run("split_into_articles",
+                             lambda: [a for text in cleaned_pages for a in summrizer.split_into_articles(text)], len)
+        cleaned_articles = timer.run("clean_article_text", lambda: [clean_article_text(a) for a in articles], len)
+
+        # === NLP + Models ===
+        analyses = timer.run("spacy_analyze", lambda: summrizer.analyze_articles(cleaned_articles, cleaned=True), len)
+        index = IDFIndex(os.path.join(tmp, "idf.json"))
+        timer.run("hashtags", lambda: summrizer.generate_hashtags_batch(analyses, index=index), len)
+        summaries = timer.run("summarization", lambda: summrizer.summarize_articles_batched(analyses, batch_size=batch_size), len)
+
+        # === Storage ===
+        entries = [summrizer.build_entry(a.text, dict(s, hashtags=[])) for a, s in zip(analyses, summaries)]
+        entries = [entry for entry in entries if entry]
+        client = mongo_standin()
+
+        def write():
+            writer = MongoWriter(client=client, batch_size=500)
+            writer.save(entries, input_path=pdf_path)
+            writer.close()
+            return writer.stats()
+
+        timer.run("mongo_write", write, len(entries))
+
+    return {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "git": git_revision(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "pages": pages,
+            "columns": columns,
+            "seed": seed,
+            "batch_size": batch_size,
+            "workers": workers,
+            "stub_model": stub_model,
+            "stub_spacy": stub_spacy,
+            "call_latency": call_latency if stub_model else None,
+            "token_latency": token_latency if stub_model else None,
+            "articles": len(articles),
+            "summaries": len(entries),
+        },
+        "stages": timer.stages,
+    }
+
+def mongo_standin():
+    # In-process stand-in for a local mongod
+    try:
+        import mongomock
+    except ImportError:
+        raise RuntimeError("Run: pip install mongomock")
+    return mongomock.MongoClient()
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Per-stage pipeline benchmark on a synthetic newspaper PDF")
+    parser.add_argument("--pages", type=int, default=8)
+    parser.add_argument("--columns", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--stub-model", action="store_true", help="replace BART with a deterministic fake")
+    parser.add_argument("--stub-spacy", action="store_true", help="blank spaCy pipeline instead of en_core_web_sm")
+    parser.add_argument("--call-latency", type=float, default=0.05, help="stub seconds per model call")
+    parser.add_argument("--token-latency", type=float, default=0.0002, help="stub seconds per input token")
+    parser.add_argument("--output", help="write the JSON result here as well")
+    args = parser.parse_args()
+
+    print(f"⏱️ Benchmarking {args.pages} synthetic page(s)")
+    result = run_benchmark(pages=args.pages, columns=args.columns, seed=args.seed, batch_size=args.batch_size,
+                           workers=args.workers, stub_model=args.stub_model, call_latency=args.call_latency,
+                           token_latency=args.token_latency, stub_spacy=args.stub_spacy)
+    report = json.dumps(result, indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+        print(f"✅ Results saved to {args.output}")
@@ -0,0 +1,207 @@
+import hashlib
+import json
+import os
+import platform
+import random
+import statistics
+import time
+from datetime import date, datetime, timedelta
+
+from bench_pipeline import git_revision, mongo_standin
+from summary_queries import SORT
+from synthetic_pdf import CITIES, WORDS, make_sentence
+
+# Seeds a summaries collection with synthetic documents shaped like
+# mongo_writer.build_document's, then times the dashboard queries in
+# summary_queries.py: first page, a keyset walk to --pages deep against
+# skip/limit at the same depth, and page size with and without article_text.
+# Runs against the in-process stand-in by default; pass --mongo-uri for a real
+# mongod, where explain() also reports the plan and keys/documents examined.
+# The stand-in has no query planner (every query is a scan) and no $text, so
+# its timings show the query shapes' overhead, not index speedups.
+
+NEWSPAPERS = ("The Hindu", "The Hindu BusinessLine", "Frontline")
+HASHTAGS = [f"#{word}" for word in WORDS]
+SEED_BATCH = 10000
+
+def synthetic_summaries(count, seed=0, days=3 * 365, texts=64):
+    # article_text comes from a small pool so a million documents fit in memory
+    rng = random.Random(seed)
+    pool = [" ".join(make_sentence(rng) for _ in range(rng.randint(15, 40))) for _ in range(texts)]
+    start = date(2022, 1, 1)
+    for i in range(count):
+        heading = " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 9))).capitalize()
+        yield {
+            "_id": hashlib.md5(f"{seed}:{i}".encode()).hexdigest(),
+            "heading": heading,
+            "summary_points": [make_sentence(rng, 8, 16) for _ in range(rng.randint(2, 5))],
+            "summary_paragraph": make_sentence(rng, 30, 60),
+            "hashtags": rng.sample(HASHTAGS, rng.randint(1, 5)),
+            "article_text": pool[i % texts],
+            "source_file": f"chunks/pages.jsonl#pages={i % 40 + 1}-{i % 40 + 2}",
+            "timestamp": datetime(2024, 1, 1) + timedelta(seconds=i),
+            "summary_method": "abstractive",
+            "newspaper": rng.choice(NEWSPAPERS),
+            # A few summaries have no parsed date, as in real editions
+            "date": None if rng.random() < 0.01 else str(start + timedelta(days=rng.randrange(days))),
+            "city": rng.choice(CITIES) if rng.random() < 0.9 else None,
+        }
+
+def seed_collection(collection, count, seed=0):
+    start = time.perf_counter()
+    batch = []
+    for doc in synthetic_summaries(count, seed):
+        batch.append(doc)
+        if len(batch) == SEED_BATCH:
+            collection.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        collection.insert_many(batch, ordered=False)
+    return time.perf_counter() - start
+
+def query_shapes(seed=0):
+    rng = random.Random(seed + 1)
+    return {
+        "latest": {},
+        "city": {"city": rng.choice(CITIES)},
+        "newspaper_date_range": {"newspaper": NEWSPAPERS[0], "date_from": "2023-01-01", "date_to": "2023-06-30"},
+        "hashtag": {"hashtags": rng.choice(HASHTAGS)},
+        "city_two_hashtags": {"city": rng.choice(CITIES), "hashtags": rng.sample(HASHTAGS, 2)},
+        "text_search": {"text": " ".join(rng.sample(WORDS, 2))},
+    }
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, round((time.perf_counter() - start) * 1000, 2)
+
+def _bson_bytes(docs):
+    import bson
+    return sum(len(bson.encode(doc)) for doc in docs)
+
+def _explain(collection, query, fields, limit, skip=0):
+    # Winning plan and work done, where the server can explain; None on the stand-in
+    cursor = collection.find(query, fields).sort(SORT).skip(skip).limit(limit)
+    if not hasattr(cursor, "explain"):
+        return None
+    stats = cursor.explain().get("executionStats", {})
+    plan = stats.get("executionStages", {})
+    stages = []
+    while plan:
+        stages.append(plan.get("stage") + (f"({plan['indexName']})" if plan.get("indexName") else ""))
+        plan = plan.get("inputStage") or (plan.get("inputStages") or [None])[0]
+    return {"plan": " <- ".join(stages), "keys_examined": stats.get("totalKeysExamined"),
+            "docs_examined": stats.get("totalDocsExamined"), "returned": stats.get("nReturned")}
+
+def bench_shape(collection, name, filters, pages=5, limit=20):
+    from summary_queries import find_summaries, projection, search_summaries, summary_filter
+
+    if "text" in filters:
+        run = lambda **kwargs: search_summaries(collection, filters["text"], limit=limit, **kwargs)
+        query = {"$text": {"$search": filters["text"]}}
+    else:
+        run = lambda **kwargs: find_summaries(collection, limit=limit, **filters, **kwargs)
+        query = summary_filter(**filters)
+
+    try:
+        first, first_ms = _timed(run)
+    except NotImplementedError as e:
+        print(f"  {name:<22} skipped ({e})")
+        return {"skipped": str(e)}
+    with_text, with_text_ms = _timed(lambda: run(with_text=True))
+
+    # Keyset: follow "next" page by page; skip/limit: jump straight to the same depth
+    page, page_ms = first, []
+    for _ in range(pages - 1):
+        if page["next"] is None:
+            break
+        page, ms = _timed(lambda: run(after=page["next"]))
+        page_ms.append(ms)
+    depth = len(page_ms) + 1
+    skipped, skip_ms = _timed(lambda: list(collection.find(query, projection()).sort(SORT)
+                                           .skip((depth - 1) * limit).limit(limit)))
+    same = [doc["_id"] for doc in skipped] == [doc["_id"] for doc in page["items"]]
+
+    result = {
+        "filters": filters,
+        "first_page_ms": first_ms,
+        "first_page_with_text_ms": with_text_ms,
+        "page_bytes": _bson_bytes(first["items"]),
+        "page_bytes_with_text": _bson_bytes(with_text["items"]),
+        "depth": depth,
+        "keyset_page_ms_mean": round(statistics.mean(page_ms), 2) if page_ms else first_ms,
+        "keyset_page_ms_at_depth": page_ms[-1] if page_ms else first_ms,
+        "skip_page_ms_at_depth": skip_ms,
+        "keyset_matches_skip": same,
+    }
+    if "text" not in filters:
+        fields = projection()
+        result["explain_keyset"] = _explain(collection, query, fields, limit)
+        result["explain_skip"] = _explain(collection, query, fields, limit, skip=(depth - 1) * limit)
+    print(f"  {name:<22} first {first_ms:9.2f} ms  keyset@{depth} {result['keyset_page_ms_at_depth']:9.2f} ms  "
+          f"skip@{depth} {skip_ms:9.2f} ms  {result['page_bytes']:>7} B/page ({result['page_bytes_with_text']} with text)")
+    return result
+
+def run_benchmark(docs=1_000_000, pages=5, limit=20, seed=0, mongo_uri=None, db_name="bench_queries",
+                  keep=False):
+    from summary_queries import ensure_indexes
+
+    if mongo_uri:
+        from pymongo import MongoClient
+        client = MongoClient(mongo_uri, serverSelectionTimeoutMS=3000)
+    else:
+        client = mongo_standin()
+    collection = client[db_name]["summaries"]
+    collection.drop()
+
+    try:
+        print(f"🌱 Seeding {docs} synthetic summaries")
+        seed_s = seed_collection(collection, docs, seed)
+        _, index_ms = _timed(lambda: ensure_indexes(collection))
+        shapes = {name: bench_shape(collection, name, filters, pages=pages, limit=limit)
+                  for name, filters in query_shapes(seed).items()}
+    finally:
+        if not keep:
+            collection.drop()
+        client.close()
+
+    return {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "git": git_revision(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "backend": "mongod" if mongo_uri else "mongomock",
+            "docs": docs,
+            "pages": pages,
+            "limit": limit,
+            "seed": seed,
+            "seed_s": round(seed_s, 2),
+            "ensure_indexes_ms": index_ms,
+        },
+        "queries": shapes,
+    }
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Seed synthetic summaries and time the indexed, keyset-paginated queries")
+    parser.add_argument("--docs", type=int, default=1_000_000)
+    parser.add_argument("--pages", type=int, default=5, help="how deep to walk with keyset cursors")
+    parser.add_argument("--limit", type=int, default=20, help="page size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mongo-uri", help="benchmark a real mongod (default: in-process stand-in)")
+    parser.add_argument("--db", default="bench_queries", help="scratch database, dropped afterwards")
+    parser.add_argument("--keep", action="store_true", help="keep the seeded collection")
+    parser.add_argument("--output", help="write the JSON result here as well")
+    args = parser.parse_args()
+
+    print(f"⏱️ Benchmarking summary queries on {args.mongo_uri or 'mongomock'}")
+    result = run_benchmark(docs=args.docs, pages=args.pages, limit=args.limit, seed=args.seed,
+                           mongo_uri=args.mongo_uri, db_name=args.db, keep=args.keep)
+    report = json.dumps(result, indent=2, default=str)
+    print(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+        print(f"✅ Results saved to {args.output}")
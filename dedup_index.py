@@ -0,0 +1,195 @@
+import os
+import re
+import threading
+import zlib
+
+import numpy as np
+
+DEFAULT_DEDUP_PATH = os.environ.get("DEDUP_INDEX_PATH", ".dedup_index.npz")
+# Articles are indexed by the content hash of their cleaned text (2); indexes
+# keyed by summary cache keys (no marker) are started over
+KEY_SCHEME = 2
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_WORD = re.compile(r"\w+")
+
+def shingles(text, size=5):
+    # Lowercased word n-grams; texts shorter than one shingle become a single one
+    words = _WORD.findall(text.lower())
+    if len(words) <= size:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+def lsh_params(threshold, num_perm):
+    # (bands, rows) whose S-curve midpoint (1/b)^(1/r) sits closest to the
+    # threshold without going above it; candidates are verified afterwards
+    options = [(b, num_perm // b) for b in range(1, num_perm + 1)]
+    below = [(b, r) for b, r in options if (1 / b) ** (1 / r) <= threshold] or options
+    return max(below, key=lambda br: ((1 / br[0]) ** (1 / br[1]), br[0] * br[1]))
+
+# === Near-duplicate Index ===
+class DedupIndex:
+    # MinHash signatures of every article seen so far, banded for LSH lookups.
+    # Exact copies share a content hash; near copies match when the estimated
+    # Jaccard similarity of their word shingles reaches threshold.
+    def __init__(self, path=DEFAULT_DEDUP_PATH, threshold=0.8, num_perm=128, shingle_size=5, seed=1):
+        self.path = path
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.seed = seed
+        self.lock = threading.Lock()
+
+        rng = np.random.RandomState(seed)
+        self.perm_a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self.perm_b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+
+        self.keys = []
+        self.rows_by_key = {}
+        # Grown by doubling; only the first len(self.keys) rows are used
+        self._signatures = np.zeros((64, num_perm), dtype=np.uint32)
+        self.buckets = [{} for _ in range(self.bands)]
+        self.pending = set()
+        self.checked = 0
+        self.duplicates = 0
+        if path and os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        data = np.load(self.path, allow_pickle=False)
+        settings = data["settings"].tolist()
+        if settings != [self.num_perm, self.shingle_size, self.seed, KEY_SCHEME]:
+            print(f"⚠️ {self.path} was built with different MinHash settings, starting a new index")
+            return
+        for key, signature in zip(data["keys"].tolist(), data["signatures"]):
+            self._add(key, signature)
+
+    @property
+    def signatures(self):
+        return self._signatures[:len(self.keys)]
+
+    def signature(self, text):
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles(text, self.shingle_size)), dtype=np.uint64)
+        # Overflow in a * h wraps around, which is fine for a hash family
+        with np.errstate(over="ignore"):
+            permuted = (self.perm_a[:, None] * hashes[None, :] + self.perm_b[:, None]) % _MERSENNE_PRIME
+        return (permuted & _MAX_HASH).min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature):
+        return [signature[b * self.rows:(b + 1) * self.rows].tobytes() for b in range(self.bands)]
+
+    def _add(self, key, signature):
+        row = len(self.keys)
+        if row == len(self._signatures):
+            self._signatures = np.concatenate([self._signatures, np.zeros_like(self._signatures)])
+        self._signatures[row] = signature
+        self.keys.append(key)
+        self.rows_by_key[key] = row
+        for bucket, band in zip(self.buckets, self._band_keys(signature)):
+            bucket.setdefault(band, []).append(row)
+
+    def query(self, key, signature):
+        # (key of another indexed article, estimated similarity), or None. An
+        # article's own entry (same content, e.g. on a rerun) never counts.
+        own = self.rows_by_key.get(key)
+        candidates = {row for bucket, band in zip(self.buckets, self._band_keys(signature)) for row in bucket.get(band, ())}
+        candidates.discard(own)
+        if not candidates:
+            return None
+        rows = np.fromiter(candidates, dtype=np.int64)
+        similarity = (self._signatures[rows] == signature).mean(axis=1)
+        best = int(np.argmax(similarity))
+        if similarity[best] < self.threshold:
+            return None
+        return self.keys[rows[best]], float(similarity[best])
+
+    def check(self, keys, texts):
+        # One entry per text: the key of the earlier article it duplicates, or
+        # None. Keys are content hashes, so a repeat within the batch points at
+        # its first copy. New articles are indexed right away so later copies
+        # in the batch find them, but stay pending (not saved) until commit().
+        matches, batch = [], set()
+        with self.lock:
+            for key, text in zip(keys, texts):
+                if key in batch:
+                    matches.append(key)
+                    continue
+                batch.add(key)
+                signature = self.signature(text)
+                match = self.query(key, signature)
+                matches.append(match[0] if match else None)
+                if match is None and key not in self.rows_by_key:
+                    self._add(key, signature)
+                    self.pending.add(key)
+            self.checked += len(matches)
+            self.duplicates += sum(match is not None for match in matches)
+        return matches
+
+    def commit(self, keys):
+        # Call once these articles' summaries are cached or stored, so a
+        # crashed run leaves no entries without a summary behind them
+        with self.lock:
+            self.pending.difference_update(keys)
+
+    def discard(self, keys):
+        # Forget the entries among keys that were never committed (no summary
+        # could be cached or stored for them), so they can't shadow later batches
+        with self.lock:
+            dropped = self.pending.intersection(keys)
+            if not dropped:
+                return
+            self.pending -= dropped
+            keep = [row for row, key in enumerate(self.keys) if key not in dropped]
+            entries = [(self.keys[row], self._signatures[row].copy()) for row in keep]
+            self.keys, self.rows_by_key = [], {}
+            self._signatures = np.zeros((max(64, len(entries)), self.num_perm), dtype=np.uint32)
+            self.buckets = [{} for _ in range(self.bands)]
+            for key, signature in entries:
+                self._add(key, signature)
+
+    def stats(self):
+        return {
+            "articles": len(self.keys),
+            "checked": self.checked,
+            "duplicates": self.duplicates,
+            "skip_rate": round(self.duplicates / self.checked, 4) if self.checked else 0.0,
+            "bands": self.bands,
+            "rows": self.rows,
+        }
+
+    def save(self):
+        if not self.path:
+            return
+        with self.lock:
+            rows = [row for row, key in enumerate(self.keys) if key not in self.pending]
+            keys = np.array([self.keys[row] for row in rows], dtype=str)
+            signatures = self.signatures[rows].copy()
+        tmp_path = self.path + ".tmp.npz"
+        np.savez(tmp_path, keys=keys, signatures=signatures,
+                 settings=np.array([self.num_perm, self.shingle_size, self.seed, KEY_SCHEME]))
+        os.replace(tmp_path, self.path)
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_dedup_index(path=DEFAULT_DEDUP_PATH, threshold=0.8):
+    global _index
+    with _index_lock:
+        if _index is None or _index.path != path or _index.threshold != threshold:
+            _index = DedupIndex(path, threshold=threshold)
+    return _index
+
+# === CLI Flags ===
+def add_arguments(parser):
+    parser.add_argument("--dedup-threshold", type=float, default=0.8, help="MinHash similarity that counts as a duplicate")
+    parser.add_argument("--dedup-index", default=DEFAULT_DEDUP_PATH, help="where the duplicate index is kept between runs")
+    parser.add_argument("--skip-duplicates", action="store_true", help="drop duplicates instead of reusing the earlier summary")
+    parser.add_argument("--no-dedup", action="store_true", help="summarize every article, duplicates included")
+
+def from_args(args):
+    # (index or None, duplicates policy) for process_articles
+    if args.no_dedup:
+        return None, "reuse"
+    return get_dedup_index(args.dedup_index, args.dedup_threshold), "skip" if args.skip_duplicates else "reuse"
@@ -1,23 +1,24 @@
-import fitz  # PyMuPDF
-import spacy
 from datetime import datetime
 
-# Load spaCy English model
-try:
-    nlp = spacy.load("en_core_web_sm")
-except OSError:
-    raise RuntimeError("❌ Run: python -m spacy download en_core_web_sm")
+from page_extraction import header_text, HEADER_FRACTION
 
-def extract_first_page_text(pdf_path, output_raw="metadata_raw.txt"):
-    with fitz.open(pdf_path) as doc:
-        first_page_text = doc[0].get_text("text")
+# spaCy loads on first use, not at import
+from models import get_nlp
+
+def extract_first_page_text(pdf_path, output_raw="metadata_raw.txt", fraction=HEADER_FRACTION):
+    # Only the masthead region of page 1 goes through NER (fraction=None: the whole page)
+    first_page_text = header_text(pdf_path, fraction=fraction)
+    if output_raw:
         with open(output_raw, "w", encoding="utf-8") as f:
             f.write(first_page_text)
         print(f"✅ First page text saved to: {output_raw}")
     return first_page_text
 
-def extract_metadata_nlp(text):
-    doc = nlp(text)
+# Only entities are used below, so skip everything but NER
+NER_ONLY_DISABLE = ["tagger", "parser", "attribute_ruler", "lemmatizer"]
+
+def extract_metadata_nlp(text, output_path="extracted_metadata.txt"):
+    doc = get_nlp()(text, disable=NER_ONLY_DISABLE)
     newspaper_name = "Unknown"
     edition = "Unknown"
     date_str = "Unknown"
@@ -52,20 +53,21 @@ def extract_metadata_nlp(text):
         "date": date_str
     }
 
-    with open("extracted_metadata.txt", "w", encoding="utf-8") as f:
-        for k, v in metadata.items():
-            f.write(f"{k}: {v}\n")
-
-    print("✅ NLP-based metadata saved to: extracted_metadata.txt")
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            for k, v in metadata.items():
+                f.write(f"{k}: {v}\n")
+        print(f"✅ NLP-based metadata saved to: {output_path}")
     return metadata
 
 # === Run ===
 if __name__ == "__main__":
-    import sys
-    if len(sys.argv) < 2:
-        print("❌ Usage: python extract_metadata_nlp.py <PDF_PATH>")
-        sys.exit(1)
+    import argparse
+    parser = argparse.ArgumentParser(description="Guess newspaper, edition and date from the first page with spaCy NER")
+    parser.add_argument("pdf_path", help="newspaper PDF")
+    parser.add_argument("--header-fraction", type=float, default=HEADER_FRACTION,
+                        help="share of page 1 (from the top) to read; 0 reads the whole first page")
+    args = parser.parse_args()
 
-    pdf_path = sys.argv[1]
-    raw_text = extract_first_page_text(pdf_path)
+    raw_text = extract_first_page_text(args.pdf_path, fraction=args.header_fraction)
     extract_metadata_nlp(raw_text)
\ No newline at end of file
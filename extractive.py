@@ -0,0 +1,171 @@
+import time
+
+import numpy as np
+
+# Extractive summaries straight from the spaCy sentences already in each
+# ArticleAnalysis: no tokenizer, no BART, a few milliseconds per article.
+# Output has the same shape as the abstractive summaries.
+
+EXTRACTIVE_PARAMS = {
+    "damping": 0.85,
+    "iterations": 30,
+    "centroid_weight": 0.5,
+    "lead_weight": 0.2,
+    "heading_words": 12,
+    "paragraph_sentences": 3,
+    "min_paragraph_words": 30,
+}
+
+POLICIES = ("abstractive", "cascade", "extractive")
+
+# === Sentence Scoring ===
+def sentence_matrix(sentence_lemmas):
+    # Rows are sentences, columns the article's terms: TF x sentence-level IDF,
+    # L2-normalized so dot products are cosine similarities
+    vocab = {}
+    rows, cols = [], []
+    for row, lemmas in enumerate(sentence_lemmas):
+        for lemma in lemmas:
+            rows.append(row)
+            cols.append(vocab.setdefault(lemma, len(vocab)))
+    matrix = np.zeros((len(sentence_lemmas), max(1, len(vocab))))
+    np.add.at(matrix, (rows, cols), 1.0)
+    df = np.count_nonzero(matrix, axis=0)
+    matrix *= np.log((1 + len(sentence_lemmas)) / (1 + df)) + 1
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+def textrank(matrix, damping=0.85, iterations=30, tol=1e-6):
+    # PageRank over the sentence similarity graph, by power iteration
+    n = len(matrix)
+    similarity = matrix @ matrix.T
+    np.fill_diagonal(similarity, 0.0)
+    out_weight = similarity.sum(axis=1, keepdims=True)
+    # Sentences sharing no terms with any other spread their rank evenly
+    transition = np.divide(similarity, out_weight, out=np.full_like(similarity, 1.0 / n), where=out_weight > 0)
+    scores = np.full(n, 1.0 / n)
+    for _ in range(iterations):
+        updated = (1 - damping) / n + damping * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < tol:
+            return updated
+        scores = updated
+    return scores
+
+def centroid_scores(matrix):
+    centroid = matrix.sum(axis=0)
+    norm = np.linalg.norm(centroid)
+    return matrix @ (centroid / norm) if norm else np.zeros(len(matrix))
+
+def _scaled(scores):
+    top = scores.max() if len(scores) else 0.0
+    return scores / top if top > 0 else scores
+
+def score_sentences(sentence_lemmas, params=EXTRACTIVE_PARAMS):
+    # TextRank and centroid similarity, each scaled to [0, 1], plus a small
+    # bonus for the lead: news puts the essentials first
+    n = len(sentence_lemmas)
+    if n == 0:
+        return np.zeros(0)
+    matrix = sentence_matrix(sentence_lemmas)
+    weight = params["centroid_weight"]
+    scores = (1 - weight) * _scaled(textrank(matrix, params["damping"], params["iterations"])) \
+        + weight * _scaled(centroid_scores(matrix))
+    return scores + params["lead_weight"] / (1 + np.arange(n))
+
+# === Summaries ===
+def extractive_heading(sentence, max_words):
+    from summrizer import clean_truncated_heading
+    words = sentence.replace('.', '').split()
+    if len(words) <= max_words:
+        return " ".join(words)
+    return clean_truncated_heading(" ".join(words[:max_words])) or " ".join(words[:max_words])
+
+def summarize_extractive(analysis, max_points=5, params=EXTRACTIVE_PARAMS):
+    sentences = analysis.sentences
+    if not sentences:
+        return {"heading": "Untitled", "summary_points": [], "summary_paragraph": None, "method": "extractive"}
+    scores = score_sentences(analysis.sentence_lemmas, params)
+    ranked = np.argsort(-scores, kind="stable")
+
+    # Heading from the better of the two lead sentences, like the abstractive heading input
+    lead = max(range(min(2, len(sentences))), key=lambda i: scores[i])
+    # Best-scoring sentences, back in article order
+    points = sorted([int(i) for i in ranked if len(sentences[i].strip()) > 10][:max_points])
+    paragraph = sorted(int(i) for i in ranked[:params["paragraph_sentences"]])
+    enough = sum(len(sentence.split()) for sentence in sentences) > params["min_paragraph_words"]
+    return {
+        "heading": extractive_heading(sentences[lead], params["heading_words"]),
+        "summary_points": [sentences[i].strip() for i in points],
+        "summary_paragraph": " ".join(sentences[i].strip() for i in paragraph) if enough else None,
+        "method": "extractive",
+    }
+
+def summarize_extractive_batch(analyses, max_points=5):
+    from instrumentation import stage
+    with stage("extractive", articles=len(analyses)):
+        return [summarize_extractive(analysis, max_points) for analysis in analyses]
+
+# === Cascade Policy ===
+class Cascade:
+    # Decides which articles get the abstractive model:
+    #   abstractive - all of them (the default)
+    #   cascade     - top stories only (long, or the longest top_fraction of a
+    #                 batch); briefs and everything else stay extractive
+    #   extractive  - none
+    # With a time budget (seconds, shared by every batch of an edition), whatever
+    # is still waiting for the abstractive model once it runs out is summarized
+    # extractively instead, longest articles having gone first.
+    def __init__(self, policy="abstractive", top_fraction=0.25, min_chars=1500, time_budget=None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown summary policy {policy!r}, expected one of {', '.join(POLICIES)}")
+        self.policy = policy
+        self.top_fraction = top_fraction
+        self.min_chars = min_chars
+        self.time_budget = time_budget
+        self.started = time.perf_counter()
+        self.counts = {"abstractive": 0, "extractive": 0, "degraded": 0}
+
+    def route(self, analyses):
+        # Indexes of the articles to run through the abstractive model, most important first
+        by_length = sorted(range(len(analyses)), key=lambda i: -len(analyses[i].text))
+        if self.policy == "extractive":
+            return []
+        if self.policy == "abstractive":
+            return by_length
+        top = int(np.ceil(len(analyses) * self.top_fraction))
+        return [i for rank, i in enumerate(by_length) if rank < top or len(analyses[i].text) >= self.min_chars]
+
+    def restart(self):
+        # Start a fresh time budget, e.g. for each request batch of a long-lived service
+        self.started = time.perf_counter()
+
+    def remaining(self):
+        if self.time_budget is None:
+            return None
+        return self.time_budget - (time.perf_counter() - self.started)
+
+    def expired(self):
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def stats(self):
+        return dict(self.counts, policy=self.policy, time_budget=self.time_budget)
+
+# === CLI Flags ===
+def add_arguments(parser):
+    parser.add_argument("--summary-policy", choices=POLICIES, default="abstractive",
+                        help="abstractive: BART for every article; cascade: BART for top stories only; "
+                             "extractive: no BART at all")
+    parser.add_argument("--top-fraction", type=float, default=0.25,
+                        help="cascade: share of each batch (longest first) that counts as top stories")
+    parser.add_argument("--top-min-chars", type=int, default=1500,
+                        help="cascade: articles at least this long always count as top stories")
+    parser.add_argument("--time-budget", type=float, default=None,
+                        help="seconds for the whole run; articles left when it runs out are summarized extractively")
+
+def from_args(args):
+    # None keeps the plain always-abstractive behaviour
+    if args.summary_policy == "abstractive" and args.time_budget is None:
+        return None
+    return Cascade(args.summary_policy, top_fraction=args.top_fraction, min_chars=args.top_min_chars,
+                   time_budget=args.time_budget)
@@ -0,0 +1,150 @@
+import atexit
+import fcntl
+import json
+import os
+import threading
+import time
+
+import numpy as np
+from scipy import sparse
+
+DEFAULT_IDF_PATH = os.environ.get("IDF_INDEX_PATH", ".idf_index.json")
+# Seconds between saves while documents keep coming in; the rest is saved at exit
+DEFAULT_SAVE_EVERY = 60
+
+# === Corpus Document Frequencies ===
+class IDFIndex:
+    # Document frequencies over every article ingested so far, kept on disk
+    # and grown incrementally. Scoring a batch is one sparse term-count matrix
+    # times the IDF vector, the same smoothed IDF TfidfVectorizer uses.
+    # Counts added since the last save are merged into the file's current
+    # counts when saving, so concurrent runs add up instead of overwriting.
+    def __init__(self, path=DEFAULT_IDF_PATH, save_every=DEFAULT_SAVE_EVERY):
+        self.path = path
+        self.save_every = save_every
+        self.lock = threading.Lock()
+        self.n_docs = 0
+        self.terms = []
+        self.vocab = {}
+        self.df = np.zeros(0, dtype=np.int64)
+        self.pending_docs = 0
+        self.pending_df = np.zeros(0, dtype=np.int64)
+        self.saved_at = time.monotonic()
+        data = self._read()
+        if data:
+            self.n_docs = data["n_docs"]
+            self.terms = data["terms"]
+            self.vocab = {term: i for i, term in enumerate(self.terms)}
+            self.df = np.asarray(data["df"], dtype=np.int64)
+            self.pending_df = np.zeros(len(self.terms), dtype=np.int64)
+
+    def _read(self):
+        if not self.path or not os.path.exists(self.path):
+            return None
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _columns(self, terms):
+        cols = []
+        for term in terms:
+            col = self.vocab.get(term)
+            if col is None:
+                col = self.vocab[term] = len(self.terms)
+                self.terms.append(term)
+            cols.append(col)
+        if len(self.terms) > len(self.df):
+            grow = np.zeros(len(self.terms) - len(self.df), dtype=np.int64)
+            self.df = np.concatenate([self.df, grow])
+            self.pending_df = np.concatenate([self.pending_df, grow])
+        return cols
+
+    def count_matrix(self, term_lists):
+        # Rows are documents, columns are vocabulary terms, values are raw counts
+        rows, cols = [], []
+        for row, terms in enumerate(term_lists):
+            cols += self._columns(terms)
+            rows += [row] * len(terms)
+        data = np.ones(len(cols), dtype=np.float64)
+        return sparse.csr_matrix((data, (rows, cols)), shape=(len(term_lists), len(self.terms)))
+
+    def add_documents(self, term_lists):
+        with self.lock:
+            counts = self.count_matrix(term_lists)
+            df = np.diff(counts.tocsc().indptr)
+            self.df += df
+            self.pending_df += df
+            self.n_docs += len(term_lists)
+            self.pending_docs += len(term_lists)
+            return counts
+
+    def idf(self):
+        return np.log((1 + self.n_docs) / (1 + self.df)) + 1
+
+    def tfidf(self, term_lists, ingest=True):
+        # With ingest=True the batch counts toward the document frequencies first
+        if ingest:
+            counts = self.add_documents(term_lists)
+        else:
+            with self.lock:
+                counts = self.count_matrix(term_lists)
+        with self.lock:
+            idf = self.idf()
+        return counts.multiply(idf[:counts.shape[1]]).tocsr()
+
+    def top_terms(self, scores, row, k):
+        start, end = scores.indptr[row], scores.indptr[row + 1]
+        cols, values = scores.indices[start:end], scores.data[start:end]
+        terms = np.array([self.terms[col] for col in cols])
+        # Highest score first, ties in alphabetical order
+        return terms[np.lexsort((terms, -values))][:k].tolist()
+
+    def save(self):
+        # Add the counts gathered since the last save to whatever is on disk
+        # now (other runs may have saved meanwhile) and adopt the merged
+        # counts. Vocabulary columns only ever grow, so score matrices from
+        # earlier batches keep pointing at the right terms.
+        if not self.path:
+            return
+        with self.lock:
+            if not self.pending_docs:
+                return
+            with open(self.path + ".lock", "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                data = self._read() or {"n_docs": 0, "terms": [], "df": []}
+                cols = self._columns(data["terms"])
+                merged = self.pending_df.copy()
+                merged[cols] += np.asarray(data["df"], dtype=np.int64)
+                self.df = merged
+                self.n_docs = data["n_docs"] + self.pending_docs
+                self.pending_df = np.zeros(len(self.terms), dtype=np.int64)
+                self.pending_docs = 0
+                # Terms only seen in previews (never ingested) aren't written
+                keep = np.flatnonzero(self.df)
+                data = {"n_docs": self.n_docs, "terms": [self.terms[i] for i in keep], "df": self.df[keep].tolist()}
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, self.path)
+            self.saved_at = time.monotonic()
+
+    def maybe_save(self):
+        # Save at most every save_every seconds
+        if self.pending_docs and time.monotonic() - self.saved_at >= self.save_every:
+            self.save()
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_idf_index(path=DEFAULT_IDF_PATH):
+    global _index
+    with _index_lock:
+        if _index is None or _index.path != path:
+            if _index is not None:
+                _index.save()
+            _index = IDFIndex(path)
+    return _index
+
+@atexit.register
+def _save_on_exit():
+    if _index is not None:
+        _index.save()
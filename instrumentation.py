@@ -0,0 +1,205 @@
+import cProfile
+import functools
+import json
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# Opt-in run tracing: wall/CPU time per stage, token and skip counters, and
+# cProfile around hot functions. Everything is a no-op until enable_tracing()
+# or enable_profiling() is called, or PIPELINE_TRACE (trace JSON path) /
+# PIPELINE_PROFILE (.prof directory) is set in the environment.
+
+class Tracer:
+    def __init__(self, run_name=None):
+        self.run_name = run_name
+        self.started = datetime.utcnow().isoformat() + "Z"
+        self.lock = threading.Lock()
+        self.spans = []
+        self.counters = {}
+
+    @contextmanager
+    def stage(self, name, **attrs):
+        # attrs is yielded so the body can attach results (token counts, ids...)
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield attrs
+        finally:
+            self.record(name, (time.perf_counter() - wall_start) * 1000,
+                        (time.thread_time() - cpu_start) * 1000, **attrs)
+
+    def record(self, name, wall_ms, cpu_ms, **attrs):
+        # For spans timed elsewhere, e.g. inside a pool worker
+        span = {
+            "stage": name,
+            "wall_ms": round(wall_ms, 3),
+            "cpu_ms": round(cpu_ms, 3),
+            "thread": threading.current_thread().name,
+        }
+        span.update(attrs)
+        with self.lock:
+            self.spans.append(span)
+
+    def count(self, name, n=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def summary(self):
+        stages = {}
+        with self.lock:
+            spans = list(self.spans)
+        for span in spans:
+            row = stages.setdefault(span["stage"], {"calls": 0, "wall_ms": 0.0, "cpu_ms": 0.0,
+                                                    "input_tokens": 0, "output_tokens": 0, "max_wall_ms": 0.0})
+            row["calls"] += 1
+            row["wall_ms"] += span["wall_ms"]
+            row["cpu_ms"] += span["cpu_ms"]
+            row["input_tokens"] += span.get("input_tokens", 0)
+            row["output_tokens"] += span.get("output_tokens", 0)
+            row["max_wall_ms"] = max(row["max_wall_ms"], span["wall_ms"])
+        for row in stages.values():
+            row["wall_ms"] = round(row["wall_ms"], 3)
+            row["cpu_ms"] = round(row["cpu_ms"], 3)
+        return stages
+
+    def slowest(self, n=5):
+        # The individual pages / articles / batches that took longest
+        with self.lock:
+            return sorted(self.spans, key=lambda span: span["wall_ms"], reverse=True)[:n]
+
+    def summary_table(self):
+        lines = [f"{'stage':<24} {'calls':>6} {'wall ms':>11} {'cpu ms':>11} {'max ms':>9} {'tok in':>8} {'tok out':>8}"]
+        for name, row in sorted(self.summary().items(), key=lambda item: -item[1]["wall_ms"]):
+            lines.append(f"{name:<24} {row['calls']:>6} {row['wall_ms']:>11.1f} {row['cpu_ms']:>11.1f} "
+                         f"{row['max_wall_ms']:>9.1f} {row['input_tokens']:>8} {row['output_tokens']:>8}")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"{name:<24} {value:>6}")
+        return "\n".join(lines)
+
+    def to_dict(self):
+        with self.lock:
+            spans = list(self.spans)
+            counters = dict(self.counters)
+        return {
+            "run": self.run_name,
+            "started": self.started,
+            "finished": datetime.utcnow().isoformat() + "Z",
+            "summary": self.summary(),
+            "counters": counters,
+            "slowest": self.slowest(),
+            "spans": spans,
+        }
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+        print(f"🧾 Trace written to {path}")
+
+# === Module-level Hooks ===
+_tracer = None
+_profiles = {}
+_profiling = threading.local()
+_profile_dir = os.environ.get("PIPELINE_PROFILE") or None
+_trace_path = os.environ.get("PIPELINE_TRACE") or None
+
+@contextmanager
+def _no_stage(name, **attrs):
+    yield attrs
+
+def enable_tracing(run_name=None):
+    global _tracer
+    _tracer = Tracer(run_name)
+    return _tracer
+
+def disable_tracing():
+    # Back to no-op stages, e.g. between benchmark runs in one process
+    global _tracer
+    _tracer = None
+
+def get_tracer():
+    return _tracer
+
+def stage(name, **attrs):
+    return _tracer.stage(name, **attrs) if _tracer else _no_stage(name, **attrs)
+
+def count(name, n=1):
+    if _tracer:
+        _tracer.count(name, n)
+
+def record(name, wall_ms, cpu_ms, **attrs):
+    if _tracer:
+        _tracer.record(name, wall_ms, cpu_ms, **attrs)
+
+def tracing():
+    return _tracer is not None
+
+def finish(trace_path=None):
+    # Print the summary table and write the JSON trace / profiles, if enabled
+    trace_path = trace_path or _trace_path
+    if _tracer:
+        print(_tracer.summary_table())
+        if trace_path:
+            _tracer.write(trace_path)
+    if _profile_dir:
+        write_profiles()
+
+def enable_profiling(profile_dir):
+    global _profile_dir
+    _profile_dir = profile_dir
+
+def profiled(fn):
+    # Wraps a hot function in its own cProfile.Profile while profiling is on;
+    # named, top-level functions also keep py-spy stacks readable
+    name = f"{fn.__module__}.{fn.__qualname__}"
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        # Only one cProfile can be active per thread; nested hot functions
+        # show up inside the outermost profile instead
+        if not _profile_dir or getattr(_profiling, "active", False):
+            return fn(*args, **kwargs)
+        key = (name, threading.get_ident())
+        profile = _profiles.get(key)
+        if profile is None:
+            profile = _profiles.setdefault(key, cProfile.Profile())
+        _profiling.active = True
+        profile.enable()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profile.disable()
+            _profiling.active = False
+
+    return wrapper
+
+def write_profiles():
+    # One .prof per hot function (threads merged); open with snakeviz or pstats
+    os.makedirs(_profile_dir, exist_ok=True)
+    by_name = {}
+    for (name, _), profile in list(_profiles.items()):
+        by_name.setdefault(name, []).append(profile)
+    for name, profiles in by_name.items():
+        path = os.path.join(_profile_dir, f"{name}.prof")
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        stats.dump_stats(path)
+        print(f"🔬 {name}: {stats.total_calls} calls, {stats.total_tt:.3f}s -> {path}")
+
+# === CLI Flags ===
+def add_arguments(parser):
+    parser.add_argument("--trace", metavar="PATH", help="write per-stage timings and token counters to this JSON file")
+    parser.add_argument("--profile", metavar="DIR", help="cProfile the hot functions and dump .prof files here")
+
+def configure(args, run_name=None):
+    if args.trace:
+        enable_tracing(run_name)
+    if args.profile:
+        enable_profiling(args.profile)
+
+if _trace_path:
+    enable_tracing()
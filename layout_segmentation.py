@@ -0,0 +1,276 @@
+import re
+
+import numpy as np
+
+from instrumentation import stage
+from page_extraction import iter_pages, page_count
+
+# Article segmentation from the page layout instead of blank lines. Every
+# text block of page.get_text("dict") keeps its bounding box and font size;
+# blocks set well above the page's body size are headlines, and each body
+# block belongs to the nearest headline above it that shares its column
+# span. Body text with no headline above continues the story at the bottom
+# of the previous column, or of the previous page. "Continued on page N"
+# jumps are followed. All geometry is done on arrays of boxes per page.
+
+HEADLINE_RATIO = 1.3      # headline font size / body font size
+MAX_HEADLINE_WORDS = 30
+MIN_BODY_WORDS = 4        # shorter non-headline blocks are page furniture (folios, labels)
+BODY_TOLERANCE = 0.1      # body blocks are set within 10% of the page's body size
+MIN_GUTTER = 4.0          # points of empty x-range that separate two columns
+MIN_OVERLAP = 0.5         # shared share of width for a headline to own a block below it
+
+JUMP_OUT = re.compile(r"\(?\s*(?:continued|contd\.?|cont'd)\s+on\s+page\s+(\d+)\s*\)?", re.IGNORECASE)
+JUMP_IN = re.compile(r"^\s*\(?\s*(?:continued|contd\.?|cont'd)\s+from\s+page\s+(\d+)\s*\)?", re.IGNORECASE)
+
+# === Page Geometry ===
+class PageLayout:
+    # Text blocks of one page as arrays; small and picklable, so it comes back from pool workers
+    def __init__(self, page_num, width, boxes, sizes, chars, texts):
+        self.page_num = page_num
+        self.width = width
+        self.boxes = boxes      # (n, 4) x0, y0, x1, y1
+        self.sizes = sizes      # character-weighted mean font size per block
+        self.chars = chars
+        self.texts = texts
+
+def page_layout(page):
+    boxes, sizes, chars, texts = [], [], [], []
+    for block in page.get_text("dict")["blocks"]:
+        if block["type"] != 0:
+            continue
+        lines, n_chars, weighted = [], 0, 0.0
+        for line in block["lines"]:
+            text = "".join(span["text"] for span in line["spans"]).strip()
+            if text:
+                lines.append(text)
+            for span in line["spans"]:
+                n = len(span["text"].strip())
+                n_chars += n
+                weighted += n * span["size"]
+        if not lines:
+            continue
+        boxes.append(block["bbox"])
+        sizes.append(weighted / n_chars if n_chars else 0.0)
+        chars.append(n_chars)
+        texts.append("\n".join(lines))
+    return PageLayout(page.number + 1, page.rect.width, np.asarray(boxes, dtype=np.float64).reshape(-1, 4),
+                      np.asarray(sizes), np.asarray(chars), texts)
+
+def body_font_size(sizes, chars):
+    # The size most characters are set in, to the nearest half point
+    if not len(sizes):
+        return 0.0
+    halves = np.round(sizes * 2).astype(np.int64)
+    return np.bincount(halves, weights=chars).argmax() / 2
+
+def column_gutters(boxes, width, min_gutter=MIN_GUTTER):
+    # x-coverage of the blocks as a difference array; empty runs wider than
+    # min_gutter between covered ones are gutters (returned as their centres)
+    if not len(boxes):
+        return np.zeros(0)
+    span = int(np.ceil(max(width, boxes[:, 2].max()))) + 2
+    diff = np.zeros(span + 1)
+    np.add.at(diff, np.clip(np.floor(boxes[:, 0]).astype(int), 0, span), 1)
+    np.add.at(diff, np.clip(np.ceil(boxes[:, 2]).astype(int), 0, span), -1)
+    covered = np.flatnonzero(np.cumsum(diff)[:span] > 0)
+    wide = np.flatnonzero(np.diff(covered) > min_gutter)
+    return (covered[wide] + covered[wide + 1]) / 2
+
+def nearest_above(upper, lower, min_overlap=MIN_OVERLAP, tolerance=2.0):
+    # For every lower box, the index of the closest upper box above it that
+    # shares enough x-range with it (-1 where there is none), and the vertical
+    # gap to it (inf). Overlap is measured against the narrower of the two, so
+    # a short headline still owns the full-width column under it.
+    if not len(upper) or not len(lower):
+        return np.full(len(lower), -1), np.full(len(lower), np.inf)
+    overlap = np.minimum(upper[:, None, 2], lower[None, :, 2]) - np.maximum(upper[:, None, 0], lower[None, :, 0])
+    widths = np.maximum(np.minimum(upper[:, None, 2] - upper[:, None, 0], lower[None, :, 2] - lower[None, :, 0]), 1e-6)
+    gap = lower[None, :, 1] - upper[:, None, 3]
+    valid = (overlap >= min_overlap * widths) & (gap >= -tolerance)
+    distance = np.where(valid, gap, np.inf)
+    owner = distance.argmin(axis=0)
+    gap = distance[owner, np.arange(len(lower))]
+    return np.where(np.isfinite(gap), owner, -1), gap
+
+# === Articles ===
+class Article:
+    def __init__(self, headline, page_num):
+        self.headline = headline
+        self.blocks = []
+        self.pages = [page_num]
+        self.jump_to = None
+
+    def add(self, text, page_num):
+        match = JUMP_OUT.search(text)
+        if match:
+            self.jump_to = int(match.group(1))
+            text = JUMP_OUT.sub("", text).strip()
+        if text:
+            self.blocks.append(text)
+        if self.pages[-1] != page_num:
+            self.pages.append(page_num)
+
+    @property
+    def text(self):
+        return "\n".join(([self.headline] if self.headline else []) + self.blocks)
+
+def _headline_groups(boxes, sizes):
+    # Kicker / headline / deck stacked over the same columns read as one headline
+    order = np.argsort(boxes[:, 1], kind="stable")
+    groups, group_of = [], {}
+    parents, _ = nearest_above(boxes[order], boxes[order])
+    for rank, i in enumerate(order):
+        parent = parents[rank]
+        close = parent >= 0 and parent != rank and \
+            boxes[i, 1] - boxes[order[parent], 3] < 1.5 * max(sizes[i], sizes[order[parent]])
+        if close and order[parent] in group_of:
+            group = group_of[order[parent]]
+            groups[group].append(i)
+        else:
+            group = len(groups)
+            groups.append([i])
+        group_of[i] = group
+    return groups
+
+def segment_page(layout, carry=None, waiting=(), headline_ratio=HEADLINE_RATIO):
+    # Articles of one page in reading order, and the one at the bottom of the
+    # last column (which may run on to the next page). carry is the previous
+    # page's bottom article; waiting are articles with an open jump line.
+    boxes, sizes, texts, page_num = layout.boxes, layout.sizes, layout.texts, layout.page_num
+    if not len(texts):
+        return [], None
+    words = np.array([len(text.split()) for text in texts])
+    body_size = body_font_size(sizes, layout.chars)
+    is_headline = (sizes >= headline_ratio * body_size) & (words <= MAX_HEADLINE_WORDS)
+    is_body = ~is_headline & (words >= MIN_BODY_WORDS) & (np.abs(sizes - body_size) <= BODY_TOLERANCE * body_size)
+
+    head_idx, body_idx = np.flatnonzero(is_headline), np.flatnonzero(is_body)
+    groups = [head_idx[group] for group in _headline_groups(boxes[head_idx], sizes[head_idx])] if len(head_idx) else []
+    # One box per headline group, spanning all of its blocks
+    group_boxes = np.array([[boxes[g, 0].min(), boxes[g, 1].min(), boxes[g, 2].max(), boxes[g, 3].max()]
+                            for g in groups]).reshape(-1, 4)
+    owners, gaps = nearest_above(group_boxes, boxes[body_idx])
+    # A date line, caption or rule text between a headline and a block cuts them apart
+    _, barriers = nearest_above(boxes[~is_headline & ~is_body], boxes[body_idx])
+    owners[barriers < gaps] = -1
+
+    # Columns from the narrower body blocks, so full-width blocks don't close the gutters
+    body_boxes = boxes[body_idx]
+    widths = body_boxes[:, 2] - body_boxes[:, 0]
+    narrow = body_boxes[widths <= np.median(widths) * 1.5] if len(widths) else body_boxes
+    gutters = column_gutters(narrow, layout.width)
+    columns = np.searchsorted(gutters, (body_boxes[:, 0] + body_boxes[:, 2]) / 2)
+    group_columns = np.searchsorted(gutters, group_boxes[:, 0] + 1e-6)
+
+    articles = [Article(" ".join(texts[i].replace("\n", " ") for i in group), page_num) for group in groups]
+    # Reading-order position of every article on this page: (column, top)
+    keys = {article: (int(group_columns[g]), group_boxes[g, 1]) for g, article in enumerate(articles)}
+    jumped, bottom = {}, {}
+    # Down each column, left to right, so earlier columns are settled first
+    for k in np.lexsort((body_boxes[:, 1], columns)):
+        text, owner, column = texts[body_idx[k]], owners[k], int(columns[k])
+        article = None
+        match = JUMP_IN.match(text)
+        if match:
+            # "Continued from page M": rejoin the story that jumped here
+            article = next((a for a in waiting if a.jump_to == page_num and int(match.group(1)) in a.pages), None)
+            if article is not None:
+                article.jump_to = None
+                text = JUMP_IN.sub("", text, count=1).strip()
+                if owner >= 0:
+                    # Its repeated jump headline is dropped
+                    keys.pop(articles[owner], None)
+                    jumped[owner] = article
+        if article is None and owner >= 0:
+            article = jumped.get(owner, articles[owner])
+        if article is None:
+            # No headline above: the story above in this column, else the one
+            # at the bottom of the previous column, else the previous page's
+            earlier = [c for c in bottom if c <= column]
+            article = bottom[max(earlier)] if earlier else carry
+        if article is None:
+            article = Article(None, page_num)
+        article.add(text, page_num)
+        keys.setdefault(article, (-1, 0.0) if article is carry else (column, body_boxes[k, 1]))
+        bottom[column] = article
+    trailing = bottom[max(bottom)] if bottom else None
+    return sorted(keys, key=keys.get), trailing
+
+class LayoutSegmenter:
+    # Feeds pages in order and hands back articles once nothing later can
+    # extend them: the bottom story of a page waits for the next page, and a
+    # story with a jump line waits for the page it jumps to.
+    def __init__(self, headline_ratio=HEADLINE_RATIO):
+        self.headline_ratio = headline_ratio
+        self.trailing = None
+        self.waiting = []
+
+    def feed(self, layout, final=False):
+        carry = self.trailing
+        articles, trailing = segment_page(layout, carry=carry, waiting=self.waiting, headline_ratio=self.headline_ratio)
+        done = []
+        if carry is not None and carry not in articles and carry.jump_to is None:
+            done.append(carry)
+        # Jump targets already behind us without a matching "continued from" give up
+        expired = [a for a in self.waiting if a.jump_to is None or a.jump_to <= layout.page_num]
+        self.waiting = [a for a in self.waiting if a not in expired]
+        done += [a for a in expired if a not in articles]
+        for article in articles:
+            if final:
+                done.append(article)
+            elif article.jump_to is not None and article.jump_to > layout.page_num:
+                if article not in self.waiting:
+                    self.waiting.append(article)
+            elif article is not trailing:
+                done.append(article)
+        self.trailing = None if final or (trailing is not None and trailing in self.waiting) else trailing
+        if final:
+            done += self.waiting
+            self.waiting = []
+        return done
+
+def render_articles(articles):
+    # One article per paragraph: a blank line between articles and none
+    # inside them, which clean_page_text turns into the ----- separators
+    # split_into_articles cuts on
+    return "\n\n".join(article.text for article in articles)
+
+def iter_layout_pages(pdf_path, workers=1, clean=None, headline_ratio=HEADLINE_RATIO):
+    # Same (page_number, text) stream as page_extraction.iter_pages, but the
+    # text of each page is the articles completed there, segmented by layout
+    n_pages = page_count(pdf_path)
+    segmenter = LayoutSegmenter(headline_ratio)
+    for page_num, layout in iter_pages(pdf_path, workers=workers, extract=page_layout):
+        with stage("segment_page", page=page_num, blocks=len(layout.texts)):
+            articles = segmenter.feed(layout, final=page_num == n_pages)
+            text = render_articles(articles)
+        yield page_num, clean(text) if clean else text
+
+def segment_pdf(pdf_path, workers=1, headline_ratio=HEADLINE_RATIO):
+    # Every article of an edition as {"headline", "text", "pages"}
+    n_pages = page_count(pdf_path)
+    segmenter = LayoutSegmenter(headline_ratio)
+    articles = []
+    for page_num, layout in iter_pages(pdf_path, workers=workers, extract=page_layout):
+        articles += segmenter.feed(layout, final=page_num == n_pages)
+    return [{"headline": a.headline, "text": a.text, "pages": a.pages} for a in articles]
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    parser = argparse.ArgumentParser(description="Split a newspaper PDF into articles using block layout and font sizes")
+    parser.add_argument("pdf_path")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--headline-ratio", type=float, default=HEADLINE_RATIO,
+                        help="font size over body size from which a block counts as a headline")
+    parser.add_argument("--output", help="write the articles as JSONL here")
+    args = parser.parse_args()
+
+    found = segment_pdf(args.pdf_path, workers=args.workers, headline_ratio=args.headline_ratio)
+    print(f"🧩 Found {len(found)} article(s), {sum(len(a['pages']) > 1 for a in found)} spanning pages")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            for article in found:
+                f.write(json.dumps(article, ensure_ascii=False) + "\n")
+        print(f"✅ Articles saved to {args.output}")
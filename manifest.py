@@ -0,0 +1,105 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_MANIFEST_PATH = os.environ.get("PIPELINE_MANIFEST", ".pipeline_manifest.sqlite3")
+
+# Later stages imply the earlier ones
+STAGES = ("extracted", "summarized", "stored")
+
+def content_hash(data):
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+def item_key(kind, path, part=None):
+    # "pdf:/abs/edition.pdf", "page:/abs/edition.pdf#3", "chunk:/abs/chunks/chunk_1.txt"
+    key = f"{kind}:{os.path.abspath(path)}"
+    return key if part is None else f"{key}#{part}"
+
+def file_hash(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+# === Processing Manifest ===
+class Manifest:
+    # One row per PDF, page and chunk: the hash of its content, the last stage
+    # it completed and the pipeline version that completed it. A rerun skips
+    # whatever is done for the same hash and version and redoes the rest.
+    def __init__(self, path=DEFAULT_MANIFEST_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.skipped = 0
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS items (
+                key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                source TEXT,
+                hash TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                version TEXT NOT NULL,
+                updated REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS items_source ON items (source, kind)")
+        self.conn.commit()
+
+    def get(self, key):
+        with self.lock:
+            row = self.conn.execute("SELECT kind, hash, stage, version, updated FROM items WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("kind", "hash", "stage", "version", "updated"), row))
+
+    def done(self, key, hash_, stage, version):
+        row = self.get(key)
+        if row is None or row["hash"] != hash_ or row["version"] != version:
+            return False
+        if STAGES.index(row["stage"]) < STAGES.index(stage):
+            return False
+        self.skipped += 1
+        return True
+
+    def children(self, source, kind):
+        # {key: hash} of the pages or chunks recorded for one PDF
+        with self.lock:
+            return dict(self.conn.execute("SELECT key, hash FROM items WHERE source = ? AND kind = ?", (source, kind)))
+
+    def mark(self, key, kind, hash_, stage, version, source=None):
+        self.mark_many([(key, hash_)], kind, stage, version, source)
+
+    def mark_many(self, items, kind, stage, version, source=None):
+        # items: (key, hash) pairs that all reached the same stage
+        now = time.time()
+        with self.lock:
+            # A later stage keeps the source an earlier one recorded
+            self.conn.executemany("""
+                INSERT INTO items (key, kind, source, hash, stage, version, updated) VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET kind = excluded.kind, source = COALESCE(excluded.source, items.source),
+                    hash = excluded.hash, stage = excluded.stage, version = excluded.version, updated = excluded.updated
+            """, [(key, kind, source, hash_, stage, version, now) for key, hash_ in items])
+            self.conn.commit()
+
+    def stats(self):
+        with self.lock:
+            rows = self.conn.execute("SELECT kind, stage, COUNT(*) FROM items GROUP BY kind, stage").fetchall()
+        counts = {}
+        for kind, stage, n in rows:
+            counts.setdefault(kind, {})[stage] = n
+        return {"items": counts, "skipped": self.skipped}
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
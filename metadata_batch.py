@@ -0,0 +1,93 @@
+import csv
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from page_extraction import HEADER_FRACTION
+
+# Tags a whole directory of editions with newspaper / date / edition metadata.
+# Each PDF only has the header region of its first page read; files are spread
+# over a process pool and results go to one JSONL or CSV file.
+
+# CSV columns per engine, fixed so a failed first file can't drop any
+FIELDS = {
+    "rules": ["file", "path", "newspaper", "date", "edition", "error"],
+    "nlp": ["file", "path", "newspaper_name", "edition", "date", "error"],
+}
+
+def tag_pdf(pdf_path, engine="rules", fraction=HEADER_FRACTION):
+    # One result row; errors are recorded instead of stopping the batch
+    row = {"file": os.path.basename(pdf_path), "path": pdf_path}
+    try:
+        if engine == "nlp":
+            from extract_metadata_nlp import extract_first_page_text, extract_metadata_nlp
+            row.update(extract_metadata_nlp(extract_first_page_text(pdf_path, output_raw=None, fraction=fraction),
+                                            output_path=None))
+        else:
+            from raw_text_ex import extract_metadata
+            row.update(extract_metadata(pdf_path, fraction=fraction))
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+    return row
+
+def _tag_many(pdf_paths, engine, fraction):
+    return [tag_pdf(pdf_path, engine, fraction) for pdf_path in pdf_paths]
+
+def find_pdfs(directory, recursive=False):
+    pattern = os.path.join(directory, "**", "*") if recursive else os.path.join(directory, "*")
+    return sorted(path for path in glob.glob(pattern, recursive=recursive) if path.lower().endswith(".pdf"))
+
+def iter_tags(pdf_paths, workers=1, engine="rules", fraction=HEADER_FRACTION, files_per_task=16):
+    # Rows in input order; each pool task handles a slice of files so the
+    # per-task overhead (and the spaCy load, for engine="nlp") is amortized
+    if workers <= 1:
+        for pdf_path in pdf_paths:
+            yield tag_pdf(pdf_path, engine, fraction)
+        return
+    slices = [pdf_paths[i:i + files_per_task] for i in range(0, len(pdf_paths), files_per_task)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for rows in pool.map(_tag_many, slices, [engine] * len(slices), [fraction] * len(slices)):
+            yield from rows
+
+def write_rows(rows, output_path, engine="rules"):
+    # .csv gets the engine's fixed header; anything else is JSONL
+    count = 0
+    with open(output_path, "w", encoding="utf-8", newline="") as f:
+        if output_path.lower().endswith(".csv"):
+            writer = csv.DictWriter(f, fieldnames=FIELDS[engine])
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        else:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+                count += 1
+    return count
+
+def tag_directory(directory, output_path, workers=1, engine="rules", fraction=HEADER_FRACTION, recursive=False):
+    pdf_paths = find_pdfs(directory, recursive)
+    print(f"🗂️ Tagging {len(pdf_paths)} PDF(s) in {directory} with {workers} worker(s)")
+    start = time.perf_counter()
+    count = write_rows(iter_tags(pdf_paths, workers=workers, engine=engine, fraction=fraction), output_path, engine)
+    elapsed = time.perf_counter() - start
+    print(f"✅ {count} row(s) written to {output_path} in {elapsed:.2f}s")
+    return count
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Extract newspaper / date / edition metadata for every PDF in a directory")
+    parser.add_argument("directory")
+    parser.add_argument("--output", default="metadata.jsonl", help="result file (.jsonl or .csv)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--engine", choices=["rules", "nlp"], default="rules",
+                        help="rules: filename + masthead lookup tables; nlp: spaCy NER on the masthead")
+    parser.add_argument("--header-fraction", type=float, default=HEADER_FRACTION,
+                        help="share of page 1 (from the top) to read; 0 reads the whole first page")
+    parser.add_argument("--recursive", action="store_true")
+    args = parser.parse_args()
+
+    tag_directory(args.directory, args.output, workers=args.workers, engine=args.engine,
+                  fraction=args.header_fraction, recursive=args.recursive)
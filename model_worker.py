@@ -0,0 +1,134 @@
+import os
+import secrets
+import socket
+import stat
+import tempfile
+import threading
+from multiprocessing.managers import BaseManager
+
+# Long-lived process that keeps spaCy and BART resident. CLI runs and cron
+# jobs point ARTICLE_MODEL_WORKER at its socket and skip model loading.
+# The socket lives in a directory only this user can enter and is itself
+# 0600. Clients authenticate with ARTICLE_MODEL_WORKER_KEY, or else with the
+# random key the server writes (0600) next to its socket.
+DEFAULT_DIR = os.path.join(tempfile.gettempdir(), f"article-models-{os.getuid()}")
+DEFAULT_ADDRESS = os.environ.get("ARTICLE_MODEL_WORKER", os.path.join(DEFAULT_DIR, "models.sock"))
+KEY_ENV = "ARTICLE_MODEL_WORKER_KEY"
+
+def key_path(address):
+    return address + ".key"
+
+def private_dir(path):
+    # Create the socket's directory as 0700, or check an existing one is ours and private
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.stat(path)
+    if info.st_uid != os.getuid() or stat.S_IMODE(info.st_mode) & 0o077:
+        raise PermissionError(f"{path} must be owned by you and not accessible to others (chmod 700)")
+
+def write_key(address):
+    # A fresh random key for this server, readable only by its owner
+    key = secrets.token_hex(32)
+    path = key_path(address)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "w") as f:
+        f.write(key)
+    os.replace(tmp, path)
+    return key.encode()
+
+def read_key(address):
+    if os.environ.get(KEY_ENV):
+        return os.environ[KEY_ENV].encode()
+    try:
+        with open(key_path(address), "r") as f:
+            return f.read().strip().encode()
+    except FileNotFoundError:
+        raise RuntimeError(f"No key for the model worker at {address}: set {KEY_ENV} or start it with `model_worker.py serve`")
+
+def remove_stale_socket(address):
+    # Only a socket nobody is listening on is removed; anything else is left alone
+    try:
+        mode = os.lstat(address).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f"{address} exists and is not a socket")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(address)
+    except ConnectionRefusedError:
+        os.remove(address)
+        return
+    finally:
+        probe.close()
+    raise FileExistsError(f"A model worker is already listening on {address}")
+
+class ModelHost:
+    def __init__(self):
+        import models
+        self.lock = threading.Lock()
+        self.nlp = models.load_spacy()
+        self.summarizer = models.load_summarizer()
+        self.tokenizer = models.load_tokenizer()
+
+    def ping(self):
+        return os.getpid()
+
+    def summarize(self, texts, kwargs):
+        with self.lock:
+            return [out["summary_text"] for out in self.summarizer(texts, **kwargs)]
+
+    def summarize_ids(self, input_ids, kwargs):
+        import models
+        with self.lock:
+            return models.generate_ids(self.summarizer, input_ids, **kwargs)
+
+    def tokenize(self, texts, add_special_tokens=True):
+        return self.tokenizer(texts, truncation=False, add_special_tokens=add_special_tokens)["input_ids"]
+
+    def parse(self, texts, disable, batch_size):
+        from spacy.tokens import DocBin
+        with self.lock:
+            docs = DocBin()
+            for doc in self.nlp.pipe(texts, batch_size=batch_size, disable=disable):
+                docs.add(doc)
+        return docs.to_bytes()
+
+class ModelManager(BaseManager):
+    pass
+
+def serve(address=DEFAULT_ADDRESS):
+    private_dir(os.path.dirname(os.path.abspath(address)))
+    remove_stale_socket(address)
+    authkey = os.environ[KEY_ENV].encode() if os.environ.get(KEY_ENV) else write_key(address)
+    host = ModelHost()
+    ModelManager.register("models", callable=lambda: host)
+    # Bind under a 0177 umask so the socket is 0600 from the start
+    umask = os.umask(0o177)
+    try:
+        server = ModelManager(address=address, authkey=authkey).get_server()
+    finally:
+        os.umask(umask)
+    print(f"🔥 Models loaded, listening on {address} (pid {os.getpid()})")
+    server.serve_forever()
+
+def connect(address=DEFAULT_ADDRESS):
+    ModelManager.register("models")
+    manager = ModelManager(address=address, authkey=read_key(address))
+    manager.connect()
+    return manager.models()
+
+if __name__ == "__main__":
+    import argparse
+    import summarizer_backends
+    parser = argparse.ArgumentParser(description="Keep spaCy and BART loaded for other scripts")
+    parser.add_argument("command", choices=["serve", "ping"])
+    parser.add_argument("--address", default=DEFAULT_ADDRESS, help="Unix socket path")
+    summarizer_backends.add_arguments(parser)
+    args = parser.parse_args()
+    summarizer_backends.configure(args)
+
+    if args.command == "serve":
+        serve(args.address)
+    else:
+        print(f"✅ Worker pid {connect(args.address).ping()} is up at {args.address}")
@@ -0,0 +1,205 @@
+import os
+import threading
+
+# Model handles are created on first use, so scripts that never summarize
+# (or only print --help) don't pay for loading spaCy and BART.
+SPACY_MODEL = "en_core_web_sm"
+MODEL_NAME = os.environ.get("SUMMARIZER_MODEL", "facebook/bart-large-cnn")
+
+# How the summarizer runs on CPU (see summarizer_backends.py) and with how many threads
+SUMMARIZER_BACKEND = os.environ.get("SUMMARIZER_BACKEND", "pipeline")
+SUMMARIZER_THREADS = int(os.environ.get("SUMMARIZER_THREADS", "0")) or None
+
+# Experimental: encode each article's windows once and decode bullets and
+# paragraph from the cached encoder states (see summrizer.summarize_shared_encoder)
+SHARED_ENCODER = os.environ.get("SUMMARIZER_SHARED_ENCODER", "") == "1"
+
+# BART's encoder window, and the BOS/EOS pair every input is wrapped in
+MODEL_MAX_TOKENS = 1024
+SPECIAL_TOKENS = 2
+
+# Set to the socket path of a running `python model_worker.py serve` to reuse its warm models
+WORKER_ENV = "ARTICLE_MODEL_WORKER"
+
+_lock = threading.RLock()
+_handles = {}
+
+def _load(name, loader):
+    handle = _handles.get(name)
+    if handle is None:
+        with _lock:
+            handle = _handles.get(name)
+            if handle is None:
+                handle = _handles[name] = loader()
+    return handle
+
+def _worker():
+    address = os.environ.get(WORKER_ENV)
+    if not address:
+        return None
+    from model_worker import connect
+    return _load("worker", lambda: connect(address))
+
+# === Local Loaders ===
+def load_spacy():
+    import spacy
+    try:
+        return spacy.load(SPACY_MODEL)
+    except OSError:
+        raise RuntimeError(f"Run: python -m spacy download {SPACY_MODEL}")
+
+def load_summarizer():
+    from summarizer_backends import load_backend
+    return load_backend(SUMMARIZER_BACKEND, MODEL_NAME, threads=SUMMARIZER_THREADS)
+
+def load_tokenizer():
+    from transformers import AutoTokenizer
+    return AutoTokenizer.from_pretrained(MODEL_NAME)
+
+def configure_summarizer(backend=None, threads=None, model_name=None, shared_encoder=None):
+    # Pick the model / backend / thread count; takes effect for handles loaded afterwards
+    global SUMMARIZER_BACKEND, SUMMARIZER_THREADS, MODEL_NAME, SHARED_ENCODER
+    SUMMARIZER_BACKEND = backend or SUMMARIZER_BACKEND
+    SUMMARIZER_THREADS = threads or SUMMARIZER_THREADS
+    MODEL_NAME = model_name or MODEL_NAME
+    SHARED_ENCODER = SHARED_ENCODER if shared_encoder is None else shared_encoder
+
+def summarizer_id():
+    # Identifies what produces the summaries, for cache keys. The fp32
+    # pipeline keeps the bare model name so existing cache entries stay valid.
+    # The shared encoder pass feeds the model different inputs, so it counts too.
+    name = MODEL_NAME if SUMMARIZER_BACKEND == "pipeline" else f"{MODEL_NAME}+{SUMMARIZER_BACKEND}"
+    return f"{name}+shared-encoder" if SHARED_ENCODER else name
+
+# === Handles ===
+def get_nlp():
+    worker = _worker()
+    if worker is not None:
+        return _load("remote_nlp", lambda: RemoteNLP(worker))
+    return _load("nlp", load_spacy)
+
+def get_summarizer():
+    worker = _worker()
+    if worker is not None:
+        return _load("remote_summarizer", lambda: RemoteSummarizer(worker))
+    return _load("summarizer", load_summarizer)
+
+def get_tokenizer():
+    worker = _worker()
+    if worker is not None:
+        return _load("remote_tokenizer", lambda: RemoteTokenizer(worker))
+    return _load("tokenizer", load_tokenizer)
+
+# === Generation From Token IDs ===
+def generate_ids(summarizer, input_ids, **kwargs):
+    # Summaries for pre-tokenized inputs (ids without BOS/EOS). Skips the
+    # pipeline's own tokenization; decoding matches the pipeline's output.
+    if hasattr(summarizer, "summarize_ids"):
+        return summarizer.summarize_ids(input_ids, **kwargs)
+
+    import torch
+    tokenizer, model = summarizer.tokenizer, summarizer.model
+    ids, mask = _pad_ids(tokenizer, input_ids)
+    kwargs.pop("batch_size", None)
+    with torch.inference_mode():
+        output = model.generate(input_ids=ids.to(model.device), attention_mask=mask.to(model.device), **kwargs)
+    return tokenizer.batch_decode(output, skip_special_tokens=True)
+
+def _pad_ids(tokenizer, input_ids):
+    import torch
+    # <s> ids </s>, spelled out: transformers 5 tokenizers lack build_inputs_with_special_tokens
+    rows = [[tokenizer.cls_token_id, *ids, tokenizer.sep_token_id] for ids in input_ids]
+    width = max(map(len, rows))
+    ids = torch.full((len(rows), width), tokenizer.pad_token_id, dtype=torch.long)
+    mask = torch.zeros((len(rows), width), dtype=torch.long)
+    for i, row in enumerate(rows):
+        ids[i, :len(row)] = torch.tensor(row)
+        mask[i, :len(row)] = 1
+    return ids, mask
+
+def summarize_ids(input_ids, **kwargs):
+    return generate_ids(get_summarizer(), input_ids, **kwargs)
+
+# === Generation From Encoder States ===
+def supports_encoder_states(summarizer):
+    return hasattr(summarizer, "encode_ids") or hasattr(getattr(summarizer, "model", None), "get_encoder")
+
+def encode_ids(summarizer, input_ids):
+    # Encoder only, for pre-tokenized inputs (ids without BOS/EOS). Returns one
+    # state per input, unpadded, for generate_encoded() to decode any number of times.
+    if hasattr(summarizer, "encode_ids"):
+        return summarizer.encode_ids(input_ids)
+
+    import torch
+    model = summarizer.model
+    ids, mask = _pad_ids(summarizer.tokenizer, input_ids)
+    with torch.inference_mode():
+        hidden = model.get_encoder()(input_ids=ids.to(model.device), attention_mask=mask.to(model.device)).last_hidden_state
+    return [hidden[i, :length] for i, length in enumerate(mask.sum(dim=1).tolist())]
+
+def generate_encoded(summarizer, states, **kwargs):
+    # One summary per encoder state from encode_ids(), padded into one batch
+    if hasattr(summarizer, "generate_encoded"):
+        return summarizer.generate_encoded(states, **kwargs)
+
+    import torch
+    from transformers.modeling_outputs import BaseModelOutput
+    tokenizer, model = summarizer.tokenizer, summarizer.model
+    width = max(len(state) for state in states)
+    hidden = states[0].new_zeros((len(states), width, states[0].shape[-1]))
+    mask = torch.zeros((len(states), width), dtype=torch.long)
+    for i, state in enumerate(states):
+        hidden[i, :len(state)] = state
+        mask[i, :len(state)] = 1
+    kwargs.pop("batch_size", None)
+    with torch.inference_mode():
+        output = model.generate(encoder_outputs=BaseModelOutput(last_hidden_state=hidden),
+                                attention_mask=mask.to(model.device), **kwargs)
+    return tokenizer.batch_decode(output, skip_special_tokens=True)
+
+def set_handle(name, handle):
+    # Swap in a ready-made handle ("nlp", "summarizer", "tokenizer"), e.g. a stub model
+    with _lock:
+        _handles[name] = handle
+
+def loaded_handles():
+    return sorted(_handles)
+
+# === Worker-backed Handles ===
+# Same call shapes as the local spaCy / pipeline / tokenizer objects, so
+# summrizer.py doesn't care where the models live.
+class RemoteSummarizer:
+    def __init__(self, worker):
+        self.worker = worker
+
+    def __call__(self, texts, **kwargs):
+        single = isinstance(texts, str)
+        outputs = self.worker.summarize([texts] if single else list(texts), kwargs)
+        return [{"summary_text": text} for text in outputs]
+
+    def summarize_ids(self, input_ids, **kwargs):
+        return self.worker.summarize_ids([list(ids) for ids in input_ids], kwargs)
+
+class RemoteTokenizer:
+    def __init__(self, worker):
+        self.worker = worker
+
+    def __call__(self, texts, **kwargs):
+        single = isinstance(texts, str)
+        input_ids = self.worker.tokenize([texts] if single else list(texts), kwargs.get("add_special_tokens", True))
+        return {"input_ids": input_ids[0] if single else input_ids}
+
+class RemoteNLP:
+    def __init__(self, worker):
+        import spacy
+        self.worker = worker
+        # A blank pipeline is enough to rebuild the parsed docs sent back by the worker
+        self.vocab = spacy.blank("en").vocab
+
+    def pipe(self, texts, batch_size=32, n_process=1, disable=()):
+        from spacy.tokens import DocBin
+        data = self.worker.parse(list(texts), list(disable), batch_size)
+        return DocBin().from_bytes(data).get_docs(self.vocab)
+
+    def __call__(self, text, disable=()):
+        return next(iter(self.pipe([text], disable=disable)))
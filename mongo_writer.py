@@ -0,0 +1,213 @@
+import asyncio
+import hashlib
+import threading
+import time
+from datetime import datetime
+
+from instrumentation import stage
+
+DEFAULT_MONGO_URI = "mongodb://localhost:27017"
+DEFAULT_DB = "news_summarizer"
+DEFAULT_COLLECTION = "summaries"
+
+# === Documents ===
+def build_document(entry, input_path=None):
+    doc_id = hashlib.md5((entry["heading"] + " ".join(entry["summary_points"])).encode()).hexdigest()
+    duplicate_of = None
+    if entry.get("duplicate"):
+        # A copy reusing another article's summary gets a document of its own,
+        # keyed on its text and source, instead of overwriting the original's
+        duplicate_of = doc_id
+        doc_id = hashlib.md5("\0".join([doc_id, entry["article_text"], input_path or ""]).encode()).hexdigest()
+    doc = {
+        "_id": doc_id,
+        "heading": entry["heading"],
+        "summary_points": entry["summary_points"],
+        "summary_paragraph": entry["summary_paragraph"],
+        "hashtags": entry["hashtags"],
+        "article_text": entry["article_text"],
+        "source_file": input_path,
+        "timestamp": datetime.utcnow(),
+        "newspaper": entry["newspaper"],
+        "date": entry["date"],
+        "city": entry["city"]
+    }
+    if duplicate_of:
+        doc["duplicate_of"] = duplicate_of
+    return doc
+
+def is_transient(error):
+    from pymongo.errors import ConnectionFailure, PyMongoError
+    if isinstance(error, ConnectionFailure):
+        return True
+    return isinstance(error, PyMongoError) and error.has_error_label("RetryableWriteError")
+
+# === Buffered Writer ===
+class MongoWriter:
+    # One pooled client per writer. Documents are buffered and upserted with
+    # unordered bulk_write once batch_size are waiting or flush_interval seconds
+    # have passed; transient errors are retried (upserts are idempotent).
+    def __init__(self, mongo_uri=DEFAULT_MONGO_URI, db_name=DEFAULT_DB, collection_name=DEFAULT_COLLECTION,
+                 client=None, batch_size=500, flush_interval=2.0, max_retries=3, retry_backoff=0.5,
+                 max_pool_size=10):
+        if client is None:
+            from pymongo import MongoClient
+            client = MongoClient(mongo_uri, serverSelectionTimeoutMS=3000, maxPoolSize=max_pool_size)
+            self._owns_client = True
+        else:
+            self._owns_client = False
+        self.client = client
+        self.collection = client[db_name][collection_name]
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+        self.buffer = []
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.last_flush = time.monotonic()
+        self.flush_stats = []
+        self._stopped = threading.Event()
+        self._timer = None
+
+    def ping(self):
+        self.client.admin.command("ping")
+
+    def start_timer(self):
+        # Background flush so a quiet buffer still reaches Mongo within flush_interval
+        if self._timer is None:
+            self._timer = threading.Thread(target=self._flush_periodically, name="mongo-flush", daemon=True)
+            self._timer.start()
+        return self
+
+    def _flush_periodically(self):
+        while not self._stopped.wait(self.flush_interval):
+            if self.buffer and time.monotonic() - self.last_flush >= self.flush_interval:
+                self.flush()
+
+    def write(self, docs):
+        with self.lock:
+            self.buffer.extend(docs)
+            due = len(self.buffer) >= self.batch_size or time.monotonic() - self.last_flush >= self.flush_interval
+        if due:
+            self.flush()
+
+    def save(self, entries, input_path=None):
+        self.write(build_document(entry, input_path) for entry in entries)
+
+    def flush(self):
+        from pymongo import UpdateOne
+
+        with self.flush_lock:
+            with self.lock:
+                docs, self.buffer = self.buffer, []
+                self.last_flush = time.monotonic()
+            if not docs:
+                return None
+
+            ops = [UpdateOne({"_id": doc["_id"]}, {"$set": doc}, upsert=True) for doc in docs]
+            start = time.perf_counter()
+            with stage("mongo_write", docs=len(docs)) as span:
+                for attempt in range(self.max_retries + 1):
+                    try:
+                        result = self.collection.bulk_write(ops, ordered=False)
+                        break
+                    except Exception as e:
+                        if attempt == self.max_retries or not is_transient(e):
+                            # Put the documents back so a later flush can retry them
+                            with self.lock:
+                                self.buffer = docs + self.buffer
+                            raise
+                        print(f"⚠️ MongoDB write failed ({e}), retry {attempt + 1}/{self.max_retries}")
+                        time.sleep(self.retry_backoff * 2 ** attempt)
+                span["attempts"] = attempt + 1
+
+            stats = {
+                "docs": len(docs),
+                "upserted": result.upserted_count,
+                "modified": result.modified_count,
+                "attempts": attempt + 1,
+                "latency_ms": round((time.perf_counter() - start) * 1000, 2),
+            }
+            self.flush_stats.append(stats)
+            print(f"💾 Flushed {stats['docs']} doc(s) to MongoDB in {stats['latency_ms']} ms")
+            return stats
+
+    def stats(self):
+        latencies = [s["latency_ms"] for s in self.flush_stats]
+        return {
+            "flushes": len(self.flush_stats),
+            "docs": sum(s["docs"] for s in self.flush_stats),
+            "pending": len(self.buffer),
+            "max_latency_ms": max(latencies) if latencies else 0.0,
+            "mean_latency_ms": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+        }
+
+    def close(self):
+        self._stopped.set()
+        self.flush()
+        if self._owns_client:
+            self.client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# === Async Variant ===
+class AsyncMongoWriter:
+    # asyncio front end; bulk writes run in a worker thread so the event loop
+    # keeps serving while Mongo round-trips
+    def __init__(self, *args, **kwargs):
+        self.writer = MongoWriter(*args, **kwargs)
+
+    async def save(self, entries, input_path=None):
+        docs = [build_document(entry, input_path) for entry in entries]
+        await asyncio.to_thread(self.writer.write, docs)
+
+    async def flush(self):
+        return await asyncio.to_thread(self.writer.flush)
+
+    def stats(self):
+        return self.writer.stats()
+
+    async def close(self):
+        await asyncio.to_thread(self.writer.close)
+
+# === Shared Writers ===
+_writers = {}
+_writers_lock = threading.Lock()
+
+def get_writer(mongo_uri=DEFAULT_MONGO_URI, db_name=DEFAULT_DB, collection_name=DEFAULT_COLLECTION, **kwargs):
+    # One writer (and connection pool) per target for the whole process
+    key = (mongo_uri, db_name, collection_name)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = MongoWriter(mongo_uri, db_name, collection_name, **kwargs)
+            writer.ping()
+            _writers[key] = writer
+    return writer
+
+def flush_writers():
+    # Write out everything buffered so far; False if any target failed
+    with _writers_lock:
+        writers = list(_writers.values())
+    ok = True
+    for writer in writers:
+        try:
+            writer.flush()
+        except Exception as e:
+            print(f"❌ MongoDB flush failed: {e}")
+            ok = False
+    return ok
+
+def close_writers():
+    # Flush whatever is still buffered and release the pooled clients
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.close()
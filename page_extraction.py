@@ -0,0 +1,89 @@
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz  # PyMuPDF
+
+from instrumentation import record
+
+# Page text extraction, optionally sharded over a process pool. fitz
+# documents can't be shared across threads or processes, so every worker
+# opens its own handle and extracts (and cleans) a contiguous page range.
+
+def page_count(pdf_path):
+    with fitz.open(pdf_path) as doc:
+        return len(doc)
+
+def _timed(fn, arg):
+    wall, cpu = time.perf_counter(), time.thread_time()
+    result = fn(arg)
+    return result, ((time.perf_counter() - wall) * 1000, (time.thread_time() - cpu) * 1000)
+
+def _page_text(page):
+    return page.get_text("text")
+
+def _extract_page(page, clean=None, extract=None):
+    # Text plus {stage: (wall_ms, cpu_ms)}; pool workers have no tracer of
+    # their own, so timings travel back with the text
+    text, timings = _timed(extract or _page_text, page)
+    timings = {"extract_page": timings}
+    if clean:
+        text, timings["clean_page"] = _timed(clean, text)
+    return text, timings
+
+def _extract_range(pdf_path, start, stop, clean=None, extract=None):
+    with fitz.open(pdf_path) as doc:
+        return [_extract_page(doc[i], clean, extract) for i in range(start, stop)]
+
+def _record(page_num, timings):
+    for name, (wall_ms, cpu_ms) in timings.items():
+        record(name, wall_ms, cpu_ms, page=page_num)
+
+def page_ranges(n_pages, workers, shards_per_worker=4):
+    # A few shards per worker keeps the pool busy when some pages are heavier,
+    # and lets iter_pages hand back the first pages early
+    shard = max(1, math.ceil(n_pages / (workers * shards_per_worker)))
+    return [(start, min(start + shard, n_pages)) for start in range(0, n_pages, shard)]
+
+def iter_pages(pdf_path, workers=1, clean=None, extract=None):
+    # Yields (page_number, text) in page order; clean must be a module-level
+    # function when workers > 1 so it can be sent to the pool. extract(page)
+    # replaces plain-text extraction (e.g. layout_segmentation.page_layout),
+    # under the same rule.
+    n_pages = page_count(pdf_path)
+    if workers <= 1 or n_pages < 2:
+        with fitz.open(pdf_path) as doc:
+            for page_num, page in enumerate(doc):
+                text, timings = _extract_page(page, clean, extract)
+                _record(page_num + 1, timings)
+                yield page_num + 1, text
+        return
+
+    ranges = page_ranges(n_pages, workers)
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as pool:
+        parts = pool.map(_extract_range, [pdf_path] * len(ranges), [r[0] for r in ranges],
+                         [r[1] for r in ranges], [clean] * len(ranges), [extract] * len(ranges))
+        for (start, _), pages in zip(ranges, parts):
+            for offset, (text, timings) in enumerate(pages):
+                _record(start + offset + 1, timings)
+                yield start + offset + 1, text
+
+# === Header Region ===
+# Mastheads, date lines and edition names sit in the top of the first page
+HEADER_FRACTION = 0.25
+
+def header_text(pdf_path, fraction=HEADER_FRACTION):
+    # Text inside the top `fraction` of page 1 only (fraction=None: all of page 1)
+    with fitz.open(pdf_path) as doc:
+        if not len(doc):
+            return ""
+        page = doc[0]
+        if not fraction:
+            return page.get_text("text")
+        rect = page.rect
+        text = page.get_text("text", clip=fitz.Rect(rect.x0, rect.y0, rect.x1, rect.y0 + rect.height * fraction))
+        # Nothing in the clip (odd page geometry): fall back to the whole page
+        return text if text.strip() else page.get_text("text")
+
+def extract_pages(pdf_path, workers=1, clean=None):
+    return [text for _, text in iter_pages(pdf_path, workers=workers, clean=clean)]
@@ -0,0 +1,187 @@
+import json
+import mmap
+import os
+import re
+
+import numpy as np
+
+from manifest import content_hash
+
+# Intermediate store for extracted text, in place of chunk_N.txt and
+# all_pages_cleaned.txt. Two append-only files:
+#   <path>      JSONL, one record per cleaned page and per article
+#   <path>.idx  fixed-width binary index: kind, page, article, byte offset, length
+# Readers memory-map the data and load only the index, so any page or article
+# is one seek away. A record counts once its index entry is written, so a
+# half-written tail after a crash is ignored (and cut off on the next append).
+INDEX_DTYPE = np.dtype([("kind", "u1"), ("page", "<u4"), ("article", "<u4"), ("offset", "<u8"), ("length", "<u4")])
+PAGE, ARTICLE = 0, 1
+
+# "<store>#pages=3-4" names a page range, like a chunk file used to
+REF_PATTERN = re.compile(r"^(?P<path>.*)#pages=(?P<first>\d+)-(?P<last>\d+)$")
+
+def index_path(path):
+    return path + ".idx"
+
+# === Writing ===
+class PageStoreWriter:
+    def __init__(self, path, mode="w"):
+        # mode="w" starts over, mode="a" appends (later records win on read)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        if mode == "a" and os.path.exists(path):
+            _truncate_to_index(path)
+        self.data = open(path, mode + "b")
+        self.index = open(index_path(path), mode + "b")
+        self.offset = self.data.tell()
+        self.pages = 0
+
+    def _write(self, kind, page, article, record):
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        self.data.write(line)
+        entry = np.array([(kind, page, article, self.offset, len(line))], dtype=INDEX_DTYPE)
+        self.offset += len(line)
+        return entry
+
+    def add_page(self, page_num, text, articles=()):
+        entries = [self._write(PAGE, page_num, 0, {"page": page_num, "text": text})]
+        entries += [self._write(ARTICLE, page_num, i, {"page": page_num, "article": i, "text": article})
+                    for i, article in enumerate(articles)]
+        # Data before index, so an index entry never points past the data
+        self.data.flush()
+        self.index.write(np.concatenate(entries).tobytes())
+        self.index.flush()
+        self.pages += 1
+
+    def close(self):
+        self.data.close()
+        self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _truncate_to_index(path):
+    index = _load_index(path)
+    end = int((index["offset"] + index["length"]).max()) if len(index) else 0
+    with open(path, "r+b") as f:
+        f.truncate(end)
+    if os.path.exists(index_path(path)):
+        with open(index_path(path), "r+b") as f:
+            f.truncate(len(index) * INDEX_DTYPE.itemsize)
+
+def _load_index(path):
+    if not os.path.exists(index_path(path)):
+        return np.zeros(0, dtype=INDEX_DTYPE)
+    raw = np.fromfile(index_path(path), dtype=np.uint8)
+    index = raw[:len(raw) - len(raw) % INDEX_DTYPE.itemsize].view(INDEX_DTYPE)
+    size = os.path.getsize(path) if os.path.exists(path) else 0
+    # Drop entries whose data never made it to disk
+    return index[index["offset"] + index["length"] <= size]
+
+# === Reading ===
+class PageStore:
+    def __init__(self, path):
+        self.path = path
+        self.index = _load_index(path)
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(path) else None
+        # Latest page record per page number; its articles are the rows
+        # written right after it, up to the next page record
+        page_rows = np.flatnonzero(self.index["kind"] == PAGE)
+        ends = np.append(page_rows[1:], len(self.index))
+        latest = {}
+        for row, end in zip(page_rows.tolist(), ends.tolist()):
+            latest[int(self.index["page"][row])] = (row, end)
+        self._pages = dict(sorted(latest.items()))
+
+    def _record(self, row):
+        entry = self.index[row]
+        start = int(entry["offset"])
+        return json.loads(self._map[start:start + int(entry["length"])])
+
+    def pages(self):
+        return list(self._pages)
+
+    def page(self, page_num):
+        return self._record(self._pages[page_num][0])["text"]
+
+    def _article_rows(self, page_num):
+        row, end = self._pages[page_num]
+        return range(row + 1, end)
+
+    def articles(self, page_num):
+        return [self._record(row)["text"] for row in self._article_rows(page_num)]
+
+    def article(self, page_num, i):
+        return self._record(self._article_rows(page_num)[i])["text"]
+
+    def iter_articles(self, first=None, last=None):
+        # (page_number, article_text) in page order, optionally for a page range
+        for page_num in self._pages:
+            if (first is None or page_num >= first) and (last is None or page_num <= last):
+                for text in self.articles(page_num):
+                    yield page_num, text
+
+    def chunk_refs(self, pages_per_chunk=2):
+        # Page ranges in the grouping split_pdf_to_chunks used for chunk files
+        pages = self.pages()
+        return [store_ref(self.path, group[0], group[-1])
+                for group in (pages[i:i + pages_per_chunk] for i in range(0, len(pages), pages_per_chunk))]
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# === Page-range References ===
+def store_ref(path, first, last):
+    return f"{path}#pages={first}-{last}"
+
+def parse_ref(ref):
+    # (store path, first page, last page); whole store when ref is a plain path
+    match = REF_PATTERN.match(ref)
+    if match:
+        return match.group("path"), int(match.group("first")), int(match.group("last"))
+    return ref, None, None
+
+def is_store(ref):
+    return os.path.exists(index_path(parse_ref(ref)[0]))
+
+def read_articles(ref):
+    path, first, last = parse_ref(ref)
+    with PageStore(path) as store:
+        return [text for _, text in store.iter_articles(first, last)]
+
+def articles_hash(articles):
+    # What the manifest records for a page range in the store
+    return content_hash("\n\0".join(articles))
+
+def ref_hash(ref):
+    return articles_hash(read_articles(ref))
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Inspect a page store")
+    parser.add_argument("path")
+    parser.add_argument("--page", type=int, help="print this page's cleaned text")
+    parser.add_argument("--article", type=int, help="with --page, print only this article")
+    args = parser.parse_args()
+
+    with PageStore(args.path) as store:
+        if args.page is None:
+            pages = store.pages()
+            n_articles = int((store.index["kind"] == ARTICLE).sum())
+            print(f"📚 {len(pages)} page(s), {n_articles} article record(s), {len(store.index)} index entries")
+        elif args.article is None:
+            print(store.page(args.page))
+        else:
+            print(store.article(args.page, args.article))
@@ -1,154 +1,194 @@
-import fitz  # PyMuPDF
-import re
-import os
-from datetime import datetime
-
-# -----------------------------------
-# 🗞️ Extended Newspaper Mapping
-# -----------------------------------
-newspaper_map = {
-    "HT": "Hindustan Times",
-    "TOI": "Times of India",
-    "FE": "Financial Express",
-    "TH": "The Hindu",
-    "BL": "Business Line",
-    "ET": "Economic Times",
-    "IE": "Indian Express",
-    "Asian Age": "Asian Age",
-    "Deccan Chronicle": "Deccan Chronicle",
-    "Tribune": "Tribune",
-    "Pioneer": "Pioneer",
-    "MINT": "Mint",
-    "Business Standard": "Business Standard",
-    "Hindu_Hindi": "The Hindu Hindi",
-    "TH-School": "The Hindu School Edition",
-    "INDIAN EXPRESS UPSC": "Indian Express UPSC Edition"
-}
-
-# 🏙️ Known Edition Cities
-known_editions = [
-    # Tier-1 & Metro Cities
-    "Delhi", "Mumbai", "Chennai", "Kolkata", "Bangalore", "Hyderabad",
-
-    # Tier-2 Cities
-    "Ahmedabad", "Pune", "Lucknow", "Chandigarh", "Jaipur", "Patna", "Ranchi", "Bhopal", "Nagpur", "Indore",
-
-    # Others in your screenshots or common editions
-    "Jalandhar", "Noida", "Ghaziabad", "Kanpur", "Varanasi", "Guwahati", "Thiruvananthapuram", "Vijayawada",
-    "Coimbatore", "Visakhapatnam", "Raipur", "Ludhiana", "Dehradun", "Srinagar", "Shimla",
-
-    # International Editions
-    "London", "New York", "Dubai", "Doha", "Singapore", "International"
-]
-
-
-# -----------------------------------
-# 📥 Extract PDF Text
-# -----------------------------------
-def extract_text_from_pdf(pdf_path):
-    text = ""
-    with fitz.open(pdf_path) as doc:
-        for page in doc:
-            text += page.get_text()
-    return text
-
-# -----------------------------------
-# 📅 Extract Date from Filename
-# -----------------------------------
-def extract_date_from_filename(filename):
-    clean_filename = re.sub(r"[~‹•@+]", "-", filename)
-
-    patterns = [
-        (r'\d{4}[-_/\.]\d{2}[-_/\.]\d{2}', "%Y-%m-%d"),
-        (r'\d{2}[-_/\.]\d{2}[-_/\.]\d{4}', "%d-%m-%Y"),
-        (r'\d{2}[-_/\.]\d{2}[-_/\.]\d{2}', "%d-%m-%y")
-    ]
-
-    for pattern, fmt in patterns:
-        match = re.search(pattern, clean_filename)
-        if match:
-            raw_date = match.group(0)
-            normalized = re.sub(r'[-_/\.]', '-', raw_date)
-            try:
-                date_obj = datetime.strptime(normalized, fmt)
-                return date_obj.strftime("%B %d, %Y")
-            except:
-                continue
-    return "Date not found"
-
-# -----------------------------------
-# 📰 Extract Newspaper Name from Filename
-# -----------------------------------
-def extract_newspaper_from_filename(filename):
-    cleaned = filename.replace("_", " ").replace("-", " ").replace("•", " ").lower()
-    for key, full_name in newspaper_map.items():
-        if key.lower() in cleaned:
-            return full_name
-    return "Unknown Newspaper"
-
-# -----------------------------------
-# 🏙️ Extract Edition (city or special)
-# -----------------------------------
-def extract_edition(pdf_filename, pdf_text):
-    # Normalize filename
-    cleaned_name = pdf_filename.replace("_", " ").replace("-", " ").replace("•", " ").lower()
-
-    # 1️⃣ Check for known city editions in filename
-    for city in known_editions:
-        if city.lower() in cleaned_name:
-            return f"{city} Edition"
-
-    # 2️⃣ Check for special edition keywords
-    special_editions = {
-        "school": "School Edition",
-        "student": "Student Edition",
-        "upsc": "UPSC IAS Edition",
-        "ias": "UPSC IAS Edition",
-        "cbse": "CBSE Special Edition",
-        "ad free": "Ad-Free Edition",
-        "ad-free": "Ad-Free Edition"
-    }
-
-    for keyword, edition_label in special_editions.items():
-        if keyword.lower() in cleaned_name:
-            return edition_label
-
-    # 3️⃣ Fallback to scanning text content
-    for line in pdf_text.splitlines()[:10]:
-        for city in known_editions:
-            if city.lower() in line.lower():
-                return f"{city} Edition"
-
-    return "Edition not found"
-
-
-# -----------------------------------
-# 🛠️ Main Processing Function
-# -----------------------------------
-def process_pdf(pdf_path):
-    filename = os.path.basename(pdf_path)
-    text = extract_text_from_pdf(pdf_path)
-
-    newspaper = extract_newspaper_from_filename(filename)
-    date = extract_date_from_filename(filename)
-    edition = extract_edition(filename, text)
-
-    base_name = os.path.splitext(filename)[0]
-    output_file = f"{base_name}_metadata.txt"
-
-    with open(output_file, "w", encoding="utf-8") as f:
-        f.write(f"📰 Newspaper: {newspaper}\n")
-        f.write(f"📅 Date: {date}\n")
-        f.write(f"🏙️ Edition: {edition}\n")
-
-    print(f"✅ Metadata saved to {output_file}")
-
-# ------------ MAIN ------------
-if __name__ == "__main__":
-    pdf_path = "THE HINDU HD International Editable Full Edition 14~06~2025.pdf"  # Change this to your test file
-
-    if os.path.isfile(pdf_path) and pdf_path.lower().endswith(".pdf"):
-        print(f"🔍 Processing: {pdf_path}")
-        process_pdf(pdf_path)
-    else:
-        print("❌ File not found or not a PDF.")
+import re
+import os
+from datetime import datetime
+from page_extraction import extract_pages, header_text, HEADER_FRACTION
+from instrumentation import stage
+
+# -----------------------------------
+# 🗞️ Extended Newspaper Mapping
+# -----------------------------------
+newspaper_map = {
+    "HT": "Hindustan Times",
+    "TOI": "Times of India",
+    "FE": "Financial Express",
+    "TH": "The Hindu",
+    "BL": "Business Line",
+    "ET": "Economic Times",
+    "IE": "Indian Express",
+    "Asian Age": "Asian Age",
+    "Deccan Chronicle": "Deccan Chronicle",
+    "Tribune": "Tribune",
+    "Pioneer": "Pioneer",
+    "MINT": "Mint",
+    "Business Standard": "Business Standard",
+    "Hindu_Hindi": "The Hindu Hindi",
+    "TH-School": "The Hindu School Edition",
+    "INDIAN EXPRESS UPSC": "Indian Express UPSC Edition"
+}
+
+# 🏙️ Known Edition Cities
+known_editions = [
+    # Tier-1 & Metro Cities
+    "Delhi", "Mumbai", "Chennai", "Kolkata", "Bangalore", "Hyderabad",
+
+    # Tier-2 Cities
+    "Ahmedabad", "Pune", "Lucknow", "Chandigarh", "Jaipur", "Patna", "Ranchi", "Bhopal", "Nagpur", "Indore",
+
+    # Others in your screenshots or common editions
+    "Jalandhar", "Noida", "Ghaziabad", "Kanpur", "Varanasi", "Guwahati", "Thiruvananthapuram", "Vijayawada",
+    "Coimbatore", "Visakhapatnam", "Raipur", "Ludhiana", "Dehradun", "Srinagar", "Shimla",
+
+    # International Editions
+    "London", "New York", "Dubai", "Doha", "Singapore", "International"
+]
+
+
+special_editions = {
+    "school": "School Edition",
+    "student": "Student Edition",
+    "upsc": "UPSC IAS Edition",
+    "ias": "UPSC IAS Edition",
+    "cbse": "CBSE Special Edition",
+    "ad free": "Ad-Free Edition",
+    "ad-free": "Ad-Free Edition"
+}
+
+# -----------------------------------
+# 🔎 Precompiled Lookup Tables
+# -----------------------------------
+class PriorityMatcher:
+    # One case-insensitive regex over every needle of a table. Returns the
+    # value of the earliest-listed needle found anywhere in the text, i.e. the
+    # same answer as looping over the table with `needle.lower() in text.lower()`.
+    def __init__(self, table):
+        self.values = list(table.values())
+        self.priority = {needle.lower(): i for i, needle in reversed(list(enumerate(table)))}
+        # Lookahead so overlapping needles are all seen; at each position the
+        # alternation tries needles in table order
+        self.pattern = re.compile("(?=(" + "|".join(re.escape(needle) for needle in table) + "))", re.IGNORECASE)
+
+    def first(self, text):
+        best = None
+        for match in self.pattern.finditer(text):
+            rank = self.priority[match.group(1).lower()]
+            if best is None or rank < best:
+                best = rank
+        return None if best is None else self.values[best]
+
+newspaper_matcher = PriorityMatcher(newspaper_map)
+edition_matcher = PriorityMatcher({city: f"{city} Edition" for city in known_editions})
+special_edition_matcher = PriorityMatcher(special_editions)
+
+DATE_PATTERNS = [
+    (re.compile(r'\d{4}[-_/\.]\d{2}[-_/\.]\d{2}'), "%Y-%m-%d"),
+    (re.compile(r'\d{2}[-_/\.]\d{2}[-_/\.]\d{4}'), "%d-%m-%Y"),
+    (re.compile(r'\d{2}[-_/\.]\d{2}[-_/\.]\d{2}'), "%d-%m-%y")
+]
+FILENAME_NOISE = re.compile(r"[~‹•@+]")
+DATE_SEPARATORS = re.compile(r'[-_/\.]')
+
+# -----------------------------------
+# 📥 Extract PDF Text
+# -----------------------------------
+def extract_text_from_pdf(pdf_path, workers=1):
+    return "".join(extract_pages(pdf_path, workers=workers))
+
+def extract_header_text(pdf_path, fraction=HEADER_FRACTION):
+    # Only the top of page 1 is needed for the edition scan below
+    return header_text(pdf_path, fraction=fraction)
+
+# -----------------------------------
+# 📅 Extract Date from Filename
+# -----------------------------------
+def extract_date_from_filename(filename):
+    clean_filename = FILENAME_NOISE.sub("-", filename)
+
+    for pattern, fmt in DATE_PATTERNS:
+        match = pattern.search(clean_filename)
+        if match:
+            raw_date = match.group(0)
+            normalized = DATE_SEPARATORS.sub('-', raw_date)
+            try:
+                date_obj = datetime.strptime(normalized, fmt)
+                return date_obj.strftime("%B %d, %Y")
+            except:
+                continue
+    return "Date not found"
+
+# -----------------------------------
+# 📰 Extract Newspaper Name from Filename
+# -----------------------------------
+def extract_newspaper_from_filename(filename):
+    cleaned = filename.replace("_", " ").replace("-", " ").replace("•", " ")
+    return newspaper_matcher.first(cleaned) or "Unknown Newspaper"
+
+# -----------------------------------
+# 🏙️ Extract Edition (city or special)
+# -----------------------------------
+def extract_edition(pdf_filename, pdf_text):
+    # Normalize filename
+    cleaned_name = pdf_filename.replace("_", " ").replace("-", " ").replace("•", " ")
+
+    # 1️⃣ Check for known city editions in filename
+    # 2️⃣ Check for special edition keywords
+    edition = edition_matcher.first(cleaned_name) or special_edition_matcher.first(cleaned_name)
+    if edition:
+        return edition
+
+    # 3️⃣ Fallback to scanning text content
+    for line in pdf_text.splitlines()[:10]:
+        edition = edition_matcher.first(line)
+        if edition:
+            return edition
+
+    return "Edition not found"
+
+
+# -----------------------------------
+# 🛠️ Main Processing Function
+# -----------------------------------
+def extract_metadata(pdf_path, fraction=HEADER_FRACTION):
+    filename = os.path.basename(pdf_path)
+    text = extract_header_text(pdf_path, fraction=fraction)
+
+    with stage("metadata", file=filename, chars=len(text)):
+        return {
+            "newspaper": extract_newspaper_from_filename(filename),
+            "date": extract_date_from_filename(filename),
+            "edition": extract_edition(filename, text),
+        }
+
+def process_pdf(pdf_path, fraction=HEADER_FRACTION):
+    filename = os.path.basename(pdf_path)
+    metadata = extract_metadata(pdf_path, fraction=fraction)
+    newspaper, date, edition = metadata["newspaper"], metadata["date"], metadata["edition"]
+
+    base_name = os.path.splitext(filename)[0]
+    output_file = f"{base_name}_metadata.txt"
+
+    with open(output_file, "w", encoding="utf-8") as f:
+        f.write(f"📰 Newspaper: {newspaper}\n")
+        f.write(f"📅 Date: {date}\n")
+        f.write(f"🏙️ Edition: {edition}\n")
+
+    print(f"✅ Metadata saved to {output_file}")
+
+# ------------ MAIN ------------
+if __name__ == "__main__":
+    import argparse
+    import instrumentation
+    parser = argparse.ArgumentParser(description="Write newspaper, date and edition metadata for a newspaper PDF")
+    parser.add_argument("pdf_path", nargs="?", default="THE HINDU HD International Editable Full Edition 14~06~2025.pdf")
+    parser.add_argument("--header-fraction", type=float, default=HEADER_FRACTION,
+                        help="share of page 1 (from the top) to read; 0 reads the whole first page")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.configure(args, run_name=f"raw_text_ex {args.pdf_path}")
+    pdf_path = args.pdf_path
+
+    if os.path.isfile(pdf_path) and pdf_path.lower().endswith(".pdf"):
+        print(f"🔍 Processing: {pdf_path}")
+        process_pdf(pdf_path, fraction=args.header_fraction)
+        instrumentation.finish(args.trace)
+    else:
+        print("❌ File not found or not a PDF.")
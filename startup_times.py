@@ -0,0 +1,79 @@
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Wall-clock startup of each CLI entry point, median of several runs, then
+# what the first model use costs on top. "{pdf}" is a synthetic newspaper
+# PDF (synthetic_pdf.py), so commands that need an input do real work
+# instead of exiting early on a missing file. Runs use a scratch directory
+# as their working directory, so output files don't land in the repo.
+ENTRY_POINTS = [
+    ["summrizer.py", "--help"],
+    ["2text_fixed.py", "--help"],
+    ["extract_metadata_nlp.py", "--help"],
+    ["model_worker.py", "--help"],
+    ["raw_text_ex.py", "{pdf}"],
+]
+
+# Commands whose first run loads a model, against the same script's --help
+MODEL_ENTRY_POINTS = [
+    ["extract_metadata_nlp.py", "{pdf}"],
+]
+
+SAMPLE_TEXT = "NEW DELHI: The government announced a new policy for farmers on Monday, officials said."
+
+def time_command(args, cwd, runs=5):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=cwd)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+def command(args, pdf_path):
+    return [os.path.join(HERE, args[0])] + [arg.format(pdf=pdf_path) for arg in args[1:]]
+
+def time_first_use():
+    # In-process: what the first real call pays, as the load and the first call
+    import models
+
+    def summarize(summarizer):
+        ids = models.get_tokenizer()([SAMPLE_TEXT], add_special_tokens=False)["input_ids"]
+        return models.generate_ids(summarizer, ids, max_length=20, min_length=4, do_sample=False)
+
+    for name, loader, first_call in [("spaCy", models.get_nlp, lambda nlp: nlp(SAMPLE_TEXT)),
+                                     ("tokenizer", models.get_tokenizer, lambda tokenizer: tokenizer([SAMPLE_TEXT])),
+                                     ("summarizer", models.get_summarizer, summarize)]:
+        try:
+            start = time.perf_counter()
+            handle = loader()
+            loaded = time.perf_counter()
+            first_call(handle)
+            done = time.perf_counter()
+        except Exception as e:
+            print(f"  first {name} use failed: {e}")
+            continue
+        print(f"  first {name} use: {done - start:.2f}s (load {loaded - start:.2f}s, first call {done - loaded:.2f}s)")
+
+if __name__ == "__main__":
+    from synthetic_pdf import make_newspaper_pdf
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = make_newspaper_pdf(os.path.join(tmp, "sample.pdf"), pages=2)
+        print(f"⏱️ Startup ({sys.executable})")
+        print(f"  {'python -c pass':<36} {time_command(['-c', 'pass'], tmp):.3f}s")
+        for args in ENTRY_POINTS:
+            print(f"  {' '.join(args):<36} {time_command(command(args, pdf_path), tmp):.3f}s")
+
+        if "--skip-models" not in sys.argv:
+            print("⏱️ First model use")
+            for args in MODEL_ENTRY_POINTS:
+                total = time_command(command(args, pdf_path), tmp, runs=3)
+                startup = time_command(command([args[0], "--help"], pdf_path), tmp)
+                print(f"  {' '.join(args):<36} {total:.3f}s ({total - startup:.3f}s over --help)")
+            time_first_use()
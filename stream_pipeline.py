@@ -0,0 +1,205 @@
+import os
+import queue
+import threading
+import time
+
+from page_extraction import iter_pages
+from layout_segmentation import iter_layout_pages
+from text_cleaning import clean_page_text
+from instrumentation import stage
+from manifest import content_hash, file_hash, item_key
+
+# Marks the end of a stage's output
+_DONE = object()
+
+# === Stage Plumbing ===
+def _pump(source, outbox, errors, stop):
+    # Feed everything a generator yields into the next bounded queue, until stopped
+    try:
+        for item in source:
+            if stop.is_set():
+                break
+            outbox.put(item)
+    except BaseException as e:
+        errors.append(e)
+    finally:
+        outbox.put(_DONE)
+
+def _drain(inbox):
+    while True:
+        item = inbox.get()
+        if item is _DONE:
+            return
+        yield item
+
+def _start(source, outbox, errors, stop, name):
+    thread = threading.Thread(target=_pump, args=(source, outbox, errors, stop), name=name, daemon=True)
+    thread.start()
+    return thread
+
+def _shutdown(threads, queues, stop):
+    # Stop every stage after its current item. threads[i] feeds queues[i].
+    # Emptying the queues unblocks stages waiting on put(); once a queue's
+    # producer is gone, an end marker in it unblocks a stage waiting on get().
+    # A no-op once the stages have run to the end.
+    stop.set()
+    while any(thread.is_alive() for thread in threads):
+        for thread, q in zip(threads, queues):
+            try:
+                while True:
+                    q.get_nowait()
+            except queue.Empty:
+                pass
+            if not thread.is_alive():
+                q.put_nowait(_DONE)
+        for thread in threads:
+            thread.join(0.05)
+
+# === Stages ===
+def clean_pages(pages, pages_per_chunk=2, chunks_dir=None, skip_page=None):
+    # Optionally still writes chunk_N.txt in the same layout split_pdf_to_chunks uses.
+    # skip_page(page_num, cleaned) -> True drops a page that needs no more work.
+    from summrizer import split_into_articles
+
+    chunk_parts = []
+    chunk_index = 1
+    if chunks_dir:
+        os.makedirs(chunks_dir, exist_ok=True)
+
+    for page_num, raw_text in pages:
+        with stage("clean_page", page=page_num):
+            cleaned = clean_page_text(raw_text)
+        if chunks_dir:
+            chunk_parts.append(f"\n\n----- PAGE {page_num} -----\n\n{cleaned}\n")
+            if len(chunk_parts) == pages_per_chunk:
+                _write_chunk(chunks_dir, chunk_index, chunk_parts)
+                chunk_parts = []
+                chunk_index += 1
+        if skip_page and skip_page(page_num, cleaned):
+            continue
+        yield page_num, split_into_articles(cleaned)
+
+    if chunk_parts:
+        _write_chunk(chunks_dir, chunk_index, chunk_parts)
+
+def _write_chunk(chunks_dir, chunk_index, parts):
+    file_path = os.path.join(chunks_dir, f"chunk_{chunk_index}.txt")
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write("".join(parts).strip())
+    print(f"✅ Saved: {file_path}")
+
+def summarize_pages(inbox, batch_articles=16, batch_size=8, cache=None, dedup=None, duplicates="reuse", cascade=None):
+    # Summarize as soon as batch_articles are waiting, or earlier whenever
+    # extraction hasn't produced anything new, so results trickle out early.
+    from summrizer import process_articles
+
+    pending = []
+    for page_num, articles in _drain(inbox):
+        pending += [(page_num, article) for article in articles]
+        if pending and (len(pending) >= batch_articles or inbox.empty()):
+            yield _summarize_batch(process_articles, pending, batch_size, cache, dedup, duplicates, cascade)
+            pending = []
+    if pending:
+        yield _summarize_batch(process_articles, pending, batch_size, cache, dedup, duplicates, cascade)
+
+def _summarize_batch(process_articles, pending, batch_size, cache, dedup, duplicates, cascade):
+    entries = process_articles([article for _, article in pending], batch_size=batch_size, cache=cache,
+                               dedup=dedup, duplicates=duplicates, cascade=cascade)
+    # Every page in the batch is reported, even with no entries, so it counts as done
+    by_page = {page_num: [] for page_num, _ in pending}
+    for (page_num, _), entry in zip(pending, entries):
+        if entry:
+            by_page[page_num].append(entry)
+    return sorted(by_page.items())
+
+# === Pipeline ===
+def stream_pdf(pdf_path, pages_per_chunk=2, chunks_dir=None, batch_articles=16, batch_size=8,
+               cache=None, queue_size=4, store=None, workers=1, dedup=None, duplicates="reuse",
+               manifest=None, version=None, cascade=None, layout=False):
+    # extract -> clean + split -> summarize -> store, each stage in its own
+    # thread with bounded queues in between. Model inference releases the GIL,
+    # so page extraction and cleaning keep running while BART works.
+    # With a manifest, pages already stored with the same text and version are skipped.
+    # A cascade (see extractive.py) decides which articles get BART, within its time budget.
+    # layout=True finds articles from block geometry (layout_segmentation.py).
+    stats = {"pages": 0, "summaries": 0, "first_stored_s": None, "skipped_pages": 0}
+    if manifest:
+        pdf_key, pdf_hash = item_key("pdf", pdf_path), file_hash(pdf_path)
+        if manifest.done(pdf_key, pdf_hash, "stored", version):
+            print(f"⏭️ {pdf_path} unchanged and already stored")
+            return dict(stats, elapsed_s=0.0)
+
+    page_hashes = {}
+
+    def skip_page(page_num, cleaned):
+        page_hashes[page_num] = content_hash(cleaned)
+        if manifest.done(item_key("page", pdf_path, page_num), page_hashes[page_num], "stored", version):
+            stats["skipped_pages"] += 1
+            return True
+        return False
+
+    writer = None
+    if store is None:
+        from mongo_writer import get_writer
+        writer = get_writer(flush_interval=1.0).start_timer()
+        store = writer.save
+
+    errors = []
+    stop = threading.Event()
+    pages_q = queue.Queue(maxsize=queue_size)
+    articles_q = queue.Queue(maxsize=queue_size)
+    summaries_q = queue.Queue(maxsize=queue_size)
+
+    start = time.perf_counter()
+
+    def count_pages(pages):
+        for page in pages:
+            stats["pages"] += 1
+            yield page
+
+    threads = [
+        _start(count_pages((iter_layout_pages if layout else iter_pages)(pdf_path, workers=workers)), pages_q, errors, stop, "extract"),
+        _start(clean_pages(_drain(pages_q), pages_per_chunk, chunks_dir, skip_page if manifest else None),
+               articles_q, errors, stop, "clean"),
+        _start(summarize_pages(articles_q, batch_articles, batch_size, cache, dedup, duplicates, cascade),
+               summaries_q, errors, stop, "summarize"),
+    ]
+    queues = [pages_q, articles_q, summaries_q]
+
+    from summrizer import complete
+
+    summarized, incomplete = [], set()
+    try:
+        for batch in _drain(summaries_q):
+            for page_num, entries in batch:
+                summarized.append(page_num)
+                if not complete(entries):
+                    # Budget fallbacks are stored, but the page is redone next run
+                    incomplete.add(page_num)
+                if not entries:
+                    continue
+                store(entries, input_path=f"{pdf_path}#page={page_num}")
+                stats["summaries"] += len(entries)
+                if stats["first_stored_s"] is None:
+                    stats["first_stored_s"] = round(time.perf_counter() - start, 3)
+            if manifest:
+                manifest.mark_many([(item_key("page", pdf_path, n), page_hashes[n]) for n, _ in batch if n not in incomplete],
+                                   "page", "summarized", version, pdf_key)
+            if errors:
+                # An upstream stage failed; this batch is stored, the rest is abandoned
+                break
+    finally:
+        _shutdown(threads, queues, stop)
+
+    if writer is not None:
+        writer.flush()
+    if manifest:
+        # Pages count as stored once the writer has flushed them
+        manifest.mark_many([(item_key("page", pdf_path, n), page_hashes[n]) for n in summarized if n not in incomplete],
+                           "page", "stored", version, pdf_key)
+    if errors:
+        raise errors[0]
+    if manifest and not incomplete:
+        manifest.mark(pdf_key, "pdf", pdf_hash, "stored", version)
+    stats["elapsed_s"] = round(time.perf_counter() - start, 3)
+    return stats
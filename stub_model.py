@@ -0,0 +1,98 @@
+import time
+import zlib
+
+import models
+
+# Deterministic stand-ins for BART (and optionally spaCy) so benchmarks and
+# smoke runs work offline, without a GPU or downloaded weights.
+
+class StubTokenizer:
+    # One token per whitespace-separated word, plus BOS/EOS like BART.
+    # Remembers which word each id came from so ids can be turned back into text.
+    words = {}
+
+    def __call__(self, texts, truncation=False, add_special_tokens=True, **kwargs):
+        single = isinstance(texts, str)
+        input_ids = []
+        for text in ([texts] if single else texts):
+            ids = [self.word_id(word) for word in text.split()]
+            input_ids.append([0] + ids + [2] if add_special_tokens else ids)
+        return {"input_ids": input_ids[0] if single else input_ids}
+
+    def word_id(self, word):
+        token = zlib.crc32(word.encode()) % 50000 + 3
+        self.words[token] = word
+        return token
+
+    def decode(self, ids):
+        return " ".join(self.words.get(token, "") for token in ids if token > 2)
+
+class StubSummarizer:
+    # Echoes the leading words of each input; sleeps call_latency per call
+    # plus token_latency per input token to mimic model cost
+    def __init__(self, call_latency=0.0, token_latency=0.0):
+        self.call_latency = call_latency
+        self.token_latency = token_latency
+        self.calls = 0
+
+    def __call__(self, texts, max_length=100, min_length=0, **kwargs):
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        self.calls += 1
+        n_tokens = sum(len(text.split()) + 2 for text in texts)
+        delay = self.call_latency + self.token_latency * n_tokens
+        if delay:
+            time.sleep(delay)
+        outputs = []
+        for text in texts:
+            words = text.split()[:max(min_length, max_length // 2)]
+            outputs.append({"summary_text": " ".join(words).rstrip(".") + "."})
+        return outputs
+
+    def summarize_ids(self, input_ids, max_length=100, min_length=0, **kwargs):
+        texts = [StubTokenizer().decode(ids) for ids in input_ids]
+        return [out["summary_text"] for out in self(texts, max_length=max_length, min_length=min_length)]
+
+    # Split encoder / decoder, as models.encode_ids() and generate_encoded()
+    # use them: token_latency is paid when encoding, call_latency per call
+    def encode_ids(self, input_ids):
+        self.calls += 1
+        delay = self.call_latency + self.token_latency * sum(len(ids) + 2 for ids in input_ids)
+        if delay:
+            time.sleep(delay)
+        return [list(ids) for ids in input_ids]
+
+    def generate_encoded(self, states, max_length=100, min_length=0, **kwargs):
+        self.calls += 1
+        if self.call_latency:
+            time.sleep(self.call_latency)
+        outputs = []
+        for state in states:
+            words = StubTokenizer().decode(state).split()
+            outputs.append(" ".join(words[:max(min_length, max_length // 2)]).rstrip(".") + ".")
+        return outputs
+
+def make_stub_nlp():
+    # Blank English pipeline: rule-based sentences, lowercase text as lemma, no NER
+    import spacy
+    from spacy.language import Language
+
+    if "stub_lemmatizer" not in Language.factories:
+        @Language.component("stub_lemmatizer")
+        def stub_lemmatizer(doc):
+            for token in doc:
+                token.lemma_ = token.lower_
+            return doc
+
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    nlp.add_pipe("stub_lemmatizer")
+    return nlp
+
+def install(call_latency=0.0, token_latency=0.0, stub_spacy=False):
+    summarizer = StubSummarizer(call_latency, token_latency)
+    models.set_handle("summarizer", summarizer)
+    models.set_handle("tokenizer", StubTokenizer())
+    if stub_spacy:
+        models.set_handle("nlp", make_stub_nlp())
+    return summarizer
@@ -0,0 +1,112 @@
+import importlib.util
+import os
+
+# Interchangeable ways to run the summarization model on CPU. Every backend
+# returns an object with the summarization pipeline's call shape plus .model /
+# .tokenizer, so models.generate_ids() and summrizer.py work with any of them.
+BACKENDS = ("pipeline", "int8", "onnx")
+ONNX_CACHE_DIR = os.environ.get("ONNX_CACHE_DIR", ".onnx_models")
+
+class Seq2SeqSummarizer:
+    # Minimal stand-in for pipeline("summarization") around any seq2seq model
+    # with generate(): a quantized torch module or an ONNX Runtime model
+    def __init__(self, model, tokenizer, max_input_tokens=1024):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.max_input_tokens = max_input_tokens
+
+    def __call__(self, texts, batch_size=None, **kwargs):
+        import torch
+        single = isinstance(texts, str)
+        inputs = self.tokenizer([texts] if single else list(texts), truncation=True, max_length=self.max_input_tokens,
+                                padding=True, return_tensors="pt")
+        with torch.inference_mode():
+            output = self.model.generate(input_ids=inputs["input_ids"].to(self.model.device),
+                                         attention_mask=inputs["attention_mask"].to(self.model.device), **kwargs)
+        return [{"summary_text": text} for text in self.tokenizer.batch_decode(output, skip_special_tokens=True)]
+
+def set_torch_threads(threads):
+    # Intra-op threads for matrix math; inter-op can only be set before torch
+    # runs anything in parallel, so a late call just keeps the old value
+    import torch
+    if threads:
+        torch.set_num_threads(threads)
+        try:
+            torch.set_num_interop_threads(max(1, threads // 2))
+        except RuntimeError:
+            pass
+
+# === Backends ===
+def load_fp32(model_name):
+    from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_name).eval()
+    return Seq2SeqSummarizer(model, AutoTokenizer.from_pretrained(model_name))
+
+def load_pipeline(model_name, threads=None):
+    from transformers import pipeline
+    set_torch_threads(threads)
+    try:
+        return pipeline("summarization", model=model_name)
+    except KeyError:
+        # transformers 5 dropped the summarization task; same model, same generate()
+        return load_fp32(model_name)
+
+def load_int8(model_name, threads=None):
+    # Dynamic quantization: Linear weights stored as int8, activations
+    # quantized on the fly. Needs no calibration data.
+    import torch
+    set_torch_threads(threads)
+    summarizer = load_fp32(model_name)
+    try:
+        from torch.ao.quantization import quantize_dynamic
+    except ImportError:
+        from torch.quantization import quantize_dynamic
+    summarizer.model = quantize_dynamic(summarizer.model, {torch.nn.Linear}, dtype=torch.qint8)
+    return summarizer
+
+def onnx_available():
+    return importlib.util.find_spec("onnxruntime") is not None and importlib.util.find_spec("optimum") is not None
+
+def load_onnx(model_name, threads=None):
+    # Exported once to ONNX_CACHE_DIR, then loaded from there on later runs
+    if not onnx_available():
+        raise RuntimeError("Run: pip install optimum[onnxruntime]")
+    import onnxruntime
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    from transformers import AutoTokenizer
+
+    options = onnxruntime.SessionOptions()
+    if threads:
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+    export_dir = os.path.join(ONNX_CACHE_DIR, model_name.strip("/").replace("/", "--"))
+    if os.path.isdir(export_dir):
+        model = ORTModelForSeq2SeqLM.from_pretrained(export_dir, session_options=options, provider="CPUExecutionProvider")
+    else:
+        model = ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True, session_options=options,
+                                                     provider="CPUExecutionProvider")
+        model.save_pretrained(export_dir)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    return Seq2SeqSummarizer(model, tokenizer)
+
+_loaders = {"pipeline": load_pipeline, "int8": load_int8, "onnx": load_onnx}
+
+def load_backend(name, model_name, threads=None):
+    if name not in _loaders:
+        raise ValueError(f"Unknown summarizer backend {name!r}, expected one of {', '.join(BACKENDS)}")
+    return _loaders[name](model_name, threads=threads)
+
+# === CLI Flags ===
+def add_arguments(parser):
+    parser.add_argument("--backend", choices=BACKENDS, default=None,
+                        help="summarizer backend (default: SUMMARIZER_BACKEND or pipeline)")
+    parser.add_argument("--threads", type=int, default=None, help="intra-op threads for the summarizer")
+    parser.add_argument("--model", default=None, help="summarization model name or local path")
+    parser.add_argument("--shared-encoder", action="store_true", default=None,
+                        help="experimental: encode each article's bullet windows once and decode bullets and "
+                             "paragraph from them (the paragraph then reads only the first window)")
+
+def configure(args):
+    import models
+    models.configure_summarizer(backend=args.backend, threads=args.threads, model_name=args.model,
+                                shared_encoder=args.shared_encoder)
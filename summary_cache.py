@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+DEFAULT_CACHE_DIR = os.environ.get("SUMMARY_CACHE_DIR", ".summary_cache")
+
+# === Cache Keys ===
+def cache_key(cleaned_text, model_name, params):
+    # Same article + same model + same generation settings -> same summary
+    settings = json.dumps({"model": model_name, "params": params}, sort_keys=True)
+    digest = hashlib.sha256()
+    digest.update(settings.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(cleaned_text.encode("utf-8"))
+    return digest.hexdigest()
+
+# === On-disk Summary Cache ===
+class SummaryCache:
+    # SQLite-backed store of heading / summary points / paragraph / hashtags,
+    # evicted least-recently-used first once it grows past max_entries or
+    # max_bytes, and dropping anything older than max_age_days.
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_entries=200_000, max_bytes=512 * 1024 * 1024,
+                 max_age_days=90, evict_every=100):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, "summaries.sqlite3")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age = max_age_days * 86400 if max_age_days else None
+        self.evict_every = evict_every
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._puts = 0
+
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS summaries (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS summaries_accessed ON summaries (accessed)")
+        self.conn.commit()
+        self.evict()
+
+    def get(self, key):
+        row = self.conn.execute("SELECT value, created FROM summaries WHERE key = ?", (key,)).fetchone()
+        now = time.time()
+        if row is None or (self.max_age and now - row[1] > self.max_age):
+            self.misses += 1
+            return None
+        self.conn.execute("UPDATE summaries SET accessed = ? WHERE key = ?", (now, key))
+        self.conn.commit()
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key, value):
+        payload = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO summaries (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+            (key, payload, len(payload.encode("utf-8")), now, now))
+        self.conn.commit()
+        self._puts += 1
+        if self._puts % self.evict_every == 0:
+            self.evict()
+
+    def evict(self):
+        removed = 0
+        if self.max_age:
+            removed += self.conn.execute("DELETE FROM summaries WHERE created < ?", (time.time() - self.max_age,)).rowcount
+
+        count, total = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM summaries").fetchone()
+        if count > self.max_entries or total > self.max_bytes:
+            stale = []
+            for key, size in self.conn.execute("SELECT key, size FROM summaries ORDER BY accessed"):
+                if count <= self.max_entries and total <= self.max_bytes:
+                    break
+                stale.append((key,))
+                count -= 1
+                total -= size
+            self.conn.executemany("DELETE FROM summaries WHERE key = ?", stale)
+            removed += len(stale)
+
+        self.conn.commit()
+        self.evictions += removed
+        return removed
+
+    def stats(self):
+        count, total = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM summaries").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": count,
+            "bytes": total,
+        }
+
+    def close(self):
+        self.evict()
+        self.conn.close()
@@ -0,0 +1,208 @@
+import base64
+import json
+
+from mongo_writer import DEFAULT_MONGO_URI, DEFAULT_DB, DEFAULT_COLLECTION
+
+# Read side of the summaries collection. Every listing is ordered newest first
+# by (date, _id) and paginated by that key: the next page starts strictly after
+# the last document returned, so page 1000 costs the same as page 1 (skip/limit
+# walks past every skipped entry). Results leave out article_text unless
+# with_text=True; it is most of each document's size.
+
+# Equality fields first, then the sort key, which the keyset range also uses
+INDEXES = {
+    "summaries_date": {"keys": [("date", -1), ("_id", -1)]},
+    "summaries_city_date": {"keys": [("city", 1), ("date", -1), ("_id", -1)]},
+    "summaries_newspaper_date": {"keys": [("newspaper", 1), ("date", -1), ("_id", -1)]},
+    # Multikey: one index entry per hashtag
+    "summaries_hashtags_date": {"keys": [("hashtags", 1), ("date", -1), ("_id", -1)]},
+    # A collection has at most one text index; headings weigh more than body text
+    "summaries_text": {"keys": [("heading", "text"), ("article_text", "text")],
+                       "weights": {"heading": 10, "article_text": 1}, "default_language": "english"},
+}
+INDEX_PREFIX = "summaries_"
+
+SORT = [("date", -1), ("_id", -1)]
+LIST_FIELDS = ("heading", "summary_points", "summary_paragraph", "hashtags", "newspaper", "date", "city",
+               "source_file", "timestamp", "summary_method")
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 200
+
+# === Indexes ===
+def _same_index(existing, spec):
+    if "weights" in spec and "weights" in existing:
+        # The server stores text indexes as _fts/_ftsx keys plus weights
+        return existing["weights"] == spec["weights"]
+    keys = [(field, direction if isinstance(direction, str) else int(direction)) for field, direction in existing["key"]]
+    return keys == spec["keys"]
+
+def ensure_indexes(collection):
+    # Create missing indexes, rebuild ones whose definition changed, and drop
+    # ours that are no longer listed. Safe to run at every startup.
+    from pymongo import IndexModel
+
+    existing = collection.index_information()
+    changes = {"created": [], "rebuilt": [], "dropped": []}
+    for name in existing:
+        if name.startswith(INDEX_PREFIX) and name not in INDEXES:
+            collection.drop_index(name)
+            changes["dropped"].append(name)
+
+    to_create = []
+    for name, spec in INDEXES.items():
+        if name in existing:
+            if _same_index(existing[name], spec):
+                continue
+            collection.drop_index(name)
+            changes["rebuilt"].append(name)
+        else:
+            changes["created"].append(name)
+        options = {key: value for key, value in spec.items() if key != "keys"}
+        to_create.append(IndexModel(spec["keys"], name=name, **options))
+    if to_create:
+        collection.create_indexes(to_create)
+    return changes
+
+# === Keyset Cursors ===
+def encode_cursor(doc):
+    # Opaque token for "after this document" in SORT order
+    raw = json.dumps([doc.get("date"), doc["_id"]]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+def decode_cursor(token):
+    try:
+        date, doc_id = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+    except (ValueError, TypeError):
+        raise ValueError(f"Invalid page cursor {token!r}")
+    return date, doc_id
+
+def _after(token):
+    # Documents that sort after the cursor. Summaries without a date (null)
+    # come after every dated one in descending order, so they are always "after".
+    date, doc_id = decode_cursor(token)
+    if date is None:
+        return {"date": None, "_id": {"$lt": doc_id}}
+    return {"$or": [{"date": {"$lt": date}}, {"date": date, "_id": {"$lt": doc_id}}, {"date": None}]}
+
+# === Queries ===
+def projection(with_text=False, fields=LIST_FIELDS):
+    return dict.fromkeys(fields + ("article_text",) if with_text else fields, 1)
+
+def summary_filter(city=None, newspaper=None, hashtags=None, date_from=None, date_to=None):
+    # Dates are ISO "YYYY-MM-DD" strings (see summrizer.extract_metadata), so
+    # string ranges are date ranges. Several hashtags must all be present.
+    query = {}
+    if city:
+        query["city"] = city
+    if newspaper:
+        query["newspaper"] = newspaper
+    if isinstance(hashtags, str):
+        query["hashtags"] = hashtags
+    elif hashtags:
+        query["hashtags"] = {"$all": list(hashtags)}
+    if date_from or date_to:
+        query["date"] = {key: value for key, value in (("$gte", date_from), ("$lte", date_to)) if value}
+    return query
+
+def _page(collection, query, after, limit, fields, sort=SORT):
+    limit = max(1, min(limit, MAX_LIMIT))
+    if after:
+        query = {"$and": [query, _after(after)]} if query else _after(after)
+    # One extra document tells whether there is a next page
+    docs = list(collection.find(query, fields).sort(sort).limit(limit + 1))
+    more = len(docs) > limit
+    docs = docs[:limit]
+    return {"items": docs, "next": encode_cursor(docs[-1]) if more else None}
+
+def find_summaries(collection, city=None, newspaper=None, hashtags=None, date_from=None, date_to=None,
+                   after=None, limit=DEFAULT_LIMIT, with_text=False):
+    # {"items": [...], "next": cursor or None}; pass "next" back as after= for the following page
+    query = summary_filter(city, newspaper, hashtags, date_from, date_to)
+    return _page(collection, query, after, limit, projection(with_text))
+
+def search_summaries(collection, text, after=None, limit=DEFAULT_LIMIT, with_text=False, **filters):
+    # Full-text search over heading and article_text via the text index,
+    # newest first like every other listing; each item carries its "score"
+    query = dict(summary_filter(**filters), **{"$text": {"$search": text}})
+    fields = dict(projection(with_text), score={"$meta": "textScore"})
+    return _page(collection, query, after, limit, fields)
+
+def get_summary(collection, summary_id, with_text=True):
+    return collection.find_one({"_id": summary_id}, projection(with_text))
+
+def iter_summaries(collection, page_size=MAX_LIMIT, **kwargs):
+    # Every matching summary, one keyset page at a time
+    after = None
+    while True:
+        page = find_summaries(collection, after=after, limit=page_size, **kwargs)
+        yield from page["items"]
+        after = page["next"]
+        if after is None:
+            return
+
+# === Connection ===
+class SummaryQueries:
+    # One pooled client; indexes are checked once when it starts
+    def __init__(self, mongo_uri=DEFAULT_MONGO_URI, db_name=DEFAULT_DB, collection_name=DEFAULT_COLLECTION,
+                 client=None, ensure=True, max_pool_size=10):
+        if client is None:
+            from pymongo import MongoClient
+            client = MongoClient(mongo_uri, serverSelectionTimeoutMS=3000, maxPoolSize=max_pool_size)
+            self._owns_client = True
+        else:
+            self._owns_client = False
+        self.client = client
+        self.collection = client[db_name][collection_name]
+        self.index_changes = ensure_indexes(self.collection) if ensure else None
+
+    def find(self, **kwargs):
+        return find_summaries(self.collection, **kwargs)
+
+    def search(self, text, **kwargs):
+        return search_summaries(self.collection, text, **kwargs)
+
+    def get(self, summary_id, with_text=True):
+        return get_summary(self.collection, summary_id, with_text)
+
+    def close(self):
+        if self._owns_client:
+            self.client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Query stored summaries, one keyset page at a time")
+    parser.add_argument("--mongo-uri", default=DEFAULT_MONGO_URI)
+    parser.add_argument("--db", default=DEFAULT_DB)
+    parser.add_argument("--collection", default=DEFAULT_COLLECTION)
+    parser.add_argument("--ensure-indexes", action="store_true", help="only create / update the indexes")
+    parser.add_argument("--city")
+    parser.add_argument("--newspaper")
+    parser.add_argument("--hashtag", action="append", dest="hashtags", help="repeat to require several")
+    parser.add_argument("--from", dest="date_from", help="YYYY-MM-DD, inclusive")
+    parser.add_argument("--to", dest="date_to", help="YYYY-MM-DD, inclusive")
+    parser.add_argument("--search", help="full-text search over headings and article text")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT)
+    parser.add_argument("--after", help="cursor printed by the previous page")
+    parser.add_argument("--with-text", action="store_true", help="include article_text")
+    args = parser.parse_args()
+
+    with SummaryQueries(args.mongo_uri, args.db, args.collection) as queries:
+        changes = queries.index_changes
+        if any(changes.values()):
+            print(f"🗂️ Indexes: {json.dumps(changes)}")
+        if not args.ensure_indexes:
+            filters = {"city": args.city, "newspaper": args.newspaper, "hashtags": args.hashtags,
+                       "date_from": args.date_from, "date_to": args.date_to}
+            if args.search:
+                page = queries.search(args.search, after=args.after, limit=args.limit, with_text=args.with_text, **filters)
+            else:
+                page = queries.find(after=args.after, limit=args.limit, with_text=args.with_text, **filters)
+            for doc in page["items"]:
+                print(json.dumps(doc, ensure_ascii=False, default=str))
+            print(f"➡️ Next page: --after {page['next']}" if page["next"] else "✅ Last page")
@@ -0,0 +1,292 @@
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from instrumentation import stage
+
+# One process, one copy of spaCy + BART, shared by every job on the machine.
+# Articles from concurrent requests are pooled into micro-batches: a batch
+# goes out when max_batch articles are waiting or the oldest has waited
+# max_wait seconds, whichever comes first. Each request gets its results back
+# as NDJSON, one line per article as soon as the batch holding it finishes.
+#
+#   POST /summarize  {"articles": [...]} or {"text": "<cleaned file contents>"}
+#   GET  /metrics    queue depth, batch sizes, waits
+#   GET  /health
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = int(os.environ.get("SUMMARY_SERVICE_PORT", "8765"))
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+# Marks the end of a request's results
+_DONE = object()
+
+class _Item:
+    __slots__ = ("article", "index", "results", "queued")
+
+    def __init__(self, article, index, results):
+        self.article = article
+        self.index = index
+        self.results = results
+        self.queued = time.perf_counter()
+
+# === Micro-batching ===
+class MicroBatcher:
+    def __init__(self, max_batch=16, max_wait=0.05, batch_size=8, cache=None, dedup=None, duplicates="reuse",
+                 cascade=None):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batch_size = batch_size
+        self.cache = cache
+        self.dedup = dedup
+        self.duplicates = duplicates
+        self.cascade = cascade
+        self.queue = None
+        # The models are used from this one thread only
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="summarize")
+        self.metrics = {"requests": 0, "active_requests": 0, "articles": 0, "batches": 0, "errors": 0,
+                        "in_flight": 0, "max_queue_depth": 0, "batch_sizes": {}, "wait_s": 0.0, "batch_s": 0.0}
+
+    async def run(self):
+        self.queue = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = batch[0].queued + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # Anything else already waiting rides along, up to max_batch
+            while len(batch) < self.max_batch and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            await self._run_batch(loop, batch)
+
+    async def _run_batch(self, loop, batch):
+        started = time.perf_counter()
+        metrics = self.metrics
+        metrics["batches"] += 1
+        metrics["batch_sizes"][len(batch)] = metrics["batch_sizes"].get(len(batch), 0) + 1
+        metrics["wait_s"] += sum(started - item.queued for item in batch)
+        metrics["in_flight"] = len(batch)
+        try:
+            entries = await loop.run_in_executor(self.executor, self._summarize, [item.article for item in batch])
+        except Exception as e:
+            metrics["errors"] += 1
+            entries = [{"error": f"{type(e).__name__}: {e}"}] * len(batch)
+        finally:
+            metrics["in_flight"] = 0
+        metrics["batch_s"] += time.perf_counter() - started
+        metrics["articles"] += len(batch)
+        for item, entry in zip(batch, entries):
+            item.results.put_nowait((item.index, entry))
+
+    def _summarize(self, articles):
+        from summrizer import process_articles
+        if self.cascade:
+            # --time-budget applies to each micro-batch, not to the service's uptime
+            self.cascade.restart()
+        with stage("service_batch", articles=len(articles)):
+            entries = process_articles(articles, batch_size=self.batch_size, cache=self.cache, dedup=self.dedup,
+                                       duplicates=self.duplicates, cascade=self.cascade)
+        return [{"entry": entry} for entry in entries]
+
+    def submit(self, articles):
+        # Returns a queue that receives (index, result) per article, in completion order
+        results = asyncio.Queue()
+        for index, article in enumerate(articles):
+            self.queue.put_nowait(_Item(article, index, results))
+        self.metrics["requests"] += 1
+        self.metrics["max_queue_depth"] = max(self.metrics["max_queue_depth"], self.queue.qsize())
+        return results
+
+    def snapshot(self):
+        metrics = dict(self.metrics, batch_sizes=dict(sorted(self.metrics["batch_sizes"].items())))
+        batches, articles = metrics.pop("batches"), metrics["articles"]
+        return dict(metrics,
+                    queue_depth=self.queue.qsize() if self.queue else 0,
+                    batches=batches,
+                    mean_batch_size=round(articles / batches, 2) if batches else None,
+                    wait_ms_mean=round(metrics.pop("wait_s") * 1000 / articles, 2) if articles else None,
+                    batch_ms_mean=round(metrics.pop("batch_s") * 1000 / batches, 2) if batches else None)
+
+# === HTTP ===
+async def _read_request(reader):
+    request_line = (await reader.readline()).decode("latin-1").strip()
+    if not request_line:
+        return None
+    method, path, _ = request_line.split(" ", 2)
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1").strip()
+        if not line:
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", 0))
+    if length > MAX_BODY_BYTES:
+        raise ValueError("request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method, path.split("?", 1)[0], body
+
+def _head(status, content_type, extra=""):
+    return (f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n{extra}Connection: close\r\n\r\n").encode("latin-1")
+
+async def _send_json(writer, status, payload):
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    writer.write(_head(status, "application/json", f"Content-Length: {len(body)}\r\n") + body)
+    await writer.drain()
+
+def _articles(payload):
+    if "articles" in payload:
+        return [str(article) for article in payload["articles"]]
+    from summrizer import split_into_articles
+    return split_into_articles(payload.get("text", ""))
+
+async def _stream_summaries(writer, batcher, articles):
+    # Chunked NDJSON: {"index", "entry"} per article (entry is null when no
+    # summary came out), then a closing {"done": true, ...} line, or an
+    # {"error": ...} line if the request fails after the headers went out
+    writer.write(_head("200 OK", "application/x-ndjson", "Transfer-Encoding: chunked\r\n"))
+    started = time.perf_counter()
+
+    async def send(payload):
+        line = (json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8")
+        writer.write(f"{len(line):x}\r\n".encode("latin-1") + line + b"\r\n")
+        await writer.drain()
+
+    batcher.metrics["active_requests"] += 1
+    try:
+        results = batcher.submit(articles)
+        for _ in articles:
+            index, result = await results.get()
+            await send(dict(result, index=index))
+        await send({"done": True, "articles": len(articles), "elapsed_s": round(time.perf_counter() - started, 3)})
+    except ConnectionError:
+        raise
+    except Exception as e:
+        # The 200 status line is already out: report the error in the stream
+        batcher.metrics["errors"] += 1
+        await send({"error": f"{type(e).__name__}: {e}"})
+    finally:
+        batcher.metrics["active_requests"] -= 1
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+
+async def handle(batcher, reader, writer):
+    try:
+        request = await _read_request(reader)
+        if request is None:
+            return
+        method, path, body = request
+        if method == "GET" and path == "/health":
+            await _send_json(writer, "200 OK", {"status": "ok", "pid": os.getpid()})
+        elif method == "GET" and path == "/metrics":
+            await _send_json(writer, "200 OK", batcher.snapshot())
+        elif method == "POST" and path == "/summarize":
+            try:
+                articles = _articles(json.loads(body or b"{}"))
+            except (ValueError, TypeError, AttributeError) as e:
+                await _send_json(writer, "400 Bad Request", {"error": str(e)})
+                return
+            await _stream_summaries(writer, batcher, articles)
+        else:
+            await _send_json(writer, "404 Not Found", {"error": f"no route for {method} {path}"})
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    except ValueError as e:
+        await _send_json(writer, "400 Bad Request", {"error": str(e)})
+    finally:
+        writer.close()
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, batcher=None, ready=None):
+    # ready: optional callback(server) once listening, e.g. to learn the port when port=0
+    batcher = batcher or MicroBatcher()
+    batcher_task = asyncio.create_task(batcher.run())
+    server = await asyncio.start_server(lambda r, w: handle(batcher, r, w), host, port)
+    address = server.sockets[0].getsockname()
+    print(f"🔥 Summary service on http://{address[0]}:{address[1]} "
+          f"(max batch {batcher.max_batch}, max wait {batcher.max_wait * 1000:.0f}ms)")
+    if ready:
+        ready(server)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        batcher_task.cancel()
+        batcher.executor.shutdown(wait=False)
+
+# === Client ===
+def summarize_remote(articles=None, text=None, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=600):
+    # Yields (index, entry) as the service streams them back
+    import http.client
+    conn = http.client.HTTPConnection(host, port, timeout=timeout)
+    payload = {"articles": list(articles)} if articles is not None else {"text": text}
+    conn.request("POST", "/summarize", json.dumps(payload), {"Content-Type": "application/json"})
+    response = conn.getresponse()
+    if response.status != 200:
+        raise RuntimeError(f"summary service: {response.status} {response.read().decode('utf-8', 'replace')}")
+    try:
+        for line in response:
+            result = json.loads(line)
+            if result.get("done"):
+                return
+            if "error" in result:
+                raise RuntimeError(f"summary service: {result['error']}")
+            yield result["index"], result["entry"]
+    finally:
+        conn.close()
+
+def get_metrics(host=DEFAULT_HOST, port=DEFAULT_PORT):
+    import http.client
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    conn.request("GET", "/metrics")
+    try:
+        return json.loads(conn.getresponse().read())
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    import argparse
+    import dedup_index
+    import extractive
+    import instrumentation
+    import summarizer_backends
+    from summary_cache import SummaryCache, DEFAULT_CACHE_DIR
+    parser = argparse.ArgumentParser(description="Serve article summaries over HTTP on localhost, batching concurrent requests",
+                                     epilog="--time-budget applies to each micro-batch separately")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="listen address (keep it local)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--max-batch", type=int, default=16, help="most articles summarized together")
+    parser.add_argument("--max-wait-ms", type=float, default=50, help="longest an article waits for its batch to fill")
+    parser.add_argument("--batch-size", type=int, default=8, help="summarizer batch size inside a micro-batch")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="summary cache directory")
+    parser.add_argument("--no-cache", action="store_true", help="always re-run the models")
+    parser.add_argument("--stub-model", action="store_true", help="replace BART with a deterministic fake")
+    dedup_index.add_arguments(parser)
+    extractive.add_arguments(parser)
+    summarizer_backends.add_arguments(parser)
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.configure(args, run_name="summary_service")
+    summarizer_backends.configure(args)
+    if args.stub_model:
+        import stub_model
+        stub_model.install()
+
+    dedup, duplicates = dedup_index.from_args(args)
+    batcher = MicroBatcher(max_batch=args.max_batch, max_wait=args.max_wait_ms / 1000, batch_size=args.batch_size,
+                           cache=None if args.no_cache else SummaryCache(args.cache_dir), dedup=dedup,
+                           duplicates=duplicates, cascade=extractive.from_args(args))
+    try:
+        asyncio.run(serve(args.host, args.port, batcher))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"📊 Service metrics: {json.dumps(batcher.snapshot())}")
+        instrumentation.finish(args.trace)
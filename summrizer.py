@@ -1,210 +1,687 @@
-import re
-import spacy
-from transformers import pipeline, AutoTokenizer
-from datetime import datetime
-from pymongo import MongoClient
-import hashlib
-
-# Load spaCy model
-try:
-    nlp = spacy.load('en_core_web_sm')
-except OSError:
-    raise RuntimeError("Run: python -m spacy download en_core_web_sm")
-
-# Load summarizer
-summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
-tokenizer = AutoTokenizer.from_pretrained("facebook/bart-large-cnn")
-
-# === Text Cleaning Utilities ===
-def spacy_sent_tokenize(text):
-    doc = nlp(text)
-    return [sent.text.strip() for sent in doc.sents]
-
-def clean_truncated_heading(heading):
-    heading = re.sub(r"\b(?:in|of|at|for|by|on|with|during|and|to)\b$", '', heading.strip(), flags=re.IGNORECASE)
-    heading = re.sub(r"\b\w{1,3}$", '', heading).strip()
-    heading = re.sub(r"\bs\b", "'s", heading)
-    return heading
-
-def clean_article_text(text):
-    # Remove common junk
-    junk_patterns = [
-        r"(?i)^follow us.*",
-        r"https?://\S+",
-        r"(?i)vol\.\s*\d+\s*no\.\s*\d+",
-        r"(?i)^page\s+\d+",
-    ]
-    for pattern in junk_patterns:
-        text = re.sub(pattern, '', text)
-
-    # Remove excess whitespace
-    text = re.sub(r"\n{2,}", '\n', text)
-    text = re.sub(r"[ \t]{2,}", ' ', text)
-
-    # Fix common typos
-    typo_fixes = {
-        "no-fy": "no-fly",
-        "kick of": "kick off",
-        "fowers": "flowers",
-        "s Ganderbal": "’s Ganderbal",
-        "oors": "floors",
-        "oicials": "officials",
-        "overthe": "over the",
-        "arrangement,which": "arrangement, which"
-    }
-    for wrong, correct in typo_fixes.items():
-        text = text.replace(wrong, correct)
-
-    return text.strip()
-
-def extract_metadata(text):
-    newspaper_name = "The Hindu"
-    date_match = re.search(r"(Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday),\s+(\w+\s+\d{1,2},\s+\d{4})", text)
-    try:
-        date_obj = datetime.strptime(date_match.group(2), "%B %d, %Y").date() if date_match else None
-    except Exception:
-        date_obj = None
-    city_list = re.findall(r"(Chennai|Hyderabad|Mumbai|Bengaluru|Kolkata|Delhi|Noida|Coimbatore|Madurai|Thiruvananthapuram|Kochi|Lucknow|Patna|Cuttack|Visakhapatnam|Mangaluru|Tiruchirapalli|Hubballi|Malappuram|Mohali|Vijayawada)", text)
-    return newspaper_name, str(date_obj) if date_obj else None, city_list[0] if city_list else None
-
-def generate_hashtags(text, max_tags=5):
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    import numpy as np
-
-    tag_stoplist = {
-        "news", "centre", "government", "ajith", "home", "factory", "kill", "day", "body",
-        "cooperation", "halt", "facility", "france", "batch", "expand", "lead"
-    }
-    doc = nlp(clean_article_text(text))
-    cleaned = ' '.join([token.lemma_.lower() for token in doc if not token.is_stop and token.is_alpha])
-    preview = " ".join(spacy_sent_tokenize(cleaned)[:4])
-
-    tfidf = TfidfVectorizer(max_features=100, stop_words='english')
-    tfidf_matrix = tfidf.fit_transform([cleaned])
-    feature_array = np.array(tfidf.get_feature_names_out())
-    scores = tfidf_matrix.toarray()[0]
-    top_keywords = feature_array[scores.argsort()[::-1]][:max_tags * 3]
-
-    keywords = set()
-    for kw in top_keywords:
-        kw_clean = kw.strip().lower().replace(' ', '')
-        if kw_clean not in tag_stoplist and 2 < len(kw_clean) < 25:
-            keywords.add(kw_clean)
-
-    for ent in doc.ents:
-        if ent.label_ in {"GPE", "ORG", "EVENT", "PERSON"}:
-            ent_text = ent.text.strip().lower().replace(' ', '')
-            if ent_text in preview and ent_text not in tag_stoplist:
-                keywords.add(ent_text)
-
-    return [f"#{k}" for k in sorted(keywords)][:max_tags]
-
-def generate_heading(article_text):
-    article_text = clean_article_text(article_text)
-    sentences = spacy_sent_tokenize(article_text)
-    short_intro = " ".join(sentences[:2])
-    try:
-        tokens = tokenizer(short_intro, return_tensors="pt", truncation=False)
-        max_len = min(20, max(5, int(tokens["input_ids"].shape[1] * 0.5)))
-        summary = summarizer(short_intro, max_length=max_len, min_length=4, do_sample=False)[0]["summary_text"]
-        return clean_truncated_heading(summary.replace('.', '').strip())
-    except Exception:
-        return sentences[0] if sentences else "Untitled"
-
-def summarize_article(article_text, max_points=5):
-    article_text = clean_article_text(article_text)
-    sentences = spacy_sent_tokenize(article_text)
-    chunks = [" ".join(sentences[i:i+6]) for i in range(0, len(sentences), 6)]
-    summary_points = []
-
-    for chunk in chunks:
-        try:
-            tokens = tokenizer(chunk, return_tensors="pt", truncation=False)
-            if tokens["input_ids"].shape[1] < 40:
-                continue
-            max_len = min(100, max(30, int(tokens["input_ids"].shape[1] * 0.5)))
-            summary = summarizer(chunk, max_length=max_len, min_length=20, do_sample=False)[0]["summary_text"]
-            summary_points += [p.strip() for p in spacy_sent_tokenize(summary) if len(p.strip()) > 10]
-        except Exception:
-            continue
-    return summary_points[:max_points]
-
-def generate_summary_paragraph(article_text):
-    cleaned = clean_article_text(article_text)
-    try:
-        tokens = tokenizer(cleaned, return_tensors="pt", truncation=False)
-        if tokens["input_ids"].shape[1] > 40:
-            return summarizer(cleaned, max_length=150, min_length=40, do_sample=False)[0]["summary_text"]
-    except Exception:
-        return None
-
-def split_into_articles(text):
-    return [s.strip() for s in re.split(r'\n-{3,}\n', text.strip()) if len(s.strip()) > 100 and not s.strip().startswith("PAGE ")]
-
-def process_file(file_path):
-    with open(file_path, "r", encoding="utf-8") as f:
-        text = f.read()
-
-    articles = split_into_articles(text)
-    print(f"🧩 Found {len(articles)} article(s)")
-    results = []
-
-    for article in articles:
-        cleaned_article = clean_article_text(article)
-        heading = generate_heading(cleaned_article)
-        summary_points = summarize_article(cleaned_article)
-        summary_paragraph = generate_summary_paragraph(cleaned_article)
-        hashtags = generate_hashtags(cleaned_article)
-        newspaper, date, city = extract_metadata(cleaned_article)
-
-        if summary_points:
-            results.append({
-                "heading": heading,
-                "summary_points": summary_points,
-                "summary_paragraph": summary_paragraph,
-                "hashtags": hashtags,
-                "article_text": cleaned_article,
-                "newspaper": newspaper,
-                "date": date,
-                "city": city
-            })
-    return results
-
-def save_to_mongodb(summaries, input_path=None, mongo_uri="mongodb://localhost:27017", db_name="news_summarizer", collection_name="summaries"):
-    try:
-        client = MongoClient(mongo_uri, serverSelectionTimeoutMS=3000)
-        client.server_info()
-    except Exception as e:
-        print("❌ MongoDB connection failed:", e)
-        return
-
-    collection = client[db_name][collection_name]
-    for entry in summaries:
-        doc_id = hashlib.md5((entry["heading"] + " ".join(entry["summary_points"])).encode()).hexdigest()
-        doc = {
-            "_id": doc_id,
-            "heading": entry["heading"],
-            "summary_points": entry["summary_points"],
-            "summary_paragraph": entry["summary_paragraph"],
-            "hashtags": entry["hashtags"],
-            "article_text": entry["article_text"],
-            "source_file": input_path,
-            "timestamp": datetime.utcnow(),
-            "newspaper": entry["newspaper"],
-            "date": entry["date"],
-            "city": entry["city"]
-        }
-        collection.update_one({"_id": doc_id}, {"$set": doc}, upsert=True)
-
-    print(f"✅ {len(summaries)} summaries saved to MongoDB.")
-
-if __name__ == "__main__":
-    import sys
-    if len(sys.argv) < 2:
-        print("❌ Provide input file path")
-        sys.exit(1)
-
-    file_path = sys.argv[1]
-    data = process_file(file_path)
-    save_to_mongodb(data, input_path=file_path)
-    print("✅ All done.")
+import re
+from datetime import datetime
+from mongo_writer import get_writer, DEFAULT_MONGO_URI, DEFAULT_DB, DEFAULT_COLLECTION
+from manifest import content_hash
+from summary_cache import SummaryCache, cache_key, DEFAULT_CACHE_DIR
+from text_cleaning import clean_article_text, rules_digest
+from instrumentation import stage, count, tracing, profiled
+
+# spaCy, the summarizer and its tokenizer load on first use (see models.py)
+import models
+from models import (MODEL_MAX_TOKENS, SPECIAL_TOKENS, encode_ids, generate_encoded, get_nlp, get_summarizer,
+                    get_tokenizer, summarize_ids, summarizer_id, supports_encoder_states)
+
+# Everything that changes the summary for a given article text; part of the cache key
+GENERATION_PARAMS = {
+    "heading": {"max_length": 20, "min_length": 4},
+    "points": {"max_length": 100, "min_length": 20, "window_tokens": 384},
+    "paragraph": {"max_length": 150, "min_length": 40},
+    "max_points": 5,
+    "max_tags": 5,
+    "hashtag_scoring": "corpus-idf",
+}
+
+# summary_method of articles the time budget moved from BART to extractive
+FALLBACK_METHOD = "extractive_fallback"
+
+# spaCy batching and the components each step can do without
+SPACY_BATCH_SIZE = 32
+SENTENCE_ONLY = ["tagger", "attribute_ruler", "lemmatizer", "ner"]
+
+# === Text Cleaning Utilities ===
+def spacy_sent_tokenize(text):
+    doc = get_nlp()(text, disable=SENTENCE_ONLY)
+    return [sent.text.strip() for sent in doc.sents]
+
+def spacy_sent_tokenize_batch(texts, n_process=1):
+    with stage("spacy_sentences", texts=len(texts)):
+        return [[sent.text.strip() for sent in doc.sents]
+                for doc in get_nlp().pipe(texts, batch_size=SPACY_BATCH_SIZE, n_process=n_process, disable=SENTENCE_ONLY)]
+
+def clean_truncated_heading(heading):
+    heading = re.sub(r"\b(?:in|of|at|for|by|on|with|during|and|to)\b$", '', heading.strip(), flags=re.IGNORECASE)
+    heading = re.sub(r"\b\w{1,3}$", '', heading).strip()
+    heading = re.sub(r"\bs\b", "'s", heading)
+    return heading
+
+# === Article Analysis ===
+class ArticleAnalysis:
+    # One cleaned + parsed article; every downstream step reads from this
+    # instead of cleaning and calling nlp() again.
+    def __init__(self, text, doc):
+        self.text = text
+        sents = list(doc.sents)
+        self.sentences = [sent.text.strip() for sent in sents]
+        self.lemmas = [token.lemma_.lower() for token in doc if not token.is_stop and token.is_alpha]
+        self.preview_lemmas = [token.lemma_.lower() for sent in sents[:4] for token in sent if not token.is_stop and token.is_alpha]
+        # Per sentence, for extractive scoring (see extractive.py)
+        self.sentence_lemmas = [[token.lemma_.lower() for token in sent if not token.is_stop and token.is_alpha] for sent in sents]
+        self.entities = [(ent.text, ent.label_) for ent in doc.ents]
+        # BART token ids per sentence, filled in by tokenize_sentences()
+        self.sentence_ids = None
+
+@profiled
+def analyze_articles(articles, cleaned=False, n_process=1):
+    texts = list(articles) if cleaned else [clean_article_text(article) for article in articles]
+    with stage("spacy_analyze", articles=len(texts), chars=sum(map(len, texts))):
+        docs = get_nlp().pipe(texts, batch_size=SPACY_BATCH_SIZE, n_process=n_process)
+        return [ArticleAnalysis(text, doc) for text, doc in zip(texts, docs)]
+
+def as_analysis(article):
+    if isinstance(article, ArticleAnalysis):
+        return article
+    return analyze_articles([article])[0]
+
+def extract_metadata(text):
+    if isinstance(text, ArticleAnalysis):
+        text = text.text
+    newspaper_name = "The Hindu"
+    date_match = re.search(r"(Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday),\s+(\w+\s+\d{1,2},\s+\d{4})", text)
+    try:
+        date_obj = datetime.strptime(date_match.group(2), "%B %d, %Y").date() if date_match else None
+    except Exception:
+        date_obj = None
+    city_list = re.findall(r"(Chennai|Hyderabad|Mumbai|Bengaluru|Kolkata|Delhi|Noida|Coimbatore|Madurai|Thiruvananthapuram|Kochi|Lucknow|Patna|Cuttack|Visakhapatnam|Mangaluru|Tiruchirapalli|Hubballi|Malappuram|Mohali|Vijayawada)", text)
+    return newspaper_name, str(date_obj) if date_obj else None, city_list[0] if city_list else None
+
+TAG_STOPLIST = {
+    "news", "centre", "government", "ajith", "home", "factory", "kill", "day", "body",
+    "cooperation", "halt", "facility", "france", "batch", "expand", "lead"
+}
+
+def hashtag_terms(analysis):
+    from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+    return [lemma for lemma in analysis.lemmas if len(lemma) > 1 and lemma not in ENGLISH_STOP_WORDS]
+
+@profiled
+def generate_hashtags_batch(analyses, max_tags=5, index=None, update=True):
+    with stage("hashtags", articles=len(analyses)):
+        return _hashtags_batch(analyses, max_tags, index, update)
+
+def _hashtags_batch(analyses, max_tags, index, update):
+    # Real TF-IDF against every article seen so far: the batch is added to the
+    # corpus document frequencies (unless update=False, e.g. for previews),
+    # then scored as one sparse matrix x IDF vector
+    # (numpy / scipy.sparse load with the index, not at startup)
+    from idf_index import get_idf_index
+    index = index or get_idf_index()
+    term_lists = [hashtag_terms(analysis) for analysis in analyses]
+    scores = index.tfidf(term_lists, ingest=update)
+    if update:
+        index.maybe_save()
+
+    tags = []
+    for row, analysis in enumerate(analyses):
+        preview = ' '.join(analysis.preview_lemmas)
+        keywords = set()
+        for kw in index.top_terms(scores, row, max_tags * 3):
+            kw_clean = kw.strip().lower().replace(' ', '')
+            if kw_clean not in TAG_STOPLIST and 2 < len(kw_clean) < 25:
+                keywords.add(kw_clean)
+
+        for ent_text, label in analysis.entities:
+            if label in {"GPE", "ORG", "EVENT", "PERSON"}:
+                ent_text = ent_text.strip().lower().replace(' ', '')
+                if ent_text in preview and ent_text not in TAG_STOPLIST:
+                    keywords.add(ent_text)
+
+        tags.append([f"#{k}" for k in sorted(keywords)][:max_tags])
+    return tags
+
+def generate_hashtags(text, max_tags=5, update=False):
+    # A one-off article doesn't count toward the corpus unless asked to
+    return generate_hashtags_batch([as_analysis(text)], max_tags=max_tags, update=update)[0]
+
+def generate_heading(article_text):
+    plan = plan_article(as_analysis(article_text))
+    sentences = plan["sentences"]
+    try:
+        if not plan["heading"]:
+            raise ValueError("empty article")
+        n_tokens = len(plan["heading"]) + SPECIAL_TOKENS
+        max_len = min(20, max(5, int(n_tokens * 0.5)))
+        summary = call_summarizer("heading", [plan["heading"]], n_tokens, max_length=max_len, min_length=4)[0]
+        return clean_truncated_heading(summary.replace('.', '').strip())
+    except Exception:
+        return sentences[0] if sentences else "Untitled"
+
+def summarize_article(article_text, max_points=5):
+    summary_points = []
+    for chunk in plan_article(as_analysis(article_text))["chunks"]:
+        try:
+            n_tokens = len(chunk) + SPECIAL_TOKENS
+            if n_tokens < 40:
+                count("skipped_short_chunks")
+                continue
+            max_len = min(100, max(30, int(n_tokens * 0.5)))
+            summary = call_summarizer("points", [chunk], n_tokens, max_length=max_len, min_length=20)[0]
+            summary_points += [p.strip() for p in spacy_sent_tokenize(summary) if len(p.strip()) > 10]
+        except Exception:
+            continue
+    return summary_points[:max_points]
+
+def generate_summary_paragraph(article_text):
+    paragraph = plan_article(as_analysis(article_text))["paragraph"]
+    try:
+        n_tokens = len(paragraph) + SPECIAL_TOKENS
+        if n_tokens > 40:
+            return call_summarizer("paragraph", [paragraph], n_tokens, max_length=150, min_length=40)[0]
+        count("skipped_short_paragraphs")
+    except Exception:
+        return None
+
+@profiled
+def split_into_articles(text):
+    with stage("split_articles", chars=len(text)):
+        return _split_articles(text)
+
+def _split_articles(text):
+    return [s.strip() for s in re.split(r'\n-{3,}\n', text.strip()) if len(s.strip()) > 100 and not s.strip().startswith("PAGE ")]
+
+# === Batched Inference ===
+DEFAULT_BATCH_SIZE = 8
+
+def generation_lengths(kind, n_tokens):
+    # Same max/min lengths the per-article functions above use
+    if kind == "heading":
+        return min(20, max(5, int(n_tokens * 0.5))), 4
+    if kind == "points":
+        return min(100, max(30, int(n_tokens * 0.5))), 20
+    return 150, 40
+
+def token_counts(texts):
+    texts = list(texts)
+    if not texts:
+        return []
+    return [len(ids) for ids in get_tokenizer()(texts, truncation=False)["input_ids"]]
+
+def tokenize_sentences(analyses):
+    # One tokenizer call covers every sentence of every article not tokenized
+    # yet. Sentences get the leading space they have inside a window.
+    todo = [analysis for analysis in analyses if analysis.sentence_ids is None]
+    flat = [" " + sentence for analysis in todo for sentence in analysis.sentences]
+    ids = get_tokenizer()(flat, truncation=False, add_special_tokens=False)["input_ids"] if flat else []
+    start = 0
+    for analysis in todo:
+        analysis.sentence_ids = ids[start:start + len(analysis.sentences)]
+        start += len(analysis.sentences)
+    return analyses
+
+def pack_sentences(sentence_ids, budget):
+    # Greedily fill windows of up to budget tokens with whole sentences; a
+    # single sentence longer than the budget is cut into budget-sized pieces
+    windows, window = [], []
+    for ids in sentence_ids:
+        if window and len(window) + len(ids) > budget:
+            windows.append(window)
+            window = []
+        while len(ids) > budget:
+            windows.append(list(ids[:budget]))
+            ids = ids[budget:]
+        window = window + list(ids)
+    if window:
+        windows.append(window)
+    return windows
+
+def plan_article(analysis):
+    # Collect every summarizer request one article needs, as token ids without
+    # BOS/EOS, without running any of them
+    if analysis.sentence_ids is None:
+        tokenize_sentences([analysis])
+    budget = MODEL_MAX_TOKENS - SPECIAL_TOKENS
+    windows = pack_sentences(analysis.sentence_ids, budget)
+    return {
+        "sentences": analysis.sentences,
+        "heading": [token for ids in analysis.sentence_ids[:2] for token in ids][:budget],
+        "chunks": pack_sentences(analysis.sentence_ids, min(budget, GENERATION_PARAMS["points"]["window_tokens"])),
+        # Leading sentences that fit BART's window instead of the whole article
+        "paragraph": windows[0] if windows else [],
+    }
+
+def call_summarizer(kind, input_ids, n_tokens, **kwargs):
+    # Every BART call goes through here so a trace can attribute time and
+    # tokens to the call type; output tokens are only counted while tracing
+    with stage(f"bart_{kind}", batch=len(input_ids), input_tokens=n_tokens) as span:
+        summaries = summarize_ids(input_ids, do_sample=False, **kwargs)
+        if tracing():
+            span["output_tokens"] = sum(token_counts(summaries))
+    return summaries
+
+def call_decoder(kind, states, n_tokens, **kwargs):
+    # Same as call_summarizer, for inputs already run through the encoder
+    with stage(f"bart_{kind}", batch=len(states), input_tokens=n_tokens, encoded=True) as span:
+        summaries = generate_encoded(get_summarizer(), states, do_sample=False, **kwargs)
+        if tracing():
+            span["output_tokens"] = sum(token_counts(summaries))
+    return summaries
+
+def length_buckets(requests, batch_size):
+    # Group requests by (max_length, min_length), so each is generated with
+    # exactly the lengths it gets on its own, then sort each group by token
+    # length and cut it into batches that pad to roughly the same width.
+    groups = {}
+    for i, req in enumerate(requests):
+        groups.setdefault((req["max_length"], req["min_length"]), []).append(i)
+    for lengths in sorted(groups):
+        order = sorted(groups[lengths], key=lambda i: requests[i]["n_tokens"])
+        for start in range(0, len(order), batch_size):
+            yield order[start:start + batch_size]
+
+@profiled
+def run_batched(requests, batch_size=DEFAULT_BATCH_SIZE, call=call_summarizer, field="ids"):
+    # call/field: call_decoder and "state" to decode from encoder states instead of token ids
+    outputs = [None] * len(requests)
+    for batch in length_buckets(requests, batch_size):
+        # Batches never mix lengths (min_length differs per kind), so never mix call types either
+        kind = requests[batch[0]]["kind"]
+        inputs = [requests[i][field] for i in batch]
+        max_len, min_len = requests[batch[0]]["max_length"], requests[batch[0]]["min_length"]
+        try:
+            summaries = call(kind, inputs, sum(requests[i]["n_tokens"] for i in batch),
+                             max_length=max_len, min_length=min_len, batch_size=len(inputs))
+            for i, summary in zip(batch, summaries):
+                outputs[i] = summary
+        except Exception:
+            # Retry one by one so a single bad input doesn't sink the batch
+            count("batch_fallbacks")
+            for i in batch:
+                try:
+                    outputs[i] = call(kind, [requests[i][field]], requests[i]["n_tokens"],
+                                      max_length=requests[i]["max_length"], min_length=requests[i]["min_length"])[0]
+                except Exception:
+                    outputs[i] = None
+    return outputs
+
+def runnable_requests(requests):
+    # Fills in generation lengths from n_tokens and drops what the model
+    # isn't asked for: chunks under 40 tokens, paragraphs of 40 or fewer
+    for req in requests:
+        req["max_length"], req["min_length"] = generation_lengths(req["kind"], req["n_tokens"])
+    runnable = [req for req in requests if not (
+        (req["kind"] == "points" and req["n_tokens"] < 40) or
+        (req["kind"] == "paragraph" and req["n_tokens"] <= 40))]
+    count("skipped_short_chunks", sum(req["kind"] == "points" and req["n_tokens"] < 40 for req in requests))
+    count("skipped_short_paragraphs", sum(req["kind"] == "paragraph" and req["n_tokens"] <= 40 for req in requests))
+    return runnable
+
+def assemble_summaries(plans, requests, max_points=5, n_process=1):
+    # Split every bullet-chunk summary into sentences in one nlp.pipe pass
+    point_reqs = [req for req in requests if req["kind"] == "points" and req.get("output") is not None]
+    for req, sentences in zip(point_reqs, spacy_sent_tokenize_batch([req["output"] for req in point_reqs], n_process=n_process)):
+        req["points"] = [p.strip() for p in sentences if len(p.strip()) > 10]
+
+    results = [{"heading": None, "summary_points": [], "summary_paragraph": None} for _ in plans]
+    for req in requests:
+        output = req.get("output")
+        result = results[req["article"]]
+        if req["kind"] == "heading" and output is not None:
+            result["heading"] = clean_truncated_heading(output.replace('.', '').strip())
+        elif req["kind"] == "points" and output is not None:
+            result["summary_points"] += req["points"]
+        elif req["kind"] == "paragraph":
+            result["summary_paragraph"] = output
+
+    for plan, result in zip(plans, results):
+        if result["heading"] is None:
+            sentences = plan["sentences"]
+            result["heading"] = sentences[0] if sentences else "Untitled"
+        result["summary_points"] = result["summary_points"][:max_points]
+    return results
+
+def summarize_articles_batched(analyses, max_points=5, batch_size=DEFAULT_BATCH_SIZE, n_process=1):
+    # Each article is tokenized once; windows carry their ids straight to generation
+    plans = [plan_article(analysis) for analysis in tokenize_sentences(analyses)]
+
+    requests = []
+    for a, plan in enumerate(plans):
+        if plan["heading"]:
+            requests.append({"article": a, "kind": "heading", "ids": plan["heading"]})
+        for chunk in plan["chunks"]:
+            requests.append({"article": a, "kind": "points", "ids": chunk})
+        requests.append({"article": a, "kind": "paragraph", "ids": plan["paragraph"]})
+    for req in requests:
+        req["n_tokens"] = len(req["ids"]) + SPECIAL_TOKENS
+
+    runnable = runnable_requests(requests)
+    print(f"⚙️ Running {len(runnable)} summarizer request(s) in batches of {batch_size}")
+    for req, output in zip(runnable, run_batched(runnable, batch_size)):
+        req["output"] = output
+    return assemble_summaries(plans, requests, max_points, n_process)
+
+# === Shared Encoder Pass ===
+# Experimental. The per-request path above encodes most of an article three
+# times: the heading's leading sentences, every bullet window, and the
+# paragraph's first 1022 tokens. Here each bullet window goes through the
+# encoder once and outputs are decoded from those states:
+#   heading    its own leading sentences, as in the per-request path (short)
+#   bullets    each window's own states
+#   paragraph  window 0's states, so it reads the first window_tokens tokens
+#              rather than the first 1022
+def encode_windows(inputs, batch_size):
+    # {key: encoder state} for {key: token ids}, encoded in length-sorted
+    # batches so padding stays small
+    summarizer = get_summarizer()
+    order = sorted(inputs, key=lambda key: len(inputs[key]))
+    states = {}
+    for start in range(0, len(order), batch_size):
+        batch = order[start:start + batch_size]
+        input_ids = [inputs[key] for key in batch]
+        with stage("bart_encode", batch=len(batch), input_tokens=sum(len(ids) + SPECIAL_TOKENS for ids in input_ids)):
+            states.update(zip(batch, encode_ids(summarizer, input_ids)))
+    return states
+
+def summarize_shared_encoder(analyses, max_points=5, batch_size=DEFAULT_BATCH_SIZE, n_process=1):
+    plans = [plan_article(analysis) for analysis in tokenize_sentences(analyses)]
+    results = [None] * len(plans)
+    # Encoder states are held for batch_size articles at a time
+    for start in range(0, len(plans), batch_size):
+        group = list(range(start, min(start + batch_size, len(plans))))
+        requests = []
+        for a in group:
+            chunks = plans[a]["chunks"]
+            if not chunks:
+                continue
+            if plans[a]["heading"]:
+                requests.append({"article": a, "kind": "heading", "window": (a, "heading"),
+                                 "n_tokens": len(plans[a]["heading"]) + SPECIAL_TOKENS})
+            for w, chunk in enumerate(chunks):
+                requests.append({"article": a, "kind": "points", "window": (a, w),
+                                 "n_tokens": len(chunk) + SPECIAL_TOKENS})
+            requests.append({"article": a, "kind": "paragraph", "window": (a, 0),
+                             "n_tokens": len(chunks[0]) + SPECIAL_TOKENS})
+
+        runnable = runnable_requests(requests)
+        inputs = {}
+        for req in runnable:
+            a, w = req["window"]
+            inputs[req["window"]] = plans[a]["heading"] if w == "heading" else plans[a]["chunks"][w]
+        try:
+            states = encode_windows(inputs, batch_size)
+        except Exception:
+            # Same articles through the per-request path
+            count("shared_encoder_fallbacks")
+            for a, result in zip(group, summarize_articles_batched([analyses[a] for a in group], max_points,
+                                                                   batch_size, n_process)):
+                results[a] = result
+            continue
+        for req in runnable:
+            req["state"] = states[req["window"]]
+        print(f"⚙️ Decoding {len(runnable)} summarizer request(s) from {len(states)} encoded window(s)")
+        for req, output in zip(runnable, run_batched(runnable, batch_size, call=call_decoder, field="state")):
+            req["output"] = output
+        for req in runnable:
+            del req["state"]
+
+        local = {a: i for i, a in enumerate(group)}
+        for req in requests:
+            req["article"] = local[req["article"]]
+        for a, result in zip(group, assemble_summaries([plans[a] for a in group], requests, max_points, n_process)):
+            results[a] = result
+    return results
+
+def article_id(cleaned_article):
+    # Identifies an article's content regardless of model or settings (the dedup index key)
+    return content_hash(cleaned_article)
+
+def summary_cache_key(article):
+    # The article's content hash under the current model and generation
+    # settings, so a summary made with other settings never matches
+    return cache_key(article, summarizer_id(), GENERATION_PARAMS)
+
+def pipeline_version(cascade=None):
+    # Anything that changes the cleaned text or the summaries for the same
+    # input; recorded in the processing manifest. The default always-abstractive
+    # policy adds nothing, so existing manifests stay valid. The time budget
+    # isn't part of it: chunks with budget fallbacks are never marked done.
+    params = GENERATION_PARAMS
+    if cascade and cascade.policy != "abstractive":
+        params = dict(params, policy=cascade.policy)
+        if cascade.policy == "cascade":
+            params.update(top_fraction=cascade.top_fraction, top_min_chars=cascade.min_chars)
+    return cache_key(rules_digest(), summarizer_id(), params)[:16]
+
+def complete(entries):
+    # False if any article fell back to extractive for lack of time; such
+    # chunks must not be checkpointed as summarized or stored
+    return not any(entry.get("summary_method") == FALLBACK_METHOD for entry in entries if entry)
+
+def build_entry(article_text, summary, duplicate=False):
+    # duplicate: the summary was reused from the article this one copies
+    if not summary["summary_points"]:
+        return None
+    newspaper, date, city = extract_metadata(article_text)
+    entry = {
+        "heading": summary["heading"],
+        "summary_points": summary["summary_points"],
+        "summary_paragraph": summary["summary_paragraph"],
+        "hashtags": summary["hashtags"],
+        "summary_method": summary.get("method", "abstractive"),
+        "article_text": article_text,
+        "newspaper": newspaper,
+        "date": date,
+        "city": city
+    }
+    if duplicate:
+        entry["duplicate"] = True
+    return entry
+
+def summarize_abstractive(analyses, batch_size=DEFAULT_BATCH_SIZE, n_process=1):
+    if not batch_size:
+        summaries = [{"heading": generate_heading(analysis),
+                      "summary_points": summarize_article(analysis),
+                      "summary_paragraph": generate_summary_paragraph(analysis)}
+                     for analysis in analyses]
+    elif models.SHARED_ENCODER and supports_encoder_states(get_summarizer()):
+        summaries = summarize_shared_encoder(analyses, batch_size=batch_size, n_process=n_process)
+    else:
+        summaries = summarize_articles_batched(analyses, batch_size=batch_size, n_process=n_process)
+    for summary in summaries:
+        summary["method"] = "abstractive"
+    return summaries
+
+def summarize_analyses(analyses, batch_size=DEFAULT_BATCH_SIZE, n_process=1, cascade=None):
+    # Without a cascade every article goes through BART; with one, the
+    # articles it routes away (or that the time budget leaves) are extractive
+    if not analyses:
+        return []
+    summaries = [None] * len(analyses)
+    abstractive = cascade.route(analyses) if cascade else list(range(len(analyses)))
+    # Under a time budget, BART runs a few articles at a time so the deadline is checked in between
+    group = max(1, batch_size) if cascade and cascade.time_budget is not None else max(1, len(abstractive))
+    for start in range(0, len(abstractive), group):
+        if cascade and cascade.expired():
+            break
+        part = abstractive[start:start + group]
+        for i, summary in zip(part, summarize_abstractive([analyses[i] for i in part], batch_size, n_process)):
+            summaries[i] = summary
+
+    rest = [i for i, summary in enumerate(summaries) if summary is None]
+    if rest:
+        from extractive import summarize_extractive_batch
+        # Articles meant for BART that the time budget left out are marked, so
+        # their chunks aren't checkpointed as done and a later run redoes them
+        fallback = set(abstractive) & set(rest)
+        for i, summary in zip(rest, summarize_extractive_batch([analyses[i] for i in rest])):
+            summaries[i] = summary
+            if i in fallback:
+                summary["method"] = FALLBACK_METHOD
+    if cascade:
+        degraded = len(abstractive) - (len(analyses) - len(rest))
+        cascade.counts["abstractive"] += len(analyses) - len(rest)
+        cascade.counts["extractive"] += len(rest) - degraded
+        cascade.counts["degraded"] += degraded
+        count("extractive_summaries", len(rest))
+        count("budget_degraded", degraded)
+
+    tagged = [i for i, summary in enumerate(summaries) if summary["summary_points"]]
+    tags = generate_hashtags_batch([analyses[i] for i in tagged]) if tagged else []
+    for summary in summaries:
+        summary["hashtags"] = []
+    for i, hashtags in zip(tagged, tags):
+        summaries[i]["hashtags"] = hashtags
+    return summaries
+
+def find_duplicates(dedup, keys, texts):
+    # {article index: content hash of the earlier article it copies}, this batch or a previous run
+    with stage("dedup", articles=len(keys)):
+        matches = dedup.check(keys, texts)
+    copies = {i: match for i, match in enumerate(matches) if match is not None}
+    count("duplicates", len(copies))
+    if keys:
+        print(f"🪞 Duplicates: {len(copies)} of {len(keys)} article(s) ({len(copies) / len(keys):.0%})")
+    return copies
+
+def process_articles(articles, batch_size=DEFAULT_BATCH_SIZE, n_process=1, cache=None, dedup=None, duplicates="reuse",
+                     cascade=None):
+    # Returns one entry per input article (None where no summary points came
+    # out, or for a duplicate when duplicates="skip")
+    cleaned_articles = []
+    for i, article in enumerate(articles):
+        with stage("clean_article", article=i, chars=len(article)):
+            cleaned_articles.append(clean_article_text(article))
+    summaries = [None] * len(cleaned_articles)
+
+    # Near-duplicates are dropped, or reuse the summary of the article they
+    # copy: after it is summarized if it's in this batch, from the cache
+    # otherwise (under the current settings only; on a miss they're summarized)
+    ids = [article_id(text) for text in cleaned_articles] if cache or dedup else []
+    copies = find_duplicates(dedup, ids, cleaned_articles) if dedup else {}
+    first_seen = {}
+    for i, key in enumerate(ids):
+        first_seen.setdefault(key, i)
+    skipped = set(copies) if duplicates == "skip" else set()
+    follows = {i: first_seen[key] for i, key in copies.items() if i not in skipped and first_seen.get(key, i) < i}
+
+    # Anything already in the cache skips spaCy and BART entirely
+    reused, done = set(follows), []
+    if cache:
+        with stage("cache_lookup", articles=len(ids)):
+            for i, key in enumerate(ids):
+                if i not in skipped and i not in follows:
+                    summaries[i] = cache.get(summary_cache_key(copies.get(i, key)))
+                    if summaries[i] is not None and i in copies:
+                        reused.add(i)
+                    elif summaries[i] is not None:
+                        done.append(key)
+    pending = [i for i, summary in enumerate(summaries) if summary is None and i not in skipped and i not in follows]
+    if cache:
+        hits = sum(summary is not None for summary in summaries)
+        count("cache_hits", hits)
+        count("cache_misses", len(pending))
+        print(f"🗃️ Cache: {hits} hit(s), {len(pending)} to summarize")
+
+    analyses = analyze_articles([cleaned_articles[i] for i in pending], cleaned=True, n_process=n_process)
+    for i, summary in zip(pending, summarize_analyses(analyses, batch_size=batch_size, n_process=n_process, cascade=cascade)):
+        summaries[i] = summary
+        # Extractive summaries are cheap to redo and must not stand in for BART's later
+        cached = cache and summary["method"] == "abstractive"
+        if cached:
+            cache.put(summary_cache_key(ids[i]), summary)
+        if dedup and (cached or not cache):
+            done.append(ids[i])
+    for i in sorted(follows):
+        summaries[i] = summaries[follows[i]]
+    if dedup:
+        # Only articles whose summary can be found again become dedup targets;
+        # the rest of this batch's new entries are dropped again
+        dedup.commit(done)
+        dedup.discard(ids)
+        dedup.save()
+
+    return [build_entry(text, summary, duplicate=i in reused) if summary else None
+            for i, (text, summary) in enumerate(zip(cleaned_articles, summaries))]
+
+def load_articles(file_path):
+    # A cleaned text file is split here; a page store (or "<store>#pages=3-4")
+    # already holds its articles, so they are read straight from it
+    from page_store import is_store, read_articles
+    if is_store(file_path):
+        return read_articles(file_path)
+    with open(file_path, "r", encoding="utf-8") as f:
+        return split_into_articles(f.read())
+
+def process_file(file_path, batch_size=DEFAULT_BATCH_SIZE, n_process=1, cache=None, dedup=None, duplicates="reuse",
+                 cascade=None):
+    articles = load_articles(file_path)
+    print(f"🧩 Found {len(articles)} article(s)")
+    return [entry for entry in process_articles(articles, batch_size=batch_size, n_process=n_process, cache=cache,
+                                                dedup=dedup, duplicates=duplicates, cascade=cascade) if entry]
+
+def process_files(file_paths, batch_size=DEFAULT_BATCH_SIZE, n_process=1, cache=None, dedup=None, duplicates="reuse",
+                  cascade=None):
+    # Batch across several chunk files (or page ranges of a store) at once and hand results back per file
+    articles, owners = [], []
+    for file_path in file_paths:
+        file_articles = load_articles(file_path)
+        print(f"🧩 Found {len(file_articles)} article(s) in {file_path}")
+        articles += file_articles
+        owners += [file_path] * len(file_articles)
+
+    results = {file_path: [] for file_path in file_paths}
+    entries = process_articles(articles, batch_size=batch_size, n_process=n_process, cache=cache,
+                               dedup=dedup, duplicates=duplicates, cascade=cascade)
+    for file_path, entry in zip(owners, entries):
+        if entry:
+            results[file_path].append(entry)
+    return results
+
+def save_to_mongodb(summaries, input_path=None, mongo_uri=DEFAULT_MONGO_URI, db_name=DEFAULT_DB, collection_name=DEFAULT_COLLECTION, flush=True):
+    # Reuses one pooled writer per target; flush=False leaves the documents
+    # buffered for a later bulk write (size/time based, or writer.close())
+    try:
+        writer = get_writer(mongo_uri, db_name, collection_name)
+    except Exception as e:
+        print("❌ MongoDB connection failed:", e)
+        return False
+
+    # save() may flush on its own once the buffer is full or old enough;
+    # failed documents stay buffered for the next flush (see flush_writers)
+    try:
+        with stage("mongo_queue", docs=len(summaries)):
+            writer.save(summaries, input_path=input_path)
+        if flush:
+            writer.flush()
+    except Exception as e:
+        print("❌ MongoDB write failed:", e)
+        return False
+    print(f"✅ {len(summaries)} summaries saved to MongoDB.")
+    return True
+
+if __name__ == "__main__":
+    import argparse
+    import dedup_index
+    import extractive
+    import instrumentation
+    import summarizer_backends
+    parser = argparse.ArgumentParser(description="Summarize the articles in a cleaned text file and save them to MongoDB")
+    parser.add_argument("file_path", help="input text file, page store, or <store>#pages=A-B")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="summarizer batch size, 0 to run article by article")
+    parser.add_argument("--spacy-processes", type=int, default=1, help="worker processes for nlp.pipe")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="summary cache directory")
+    parser.add_argument("--no-cache", action="store_true", help="always re-run the models")
+    parser.add_argument("--window-tokens", type=int, default=GENERATION_PARAMS["points"]["window_tokens"],
+                        help="token budget for each bullet-point window")
+    dedup_index.add_arguments(parser)
+    extractive.add_arguments(parser)
+    summarizer_backends.add_arguments(parser)
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.configure(args, run_name=f"summrizer {args.file_path}")
+    summarizer_backends.configure(args)
+    GENERATION_PARAMS["points"]["window_tokens"] = args.window_tokens
+
+    cache = None if args.no_cache else SummaryCache(args.cache_dir)
+    dedup, duplicates = dedup_index.from_args(args)
+    cascade = extractive.from_args(args)
+    data = process_file(args.file_path, batch_size=args.batch_size, n_process=args.spacy_processes, cache=cache,
+                        dedup=dedup, duplicates=duplicates, cascade=cascade)
+    save_to_mongodb(data, input_path=args.file_path)
+    if cache:
+        print(f"🗃️ Cache stats: {cache.stats()}")
+        cache.close()
+    if dedup:
+        print(f"🪞 Dedup stats: {dedup.stats()}")
+    if cascade:
+        print(f"🪜 Summary policy: {cascade.stats()}")
+    instrumentation.finish(args.trace)
+    print("✅ All done.")
@@ -0,0 +1,87 @@
+import random
+
+import fitz  # PyMuPDF
+
+# Synthetic multi-column newspaper PDFs for benchmarks, no real editions needed
+WORDS = (
+    "the minister said india will expand trade with brazil and ghana during summit officials confirmed "
+    "new policy state government court police farmers monsoon rainfall district council election "
+    "commission budget railway project water supply hospital students university report week city "
+    "market prices investors company shares quarter growth announced meeting leaders talks border"
+).split()
+CITIES = ["Chennai", "Delhi", "Mumbai", "Kolkata", "Hyderabad", "Bengaluru"]
+
+def make_sentence(rng, low=8, high=24):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(low, high))]
+    return " ".join(words).capitalize() + "."
+
+def make_article(rng, sentences=(4, 12)):
+    headline = [rng.choice(WORDS).title() for _ in range(rng.randint(3, 6))]
+    body = [make_sentence(rng) for _ in range(rng.randint(*sentences))]
+    body[0] = f"{rng.choice(CITIES).upper()}: {body[0]}"
+    return headline, body
+
+def insert_fitting(page, rect, sentences, fontsize):
+    # insert_textbox writes nothing when the text overflows, so drop
+    # sentences (or headline words) from the end until it fits
+    while sentences:
+        if page.insert_textbox(rect, " ".join(sentences), fontsize=fontsize) >= 0:
+            return len(sentences)
+        sentences = sentences[:-1]
+    return 0
+
+def make_newspaper_pdf(path, pages=8, columns=3, seed=0, newspaper="THE HINDU",
+                       date_line="Saturday, June 14, 2025", story_gaps=True, flow=False):
+    # flow=True: the last story of each column runs on at the top of the next
+    # column, and the last column's onto the next page (as real layouts do)
+    rng = random.Random(seed)
+    doc = fitz.open()
+    carry = []
+    for page_num in range(pages):
+        page = doc.new_page(width=595, height=842)
+        top = 40
+        if page_num == 0:
+            page.insert_textbox(fitz.Rect(40, top, 555, top + 44), newspaper, fontsize=24, align=1)
+            page.insert_textbox(fitz.Rect(40, top + 46, 555, top + 64),
+                                f"{date_line} | {rng.choice(CITIES)} Edition", fontsize=9, align=1)
+            top += 74
+        page.insert_textbox(fitz.Rect(40, 815, 555, 830), f"PAGE {page_num + 1}", fontsize=7, align=1)
+
+        col_width = (515 - (columns - 1) * 12) / columns
+        for col in range(columns):
+            x0 = 40 + col * (col_width + 12)
+            y = top
+            if carry:
+                insert_fitting(page, fitz.Rect(x0, y, x0 + col_width, y + 120), carry, fontsize=8)
+                carry = []
+                y += 134
+            while y < 720:
+                headline, body = make_article(rng)
+                height = rng.randint(180, 320)
+                last = flow and y + height + 14 >= 720
+                if last:
+                    body += [make_sentence(rng) for _ in range(12)]
+                insert_fitting(page, fitz.Rect(x0, y, x0 + col_width, y + 36), headline, fontsize=13)
+                fitted = insert_fitting(page, fitz.Rect(x0, y + 38, x0 + col_width, min(y + height, 805)), body, fontsize=8)
+                if last:
+                    carry = body[fitted:]
+                if story_gaps:
+                    # Layout filler between stories, which extracts as a blank line
+                    page.insert_text((x0, y + height + 7), "    ", fontsize=8)
+                y += height + 14
+    doc.save(path)
+    doc.close()
+    return path
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Write a synthetic multi-column newspaper PDF")
+    parser.add_argument("output", help="PDF path to write")
+    parser.add_argument("--pages", type=int, default=8)
+    parser.add_argument("--columns", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--flow", action="store_true", help="stories run on across columns and pages")
+    args = parser.parse_args()
+
+    make_newspaper_pdf(args.output, pages=args.pages, columns=args.columns, seed=args.seed, flow=args.flow)
+    print(f"✅ Wrote {args.pages} page(s) to {args.output}")
@@ -0,0 +1,127 @@
+import time
+
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+from pymongo.errors import AutoReconnect, OperationFailure
+
+import mongo_writer
+from mongo_writer import MongoWriter, flush_writers
+
+def make_entry(i):
+    return {"heading": f"Heading {i}", "summary_points": [f"Point {i}"], "summary_paragraph": f"Paragraph {i}",
+            "hashtags": ["#news"], "article_text": f"Article {i}", "newspaper": "The Hindu", "date": "2024-01-01",
+            "city": "Chennai"}
+
+class FlakyCollection:
+    # Fails the first `failures` bulk writes with `error`, then behaves normally
+    def __init__(self, collection, error, failures):
+        self.collection = collection
+        self.error = error
+        self.failures = failures
+
+    def bulk_write(self, ops, ordered=True):
+        if self.failures:
+            self.failures -= 1
+            raise self.error
+        return self.collection.bulk_write(ops, ordered=ordered)
+
+@pytest.fixture
+def client():
+    return mongomock.MongoClient()
+
+def make_writer(client, **kwargs):
+    kwargs = dict(dict(batch_size=3, flush_interval=60, retry_backoff=0), **kwargs)
+    return MongoWriter(client=client, db_name="test", collection_name="summaries", **kwargs)
+
+def test_buffers_until_batch_size(client):
+    writer = make_writer(client)
+    collection = client["test"]["summaries"]
+    writer.save([make_entry(0), make_entry(1)], input_path="a.txt")
+    assert collection.count_documents({}) == 0
+    assert writer.stats()["pending"] == 2
+
+    writer.save([make_entry(2)], input_path="a.txt")
+    assert collection.count_documents({}) == 3
+    stats = writer.stats()
+    assert (stats["flushes"], stats["docs"], stats["pending"]) == (1, 3, 0)
+
+def test_flushes_after_interval(client):
+    writer = make_writer(client, batch_size=100, flush_interval=0.05)
+    collection = client["test"]["summaries"]
+    writer.save([make_entry(0)])
+    time.sleep(0.06)
+    writer.save([make_entry(1)])
+    assert collection.count_documents({}) == 2
+
+def test_background_timer_flushes_quiet_buffer(client):
+    writer = make_writer(client, batch_size=100, flush_interval=0.05).start_timer()
+    writer.last_flush = time.monotonic()
+    writer.save([make_entry(0)])
+    deadline = time.monotonic() + 2
+    while writer.buffer and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert client["test"]["summaries"].count_documents({}) == 1
+    writer.close()
+
+def test_upserts_are_idempotent(client):
+    writer = make_writer(client)
+    entries = [make_entry(i) for i in range(2)]
+    writer.save(entries)
+    first = writer.flush()
+    writer.save(entries)
+    second = writer.flush()
+    assert client["test"]["summaries"].count_documents({}) == 2
+    assert first["upserted"] == 2
+    assert second["upserted"] == 0
+
+def test_retries_transient_errors(client):
+    writer = make_writer(client)
+    writer.collection = FlakyCollection(writer.collection, AutoReconnect("gone"), failures=2)
+    writer.save([make_entry(0)])
+    stats = writer.flush()
+    assert stats["attempts"] == 3
+    assert client["test"]["summaries"].count_documents({}) == 1
+
+def test_gives_up_and_keeps_documents(client):
+    writer = make_writer(client, max_retries=1)
+    writer.collection = FlakyCollection(writer.collection, AutoReconnect("gone"), failures=5)
+    writer.save([make_entry(0)])
+    with pytest.raises(AutoReconnect):
+        writer.flush()
+    assert writer.stats()["pending"] == 1
+
+def test_non_transient_errors_are_not_retried(client):
+    writer = make_writer(client)
+    flaky = writer.collection = FlakyCollection(writer.collection, OperationFailure("bad"), failures=1)
+    writer.save([make_entry(0)])
+    with pytest.raises(OperationFailure):
+        writer.flush()
+    assert flaky.failures == 0
+    assert writer.flush()["docs"] == 1
+
+def test_save_to_mongodb_reports_write_failures(client, monkeypatch):
+    from summrizer import save_to_mongodb
+
+    writer = make_writer(client, batch_size=1)
+    writer.collection = FlakyCollection(writer.collection, OperationFailure("bad"), failures=2)
+    key = (mongo_writer.DEFAULT_MONGO_URI, mongo_writer.DEFAULT_DB, mongo_writer.DEFAULT_COLLECTION)
+    monkeypatch.setitem(mongo_writer._writers, key, writer)
+
+    # The size-triggered flush inside save() fails, and so does an explicit flush
+    assert save_to_mongodb([make_entry(0)], input_path="a.txt", flush=False) is False
+    assert flush_writers() is False
+    assert flush_writers() is True
+    assert client["test"]["summaries"].count_documents({}) == 1
+
+def test_duplicates_keep_their_own_document(client):
+    writer = make_writer(client)
+    original = make_entry(0)
+    copy = dict(original, article_text="Article 0, as reprinted", duplicate=True)
+    writer.save([original], input_path="a.txt")
+    writer.save([copy], input_path="b.txt")
+    writer.flush()
+    docs = {doc["source_file"]: doc for doc in client["test"]["summaries"].find()}
+    assert docs["a.txt"]["article_text"] == "Article 0"
+    assert docs["b.txt"]["article_text"] == "Article 0, as reprinted"
+    assert docs["b.txt"]["duplicate_of"] == docs["a.txt"]["_id"]
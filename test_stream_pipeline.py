@@ -0,0 +1,43 @@
+import random
+import threading
+
+import pytest
+
+pytest.importorskip("spacy")
+
+import models
+import stream_pipeline
+import stub_model
+from synthetic_pdf import make_article
+
+def make_page(rng, articles=2):
+    return "\n---\n".join(" ".join(make_article(rng, sentences=(6, 10))[1]) for _ in range(articles))
+
+@pytest.fixture
+def stubbed(monkeypatch):
+    monkeypatch.setattr(models, "_handles", {})
+    stub_model.install(stub_spacy=True)
+
+def test_chunks_are_numbered_in_order_whatever_the_page_numbers(tmp_path):
+    # A page range that doesn't start at 1 and skips a page
+    pages = [(page_num, f"Page {page_num} text.") for page_num in [3, 4, 5, 7, 8]]
+    list(stream_pipeline.clean_pages(iter(pages), pages_per_chunk=2, chunks_dir=str(tmp_path)))
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["chunk_1.txt", "chunk_2.txt", "chunk_3.txt"]
+    assert "----- PAGE 3 -----" in (tmp_path / "chunk_1.txt").read_text()
+    assert "----- PAGE 7 -----" in (tmp_path / "chunk_2.txt").read_text()
+    assert "----- PAGE 8 -----" in (tmp_path / "chunk_3.txt").read_text()
+
+def test_upstream_error_stops_every_stage(stubbed, monkeypatch):
+    rng = random.Random(0)
+    pages = [(page_num, make_page(rng)) for page_num in range(1, 4)]
+
+    def failing_pages(pdf_path, workers=1):
+        yield from pages
+        raise RuntimeError("page 4 is unreadable")
+
+    monkeypatch.setattr(stream_pipeline, "iter_pages", failing_pages)
+    before = set(threading.enumerate())
+    with pytest.raises(RuntimeError, match="page 4 is unreadable"):
+        stream_pipeline.stream_pdf("paper.pdf", store=lambda entries, input_path: None,
+                                   batch_articles=2, queue_size=1)
+    assert not [thread for thread in threading.enumerate() if thread not in before]
@@ -0,0 +1,160 @@
+import asyncio
+import json
+import random
+import socket
+import threading
+
+import pytest
+
+pytest.importorskip("spacy")
+
+import idf_index
+import models
+import stub_model
+from extractive import Cascade
+from summary_service import MicroBatcher, get_metrics, serve, summarize_remote
+from synthetic_pdf import make_article
+
+def make_articles(count, seed=0):
+    rng = random.Random(seed)
+    return [" ".join(make_article(rng, sentences=(8, 14))[1]) for _ in range(count)]
+
+class Service:
+    # serve() on an ephemeral localhost port, in its own event loop thread
+    def __init__(self, batcher):
+        self.batcher = batcher
+        self.loop = asyncio.new_event_loop()
+        self.ready = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        assert self.ready.wait(10), "service did not start"
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.task = self.loop.create_task(serve(port=0, batcher=self.batcher, ready=self._ready))
+        try:
+            self.loop.run_until_complete(self.task)
+        except asyncio.CancelledError:
+            pass
+
+    def _ready(self, server):
+        self.port = server.sockets[0].getsockname()[1]
+        self.ready.set()
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.task.cancel)
+        self.thread.join(10)
+
+@pytest.fixture
+def start_service(monkeypatch, tmp_path):
+    # Hashtags go into a throwaway IDF index, not the one in the working directory
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(idf_index, "_index", None)
+    monkeypatch.setattr(models, "_handles", {})
+    stub_model.install(stub_spacy=True)
+    services = []
+
+    def start(**kwargs):
+        service = Service(MicroBatcher(**kwargs))
+        services.append(service)
+        return service
+
+    yield start
+    for service in services:
+        service.stop()
+
+def raw_post(port, payload):
+    # Status line, headers and the decoded chunks (or whole body) of one /summarize response
+    body = json.dumps(payload).encode("utf-8")
+    with socket.create_connection(("127.0.0.1", port), timeout=30) as conn:
+        conn.sendall(b"POST /summarize HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                     + f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body)
+        data = b""
+        while True:
+            part = conn.recv(65536)
+            if not part:
+                break
+            data += part
+    head, _, rest = data.partition(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    if "Transfer-Encoding: chunked" not in lines:
+        return lines[0], lines[1:], [rest]
+    chunks = []
+    while True:
+        size_line, _, rest = rest.partition(b"\r\n")
+        size = int(size_line, 16)
+        if size == 0:
+            assert rest == b"\r\n"
+            break
+        chunks.append(rest[:size])
+        assert rest[size:size + 2] == b"\r\n"
+        rest = rest[size + 2:]
+    return lines[0], lines[1:], chunks
+
+def test_streams_chunked_ndjson(start_service):
+    service = start_service(max_wait=0.01)
+    articles = make_articles(3)
+    status, headers, chunks = raw_post(service.port, {"articles": articles})
+    assert status == "HTTP/1.1 200 OK"
+    assert "Transfer-Encoding: chunked" in headers
+    results = [json.loads(chunk) for chunk in chunks]
+    assert all(chunk.endswith(b"\n") for chunk in chunks)
+    assert sorted(result["index"] for result in results[:-1]) == [0, 1, 2]
+    assert results[-1] == dict(results[-1], done=True, articles=3)
+
+def test_matches_direct_processing(start_service):
+    from summrizer import process_articles
+
+    service = start_service(max_wait=0.01)
+    articles = make_articles(4, seed=1)
+    served = dict(summarize_remote(articles, port=service.port))
+    direct = process_articles(articles, batch_size=8)
+    assert [served[i] for i in range(len(articles))] == json.loads(json.dumps(direct))
+
+def test_concurrent_requests_share_batches(start_service):
+    service = start_service(max_batch=16, max_wait=0.5)
+    requests = [make_articles(2, seed=seed) for seed in range(3)]
+    results = [None] * len(requests)
+
+    def client(i):
+        results[i] = dict(summarize_remote(requests[i], port=service.port))
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(len(requests))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+    assert all(result is not None and sorted(result) == [0, 1] for result in results)
+
+    metrics = get_metrics(port=service.port)
+    assert metrics["articles"] == 6
+    assert metrics["requests"] == 3
+    assert metrics["batches"] < 3
+
+def test_error_after_headers_stays_in_stream(start_service):
+    service = start_service(max_wait=0.01)
+
+    def broken_submit(articles):
+        raise ValueError("queue unavailable")
+
+    service.batcher.submit = broken_submit
+    status, _, chunks = raw_post(service.port, {"articles": make_articles(1)})
+    assert status == "HTTP/1.1 200 OK"
+    assert not any(b"HTTP/1.1" in chunk for chunk in chunks)
+    assert json.loads(chunks[-1]) == {"error": "ValueError: queue unavailable"}
+    with pytest.raises(RuntimeError, match="queue unavailable"):
+        list(summarize_remote(make_articles(1), port=service.port))
+
+def test_bad_request_before_streaming(start_service):
+    service = start_service(max_wait=0.01)
+    status, _, body = raw_post(service.port, {"articles": 5})
+    assert status == "HTTP/1.1 400 Bad Request"
+    assert "error" in json.loads(body[0])
+
+def test_time_budget_is_per_batch(start_service):
+    cascade = Cascade("abstractive", time_budget=30)
+    # As if the service had been up far longer than the budget
+    cascade.started -= 3600
+    service = start_service(max_wait=0.01, cascade=cascade)
+    entries = [entry for _, entry in summarize_remote(make_articles(2), port=service.port)]
+    assert [entry["summary_method"] for entry in entries] == ["abstractive", "abstractive"]
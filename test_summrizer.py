@@ -0,0 +1,45 @@
+import random
+
+import pytest
+
+pytest.importorskip("spacy")
+
+import models
+import stub_model
+from synthetic_pdf import make_article
+
+@pytest.fixture
+def summrizer(monkeypatch):
+    monkeypatch.setattr(models, "_handles", {})
+    stub_model.install(stub_spacy=True)
+    import summrizer
+    return summrizer
+
+def make_analyses(summrizer, count, seed=0):
+    rng = random.Random(seed)
+    texts = [" ".join(make_article(rng, sentences=(2, 30))[1]) for _ in range(count)]
+    return summrizer.tokenize_sentences(summrizer.analyze_articles(texts, cleaned=True))
+
+def test_length_buckets_never_mix_lengths(summrizer):
+    requests = [{"max_length": max_length, "min_length": min_length, "n_tokens": n}
+                for n, (max_length, min_length) in enumerate([(20, 4), (30, 20), (20, 4), (100, 20), (30, 20)] * 3)]
+    batches = list(summrizer.length_buckets(requests, 4))
+    assert sorted(i for batch in batches for i in batch) == list(range(len(requests)))
+    for batch in batches:
+        assert len({(requests[i]["max_length"], requests[i]["min_length"]) for i in batch}) == 1
+
+def test_batched_matches_article_by_article(summrizer):
+    # The stub's output length follows max_length, so a batch generated with
+    # a longer member's lengths would show up here
+    analyses = make_analyses(summrizer, 24, seed=5)
+    single = summrizer.summarize_abstractive(analyses, batch_size=0)
+    batched = summrizer.summarize_abstractive(analyses, batch_size=8)
+    assert batched == single
+
+def test_shared_encoder_matches_heading_and_points(summrizer):
+    # Only the paragraph may differ: it is decoded from the first bullet window
+    analyses = make_analyses(summrizer, 12, seed=6)
+    reference = summrizer.summarize_articles_batched(analyses, batch_size=4)
+    shared = summrizer.summarize_shared_encoder(analyses, batch_size=4)
+    for ref, out in zip(reference, shared):
+        assert (out["heading"], out["summary_points"]) == (ref["heading"], ref["summary_points"])
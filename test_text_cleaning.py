@@ -0,0 +1,145 @@
+import random
+import re
+
+import pytest
+
+import text_cleaning
+from synthetic_pdf import make_sentence
+
+# The compiled plans must give exactly what the old per-module cleaners did,
+# including where typo keys overlap and a later key only appears after an
+# earlier replacement ("fagged ofcial" -> "flagged offcial" -> "flagged offficial").
+# The old cleaners are frozen here, independent of bench_cleaning.py.
+
+# === Reference Implementations ===
+def legacy_clean_page_text(text):
+    # 2text_fixed.py / all_pages.py
+    text = re.sub(r'(\w+)-\s*\n\s*(\w+)', r'\1\2', text)
+    text = re.sub(r'(\w+)-\s+(\w+)', r'\1\2', text)
+    replacements = {
+        "fve": "five", "frst": "first", "cofict": "conflict", "fnanciers": "financiers",
+        "ofcial": "official", "Afairs": "Affairs", "fghting": "fighting", "afected": "affected",
+        "fagged of": "flagged off", "safron ag": "saffron flag", "ash oods": "flash floods",
+        "signi cant": "significant", "multipolar": "multipolar", "advantagevance": "advance",
+        "To-ophobicbago": "Trinidad and Tobago", "Na-ophobicmibia": "Namibia"
+    }
+    for wrong, correct in replacements.items():
+        text = text.replace(wrong, correct)
+    text = re.sub(r'[^\x00-\x7F]+', ' ', text)
+    text = re.sub(r'^\s*(A IN-X|YK|INSIDE|PAGE \d+|NEW DELHI|SRINAGAR|CHENNAI|KOLKATA)\s*$', '', text, flags=re.MULTILINE)
+    text = re.sub(r'[ \t]{2,}', ' ', text)
+    text = re.sub(r'\n\s*\n+', '\n\n-----\n\n', text)
+    return text.strip()
+
+def legacy_clean_article_text(text):
+    # summrizer.py
+    junk_patterns = [
+        r"(?i)^follow us.*",
+        r"https?://\S+",
+        r"(?i)vol\.\s*\d+\s*no\.\s*\d+",
+        r"(?i)^page\s+\d+",
+    ]
+    for pattern in junk_patterns:
+        text = re.sub(pattern, '', text)
+    text = re.sub(r"\n{2,}", '\n', text)
+    text = re.sub(r"[ \t]{2,}", ' ', text)
+    typo_fixes = {
+        "no-fy": "no-fly", "kick of": "kick off", "fowers": "flowers", "s Ganderbal": "’s Ganderbal",
+        "oors": "floors", "oicials": "officials", "overthe": "over the", "arrangement,which": "arrangement, which"
+    }
+    for wrong, correct in typo_fixes.items():
+        text = text.replace(wrong, correct)
+    return text.strip()
+
+# === Inputs ===
+NOISE = ["  ", "\t", "\n", "\n\n", "\n \n\n", " \t ", "é", "’", "multi-\npolar", "state- wide",
+         "YK", "\nINSIDE\n", "\nPAGE 4\n", "\nNEW DELHI\n", "http://example.com/a", "Vol. 12 No. 3",
+         "Follow us on X", "page 7"]
+
+def make_page(rng, keys):
+    parts = []
+    for _ in range(rng.randint(20, 60)):
+        parts.append(make_sentence(rng))
+        if rng.random() < 0.3:
+            parts.append(rng.choice(NOISE))
+        if rng.random() < 0.2:
+            parts.append(rng.choice(keys))
+    return " ".join(parts)
+
+def fuzz_string(rng, alphabet, length=80):
+    return "".join(rng.choice(alphabet) for _ in range(rng.randint(0, length)))
+
+def make_corpus(rng, pages):
+    rules = text_cleaning.load_rules()
+    keys = list(rules["page_replacements"]) + list(rules["article_replacements"])
+    return [make_page(rng, keys) for _ in range(pages)]
+
+
+SAMPLES = [
+    "",
+    "fagged ofcial",
+    "fagged of the ofcials",
+    "ofcials here",
+    "the fagged of day",
+    "safron ag hoisted, ash oods and signi cant fghting",
+    "multi-\npolar world, state- wide ban, To-ophobicbago and Na-ophobicmibia",
+    "frst fve fnanciers afected by the cofict",
+    "\nINSIDE\n\nPAGE 4\nNEW DELHI\n  text\t\twith   gaps",
+    "Follow us on X\nhttp://example.com/a Vol. 12 No. 3\npage 7 kick of the fowers",
+    "s Ganderbal oors oicials overthe arrangement,which",
+    "café ’s prices — é",
+]
+
+def chained(table, text):
+    for wrong, correct in table.items():
+        text = text.replace(wrong, correct)
+    return text
+
+@pytest.mark.parametrize("text", SAMPLES)
+def test_samples_match_legacy(text):
+    assert text_cleaning.clean_page_text(text) == legacy_clean_page_text(text)
+    assert text_cleaning.clean_article_text(text) == legacy_clean_article_text(text)
+
+def test_overlapping_keys_chain():
+    assert text_cleaning.clean_page_text("fagged ofcial") == "flagged offficial"
+
+def test_synthetic_pages_match_legacy():
+    for text in make_corpus(random.Random(0), pages=200):
+        assert text_cleaning.clean_page_text(text) == legacy_clean_page_text(text), text
+        assert text_cleaning.clean_article_text(text) == legacy_clean_article_text(text), text
+
+def test_fuzz_matches_legacy():
+    rng = random.Random(1)
+    rules = text_cleaning.load_rules()
+    keys = list(rules["page_replacements"]) + list(rules["article_replacements"])
+    alphabet = ["a", "f", "o", " ", " ", "\t", "\n", "\n", "-", "é", "YK", "PAGE 3", "http://x",
+                "Vol. 1 No. 2", "page 2"] + keys
+    for _ in range(5000):
+        text = fuzz_string(rng, alphabet, length=30)
+        assert text_cleaning.clean_page_text(text) == legacy_clean_page_text(text), repr(text)
+        assert text_cleaning.clean_article_text(text) == legacy_clean_article_text(text), repr(text)
+
+def test_literal_pass_fuzzed_tables():
+    # Small alphabet so keys overlap, nest and get built by earlier replacements
+    rng = random.Random(2)
+    for _ in range(500):
+        table = {fuzz_string(rng, "abc", 4): fuzz_string(rng, "abc", 4) for _ in range(rng.randint(1, 8))}
+        # chain_max=0 forces the scan even for these small tables
+        replace = text_cleaning.literal_pass(table, chain_max=0)
+        for _ in range(20):
+            text = fuzz_string(rng, "abc ", 30)
+            expected = chained({k: v for k, v in table.items() if k}, text)
+            assert (replace(text) if replace else text) == expected, (table, text)
+
+def test_literal_pass_scan_on_rules():
+    rng = random.Random(3)
+    rules = text_cleaning.load_rules()
+    for name in ("page_replacements", "article_replacements"):
+        table = rules[name]
+        replace = text_cleaning.literal_pass(table, chain_max=0)
+        for text in SAMPLES + [fuzz_string(rng, list(table) + ["a", " ", "f", "o"], 20) for _ in range(2000)]:
+            assert replace(text) == chained(table, text), repr(text)
+
+def test_literal_pass_without_changes():
+    assert text_cleaning.literal_pass({}) is None
+    assert text_cleaning.literal_pass({"same": "same", "": "x"}, chain_max=0) is None
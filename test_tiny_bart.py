@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("transformers")
+pytest.importorskip("tokenizers")
+pytest.importorskip("spacy")
+
+import models
+import stub_model
+from summarizer_backends import load_fp32
+from synthetic_pdf import make_article
+from tiny_bart import make_tiny_bart
+
+# The torch code paths (padding, generation from token ids and from encoder
+# states, length-bucketed batches) on a tiny random BART, offline. Its
+# outputs are noise, so the checks compare paths with each other. The model
+# runs in float64 so padding can't flip a greedy choice through rounding.
+
+@pytest.fixture(scope="module")
+def tiny(tmp_path_factory):
+    summarizer = load_fp32(make_tiny_bart(str(tmp_path_factory.mktemp("tiny_bart"))))
+    summarizer.model.double()
+    return summarizer
+
+@pytest.fixture
+def summrizer(tiny, monkeypatch):
+    monkeypatch.setattr(models, "_handles", {})
+    models.set_handle("summarizer", tiny)
+    models.set_handle("tokenizer", tiny.tokenizer)
+    models.set_handle("nlp", stub_model.make_stub_nlp())
+    import summrizer
+    return summrizer
+
+def make_inputs(tokenizer, count=5, seed=0):
+    rng = random.Random(seed)
+    texts = [" ".join(make_article(rng, sentences=(1, 6))[1]) for _ in range(count)]
+    return tokenizer(texts, truncation=False, add_special_tokens=False)["input_ids"]
+
+def test_pad_ids(tiny):
+    tokenizer = tiny.tokenizer
+    ids, mask = models._pad_ids(tokenizer, [[5, 6, 7], [8]])
+    bos, eos, pad = tokenizer.cls_token_id, tokenizer.sep_token_id, tokenizer.pad_token_id
+    assert ids.tolist() == [[bos, 5, 6, 7, eos], [bos, 8, eos, pad, pad]]
+    assert mask.tolist() == [[1, 1, 1, 1, 1], [1, 1, 1, 0, 0]]
+
+def test_generate_ids_batched_matches_single(tiny):
+    inputs = make_inputs(tiny.tokenizer)
+    kwargs = dict(max_length=20, min_length=4, do_sample=False)
+    batched = models.generate_ids(tiny, inputs, **kwargs)
+    single = [models.generate_ids(tiny, [ids], **kwargs)[0] for ids in inputs]
+    assert batched == single
+
+def test_generate_encoded_matches_generate_ids(tiny):
+    inputs = make_inputs(tiny.tokenizer, seed=1)
+    kwargs = dict(max_length=20, min_length=4, do_sample=False)
+    states = models.encode_ids(tiny, inputs)
+    assert [len(state) for state in states] == [len(ids) + 2 for ids in inputs]
+    assert models.generate_encoded(tiny, states, **kwargs) == models.generate_ids(tiny, inputs, **kwargs)
+
+@pytest.mark.parametrize("batch_size", [0, 8])
+def test_run_batched_matches_article_by_article(summrizer, batch_size):
+    rng = random.Random(2)
+    texts = [" ".join(make_article(rng, sentences=(2, 20))[1]) for _ in range(6)]
+    analyses = summrizer.tokenize_sentences(summrizer.analyze_articles(texts, cleaned=True))
+    reference = summrizer.summarize_abstractive(analyses, batch_size=0)
+    summaries = summrizer.summarize_abstractive(analyses, batch_size=batch_size)
+    assert len(summaries) == len(texts)
+    assert summaries == reference
@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import re
+
+# Shared text cleaning for PDF pages (2text_fixed.py, all_pages.py) and for
+# articles (summrizer.py). Each plan is a list of precompiled (pattern, repl)
+# passes; the typo tables are looked up with one scan through a trie-shaped
+# regex and only the keys found are replaced, so they can grow to thousands
+# of entries without one pass per entry.
+# Whitespace passes stay separate: fusing them needs a Python callback per
+# match, which measured slower than two C-level substitutions.
+
+# Typo tables up to this size are applied as plain chained replace calls
+CHAIN_MAX_KEYS = 64
+RULES_PATH = os.environ.get("CLEANING_RULES", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cleaning_rules.json"))
+
+# === Plan Building ===
+def trie_pattern(words):
+    # "fve", "frst", "fghting" -> f(?:ve|rst|ghting); longer keys win over their prefixes
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node):
+        alternatives = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alternatives:
+            return ""
+        if len(alternatives) == 1 and "" not in node:
+            return alternatives[0]
+        return "(?:" + "|".join(alternatives) + ")" + ("?" if "" in node else "")
+
+    return build(trie)
+
+def literal_pass(table, chain_max=CHAIN_MAX_KEYS):
+    # Same result as chained str.replace calls in table order (a later key
+    # also sees what earlier replacements produced), without one pass per
+    # key: a scan finds which keys occur, only those are replaced, and the
+    # text is rescanned for later keys whenever a replacement changed it
+    table = {wrong: correct for wrong, correct in table.items() if wrong and wrong != correct}
+    if not table:
+        return None
+    keys = list(table)
+    if len(keys) <= chain_max:
+        # A handful of C-level replace calls beats any scan
+        def chain(text):
+            for wrong in keys:
+                text = text.replace(wrong, table[wrong])
+            return text
+
+        return chain
+    rank = {key: i for i, key in enumerate(keys)}
+    # Every key starting at a position is a prefix of the longest one there,
+    # so one zero-width match per position plus its key prefixes finds them all
+    finder = re.compile("(?=(" + trie_pattern(keys) + "))")
+    prefixes = {key: [rank[key[:n]] for n in range(1, len(key) + 1) if key[:n] in rank] for key in keys}
+
+    def present(text, after=-1):
+        return {i for found in set(finder.findall(text)) for i in prefixes[found] if i > after}
+
+    def replace(text):
+        todo = present(text)
+        while todo:
+            i = min(todo)
+            todo.discard(i)
+            replaced = text.replace(keys[i], table[keys[i]])
+            if replaced != text:
+                text = replaced
+                todo |= present(text, i)
+        return text
+
+    return replace
+
+def load_rules(path=RULES_PATH):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def build_plans(rules):
+    page_plan = [
+        # Hyphenated line breaks, then mid-line hyphenated breaks ("multi- polar");
+        # kept as two passes because the second one picks up joins the first creates.
+        # (?<!\w) only skips attempts from the middle of a word, which can never
+        # match, instead of re-scanning every word suffix.
+        (re.compile(r'(?<!\w)(\w+)-\s*\n\s*(\w+)'), r'\1\2'),
+        (re.compile(r'(?<!\w)(\w+)-\s+(\w+)'), r'\1\2'),
+        literal_pass(rules.get("page_replacements", {})),
+        (re.compile(r'[^\x00-\x7F]+'), ' '),
+        (re.compile(r'^\s*(A IN-X|YK|INSIDE|PAGE \d+|NEW DELHI|SRINAGAR|CHENNAI|KOLKATA)\s*$', re.MULTILINE), ''),
+        (re.compile(r'[ \t]{2,}'), ' '),
+        (re.compile(r'\n\s*\n+'), '\n\n-----\n\n'),
+    ]
+    article_plan = [
+        (re.compile(r"(?i)^follow us.*"), ''),
+        (re.compile(r"https?://\S+"), ''),
+        (re.compile(r"(?i)vol\.\s*\d+\s*no\.\s*\d+"), ''),
+        (re.compile(r"(?i)^page\s+\d+"), ''),
+        (re.compile(r"\n{2,}"), '\n'),
+        (re.compile(r"[ \t]{2,}"), ' '),
+        literal_pass(rules.get("article_replacements", {})),
+    ]
+    return {
+        "page": [step for step in page_plan if step],
+        "article": [step for step in article_plan if step],
+    }
+
+_rules = load_rules()
+_plans = build_plans(_rules)
+
+def configure(path):
+    # Swap in another rules file (same keys as cleaning_rules.json)
+    global _rules, _plans
+    _rules = load_rules(path)
+    _plans = build_plans(_rules)
+
+def rules_digest():
+    # Changes whenever the active cleaning rules do
+    return hashlib.sha256(json.dumps(_rules, sort_keys=True).encode("utf-8")).hexdigest()
+
+def run_plan(plan, text):
+    for step in plan:
+        text = step(text) if callable(step) else step[0].sub(step[1], text)
+    return text.strip()
+
+# === Cleaners ===
+def clean_page_text(text):
+    return run_plan(_plans["page"], text)
+
+def clean_article_text(text):
+    return run_plan(_plans["article"], text)
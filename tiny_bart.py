@@ -0,0 +1,61 @@
+import json
+import os
+import random
+
+from synthetic_pdf import make_article
+
+# A randomly initialised BART with the same architecture, special tokens and
+# byte-level BPE behaviour as bart-large-cnn, small enough to build in
+# seconds with no download. Its summaries are noise, but shapes, code paths
+# and relative backend speed are real, so benchmarks and smoke runs work offline.
+SPECIAL_TOKENS = ["<s>", "<pad>", "</s>", "<unk>", "<mask>"]  # ids 0-4, as in BART
+
+def build_tokenizer(path, seed=0, vocab_size=2000):
+    from tokenizers import ByteLevelBPETokenizer
+    from transformers import BartTokenizerFast
+
+    rng = random.Random(seed)
+    corpus = [" ".join(make_article(rng)[1]) for _ in range(300)]
+    bpe = ByteLevelBPETokenizer()
+    bpe.train_from_iterator(corpus, vocab_size=vocab_size, special_tokens=SPECIAL_TOKENS)
+    os.makedirs(path, exist_ok=True)
+    vocab_file, merges_file = bpe.save_model(path)
+    with open(vocab_file, encoding="utf-8") as f:
+        vocab = json.load(f)
+    with open(merges_file, encoding="utf-8") as f:
+        merges = [tuple(line.split()) for line in f if line.strip() and not line.startswith("#version")]
+    tokenizer = BartTokenizerFast(vocab=vocab, merges=merges)
+    tokenizer.save_pretrained(path)
+    return tokenizer
+
+def make_tiny_bart(path, seed=0, vocab_size=2000, d_model=64, layers=2, heads=4, ffn_dim=128):
+    # Writes tokenizer + model to path (reused if already there) and returns
+    # path, usable anywhere a model name is accepted
+    if os.path.exists(os.path.join(path, "config.json")):
+        return path
+    import torch
+    from transformers import BartConfig, BartForConditionalGeneration
+
+    tokenizer = build_tokenizer(path, seed=seed, vocab_size=vocab_size)
+    config = BartConfig(
+        vocab_size=len(tokenizer), d_model=d_model,
+        encoder_layers=layers, decoder_layers=layers,
+        encoder_attention_heads=heads, decoder_attention_heads=heads,
+        encoder_ffn_dim=ffn_dim, decoder_ffn_dim=ffn_dim,
+        max_position_embeddings=1024,
+        pad_token_id=1, bos_token_id=0, eos_token_id=2,
+        decoder_start_token_id=2, forced_bos_token_id=0, forced_eos_token_id=2,
+        no_repeat_ngram_size=3,
+    )
+    torch.manual_seed(seed)
+    model = BartForConditionalGeneration(config).eval()
+    model.save_pretrained(path)
+    return path
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Build a tiny random BART (model + tokenizer) for offline runs")
+    parser.add_argument("path", nargs="?", default=".tiny_bart")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(f"✅ Tiny BART written to {make_tiny_bart(args.path, seed=args.seed)}")